@@ -0,0 +1,155 @@
+# bench/command_latency.py
+"""End-to-end chat command benchmark: fake Twitch IRC -> real bot -> recorded keystrokes.
+
+    python -m bench.command_latency --mix movement --rate 20 --duration 15
+    python -m bench.command_latency --mix all --json bench_output.json
+
+For each command type it reports how many messages were handled, the
+latency from the fake server sending the PRIVMSG to the bot's first
+keystroke (commands that press keys), and to the bot finishing with the message.
+Runs on any OS; no game, Twitch account or network needed.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+from bench import harness
+from bench.fake_twitch_irc import FakeTwitchIRC
+
+USERS = [f"viewer{i}" for i in range(200)]
+
+
+def movement_mix(rng):
+    cmd = rng.choice(["left", "right", "forward", "back", "up", "down"])
+    return rng.choice([f"!{cmd} {rng.randint(1, 5)}", "!walk", "!stop", "!use"])
+
+
+def vote_mix(rng):
+    # Mostly ballots, occasionally someone tries to start another vote
+    if rng.random() < 0.1:
+        return rng.choice(["!weather snowy", "!gravity 5", "!levitate on", "!toggle_ai"])
+    return rng.choice(["!yes", "!yes", "!no"])
+
+
+def info_mix(rng):
+    return rng.choice(["!info", "!info", "!quest", "!state", "!help"])
+
+
+def all_mix(rng):
+    roll = rng.random()
+    if roll < 0.5:
+        return movement_mix(rng)
+    if roll < 0.75:
+        return vote_mix(rng)
+    if roll < 0.95:
+        return info_mix(rng)
+    return "hello chat"  # plain chat, not a command
+
+
+MIXES = {"movement": movement_mix, "votes": vote_mix, "info": info_mix, "all": all_mix}
+
+
+async def run(mix, rate, duration, seed, vote_duration):
+    rng = random.Random(seed)
+    recorder = harness.Recorder()
+    irc = FakeTwitchIRC()
+    await irc.start()
+    bot = harness.make_bot(recorder, vote_duration=vote_duration)
+    irc.attach(bot)
+    await bot.connect()
+    await asyncio.wait_for(irc.joined.wait(), 10)
+    await asyncio.sleep(0.2)  # let twitchio finish its ready handshake
+
+    if mix in ("votes", "all"):
+        await irc.say("viewer0", "!weather rainy")  # get a vote going for the ballots
+
+    interval = 1.0 / rate
+    start = time.perf_counter()
+    n = 0
+    # Schedule sends against the ideal timeline so a blocked loop shows up as latency
+    while time.perf_counter() - start < duration:
+        await irc.say(rng.choice(USERS), MIXES[mix](rng))
+        n += 1
+        next_at = start + n * interval
+        await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+    send_elapsed = time.perf_counter() - start
+
+    drained = await harness.drain(recorder, bot)
+    elapsed = time.perf_counter() - start
+    await bot.close()
+    await irc.stop()
+
+    per_cmd = {}
+    for msg_id, cmd in recorder.commands.items():
+        entry = per_cmd.setdefault(cmd, {"keystroke": [], "handled": []})
+        sent = irc.sent[msg_id]
+        if msg_id in recorder.first_key:
+            entry["keystroke"].append(recorder.first_key[msg_id] - sent)
+        if msg_id in recorder.handled:
+            entry["handled"].append(recorder.handled[msg_id] - sent)
+
+    return {
+        "mix": mix,
+        "rate": rate,
+        "duration": duration,
+        "sent": n,
+        "handled": len(recorder.handled),
+        "send_elapsed_s": send_elapsed,
+        "total_elapsed_s": elapsed,
+        "drained": drained,
+        "throughput_per_s": len(recorder.handled) / elapsed if elapsed else 0.0,
+        "chat_replies": len(irc.received),
+        "keystrokes": len(bot_keystrokes()),
+        "commands": {
+            cmd: {"keystroke": harness.summarize(v["keystroke"]), "handled": harness.summarize(v["handled"])}
+            for cmd, v in sorted(per_cmd.items())
+        },
+    }
+
+
+def bot_keystrokes():
+    import game_input
+    return game_input.get_backend().keystrokes
+
+
+def _ms(v):
+    return "-" if v is None else f"{v * 1000:.0f}"
+
+
+def print_report(result):
+    print(f"\n== mix={result['mix']} rate={result['rate']}/s duration={result['duration']}s ==")
+    print(f"sent {result['sent']}, handled {result['handled']} in {result['total_elapsed_s']:.1f}s "
+          f"({result['throughput_per_s']:.1f}/s), {result['chat_replies']} chat replies, "
+          f"{result['keystrokes']} keystrokes{'' if result['drained'] else ' (did not drain!)'}")
+    print(f"{'command':<12}{'n':>6}{'key p50':>10}{'key p99':>10}{'done p50':>10}{'done p99':>10}  (ms)")
+    for cmd, stats in result["commands"].items():
+        k, h = stats["keystroke"], stats["handled"]
+        print(f"{cmd:<12}{h['n']:>6}{_ms(k['p50']):>10}{_ms(k['p99']):>10}{_ms(h['p50']):>10}{_ms(h['p99']):>10}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mix", choices=list(MIXES), default="all")
+    parser.add_argument("--rate", type=float, default=10.0, help="chat messages per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of chat to send")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--vote-duration", type=float, default=2.0, help="override Config.VOTING_DURATION")
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args(argv)
+    out = os.path.abspath(args.json) if args.json else None
+
+    harness.enter_workdir()
+    result = asyncio.run(run(args.mix, args.rate, args.duration, args.seed, args.vote_duration))
+    print_report(result)
+    if out:
+        with open(out, "w") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+# bench/console_channel.py
+"""Console commands over the command channel vs typed into the console.
+
+    python -m bench.console_channel --commands 50 --typed 3
+
+Runs game_input.console() against sim_game, first with FakeDFUChannel
+standing in for the CommandChannel mod, then with the channel stalled
+(acks never come: typed after ACK_TIMEOUT), then with it gone (connect
+refused: typed straight away, and not retried for RETRY_AFTER). Checks
+the sim ran every command.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+from bench import harness
+from bench.fake_dfu_channel import FakeDFUChannel
+
+COMMANDS = ["set_weather 4", "levitate on", "levitate off", "tai", "set_grav 8", "song 119", "tele2pixel 200 210"]
+
+
+def timed_console(game_input, command):
+    start = time.perf_counter()
+    ok = game_input.console(command)
+    return ok, time.perf_counter() - start
+
+
+async def run(n_channel, n_typed):
+    import dfu_channel
+    import game_input
+    import sim_game
+
+    sim = sim_game.SimGame("sim", seed=1).start()
+    game_input.set_backend(sim)
+    fake = FakeDFUChannel(handler=sim.run_console)
+    address = await fake.start()
+    game_input.set_channel(dfu_channel.CommandChannel(address))
+
+    phases = {}
+    try:
+        for phase, n in (("channel", n_channel), ("stalled", n_typed), ("gone", n_typed)):
+            if phase == "stalled":
+                fake.stall = True
+            elif phase == "gone":
+                await fake.stop()
+                game_input.set_channel(dfu_channel.CommandChannel(address))  # fresh, not already backing off
+            before = len(sim.console_log)
+            times, failed = [], 0
+            for i in range(n):
+                command = COMMANDS[i % len(COMMANDS)]
+                ok, seconds = await asyncio.to_thread(timed_console, game_input, command)
+                times.append(seconds)
+                failed += not ok
+            phases[phase] = {
+                "latency": harness.summarize(times),
+                "failed": failed,
+                "ran": len(sim.console_log) - before,
+                "sent": n,
+            }
+    finally:
+        game_input.set_channel(None)
+        sim.stop()
+        await fake.stop()
+    return phases
+
+
+def print_report(phases):
+    print()
+    for phase, r in phases.items():
+        s = r["latency"]
+        print(f"{phase:<8} n={r['sent']:<4} p50 {s['p50'] * 1000:8.1f}ms  max {s['max'] * 1000:8.1f}ms  "
+              f"ran in sim {r['ran']}/{r['sent']}  undelivered {r['failed']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--commands", type=int, default=50, help="commands over the channel")
+    parser.add_argument("--typed", type=int, default=3, help="commands in each fallback phase (~2.5s each)")
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args(argv)
+    out = os.path.abspath(args.json) if args.json else None
+
+    harness.enter_workdir()
+    phases = asyncio.run(run(args.commands, args.typed))
+    print_report(phases)
+    if out:
+        with open(out, "w") as f:
+            json.dump(phases, f, indent=2)
+    return 0 if all(r["ran"] >= r["sent"] and not r["failed"] for r in phases.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+# bench/failover.py
+"""Two instances, one lease, one executor: takeover time and fencing.
+
+    python -m bench.failover
+
+Runs input_executor.py on sim_game and two instance processes that each
+hold a failover.Failover and an ExecutorClient, pressing keys while
+primary (the bot's game-input path without the chat side). Then:
+
+  busy   SIGUSR1 the primary, which blocks its event loop for --busy
+         seconds (a slow handler, shorter than MAX_LOOP_STALL + TTL): it
+         must stay primary and the standby must not take over
+  kill   SIGKILL the primary; time until the standby is primary
+  stall  SIGSTOP the new primary past the TTL, let the other take over,
+         SIGCONT it: its keys must be fenced off and it must stand down
+  hang   SIGUSR2 the new primary, which blocks its event loop for good
+         while its beat thread runs on; time until the standby is primary
+
+POSIX only (SIGSTOP, SIGUSR1, SIGUSR2). Exits 1 if the busy primary lost
+the lease, a kill or stall takeover is slower than --budget, a hang
+takeover is slower than MAX_LOOP_STALL + --budget, or an old primary's
+op got through after the new one fenced it.
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import failover
+from bench import harness
+from bench.split_processes import HERE, free_port, start_executor
+
+
+async def instance(lease_path, address, busy):
+    import input_executor
+
+    # A handler that blocks the loop, the way a slow chat command can
+    asyncio.get_running_loop().add_signal_handler(signal.SIGUSR1, time.sleep, busy)
+    # ...and one that never returns
+    asyncio.get_running_loop().add_signal_handler(signal.SIGUSR2, time.sleep, 3600)
+
+    client = input_executor.ExecutorClient(address)
+    client.open()
+
+    def emit(event, **kw):
+        print(json.dumps({"event": event, "pid": os.getpid(), **kw}), flush=True)
+
+    def promoted(previous):
+        client.fence(fo.lease.epoch)
+        emit("promoted", epoch=fo.lease.epoch)
+
+    def demoted():
+        emit("demoted", stats=dict(client.stats))
+        os._exit(failover.EXIT_DEMOTED)
+
+    fo = failover.Failover(failover.Lease(lease_path), on_promote=promoted, on_demote=demoted)
+    fo.start()
+    while True:
+        await asyncio.sleep(0.05)
+        if fo.promoted.is_set():
+            client.keys("w", 1, 0.0)
+        emit("stats", stats=dict(client.stats))
+
+
+class Instance:
+    def __init__(self, lease_path, address, busy):
+        env = dict(os.environ, PYTHONPATH=HERE)
+        self.proc = subprocess.Popen(
+            [sys.executable, "-m", "bench.failover", "--instance", lease_path, address, "--busy", str(busy)],
+            cwd=HERE, env=env, stdout=subprocess.PIPE, text=True,
+        )
+        self.pid = self.proc.pid
+        self.promoted_at = None
+        self.demoted = None
+        self.stats = {}
+
+    def poll(self):
+        os.set_blocking(self.proc.stdout.fileno(), False)
+        for line in iter(self.proc.stdout.readline, ""):
+            message = json.loads(line)
+            if message["event"] == "promoted" and self.promoted_at is None:
+                self.promoted_at = time.perf_counter()
+            elif message["event"] == "demoted":
+                self.demoted = message["stats"]
+            if "stats" in message:
+                self.stats = message["stats"]
+
+
+async def wait_for(predicate, timeout, instances):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        for inst in instances:
+            inst.poll()
+        if predicate():
+            return True
+        await asyncio.sleep(0.01)
+    return False
+
+
+async def run(budget, busy):
+    address = f"127.0.0.1:{free_port()}"
+    lease_path = os.path.abspath("bot.lease")
+    executor = start_executor(address, os.path.abspath("sim"))
+    a = Instance(lease_path, address, busy)
+    await asyncio.sleep(0.3)
+    b = Instance(lease_path, address, busy)
+    everyone = [a, b]
+    result = {}
+    try:
+        await wait_for(lambda: a.promoted_at, 5, everyone)
+        await asyncio.sleep(1.0)
+
+        # busy: a blocked loop on the primary is not a dead primary
+        os.kill(a.pid, signal.SIGUSR1)
+        await wait_for(lambda: b.promoted_at or a.proc.poll() is not None, busy + 1.0, everyone)
+        result["busy_kept_lease"] = b.promoted_at is None and a.proc.poll() is None and a.demoted is None
+
+        # kill: the standby should notice the dead pid on its next poll
+        killed = time.perf_counter()
+        a.proc.kill()
+        a.proc.wait()
+        await wait_for(lambda: b.promoted_at, 5, everyone)
+        result["kill_takeover_s"] = b.promoted_at - killed if b.promoted_at else None
+
+        c = Instance(lease_path, address, busy)  # the supervisor's restart: a fresh standby
+        everyone.append(c)
+        await asyncio.sleep(1.0)
+
+        # stall: B is alive but frozen; C takes over on the TTL
+        stalled = time.perf_counter()
+        os.kill(b.pid, signal.SIGSTOP)
+        await wait_for(lambda: c.promoted_at, 5, everyone)
+        result["stall_takeover_s"] = c.promoted_at - stalled if c.promoted_at else None
+        await asyncio.sleep(0.5)
+        os.kill(b.pid, signal.SIGCONT)
+        await wait_for(lambda: b.demoted is not None, 5, everyone)
+        rc = b.proc.wait(timeout=5)
+        result["stalled_primary_exit"] = rc
+        result["stalled_primary_stats"] = b.demoted or b.stats
+        await asyncio.sleep(0.5)
+        for inst in everyone:
+            inst.poll()
+        result["new_primary_stats"] = c.stats
+
+        d = Instance(lease_path, address, busy)
+        everyone.append(d)
+        await asyncio.sleep(1.0)
+
+        # hang: C's loop is stuck but its beat thread isn't; D takes over once the renewals stop
+        hung = time.perf_counter()
+        os.kill(c.pid, signal.SIGUSR2)
+        await wait_for(lambda: d.promoted_at, failover.MAX_LOOP_STALL + 5, everyone)
+        result["hang_takeover_s"] = d.promoted_at - hung if d.promoted_at else None
+    finally:
+        for inst in everyone:
+            if inst.proc.poll() is None:
+                inst.proc.kill()
+                inst.proc.wait()
+        executor.kill()
+        executor.wait()
+    result["within_budget"] = all(
+        result.get(k) is not None and result[k] <= budget for k in ("kill_takeover_s", "stall_takeover_s")
+    ) and result.get("hang_takeover_s") is not None and result["hang_takeover_s"] <= failover.MAX_LOOP_STALL + budget
+    result["fenced_ok"] = result.get("new_primary_stats", {}).get("fenced", 0) == 0
+    result["busy_seconds"] = busy
+    return result
+
+
+def print_report(r, budget):
+    def s(v):
+        return "-" if v is None else f"{v * 1000:.0f}ms"
+
+    print(f"\nbusy:  primary's loop blocked {r['busy_seconds']}s; "
+          f"{'kept the lease' if r.get('busy_kept_lease') else 'LOST THE LEASE'}")
+    print(f"kill:  standby took over in {s(r.get('kill_takeover_s'))} (budget {budget * 1000:.0f}ms)")
+    print(f"stall: standby took over in {s(r.get('stall_takeover_s'))}; old primary exited "
+          f"{r.get('stalled_primary_exit')} with ops {r.get('stalled_primary_stats')}")
+    print(f"new primary ops {r.get('new_primary_stats')}")
+    print(f"hang:  standby took over in {s(r.get('hang_takeover_s'))}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", type=float, default=3.0, help="seconds allowed for a takeover")
+    parser.add_argument("--busy", type=float, default=2.5, help="seconds the primary's loop is blocked")
+    parser.add_argument("--instance", nargs=2, metavar=("LEASE", "ADDRESS"), help=argparse.SUPPRESS)
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args(argv)
+    if args.instance:
+        return asyncio.run(instance(*args.instance, args.busy))
+    out = os.path.abspath(args.json) if args.json else None
+
+    harness.enter_workdir()
+    result = asyncio.run(run(args.budget, args.busy))
+    print_report(result, args.budget)
+    if out:
+        with open(out, "w") as f:
+            json.dump(result, f, indent=2)
+    return 0 if result["within_budget"] and result["fenced_ok"] and result.get("busy_kept_lease") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+# bench/fake_dfu_channel.py
+"""Local stand-in for the CommandChannel mod (dfu_mods/CommandChannel.cs).
+
+Speaks the same JSON lines as the mod and acknowledges each command
+after `frame` seconds, the way the mod answers on the next Update():
+
+    channel = FakeDFUChannel(handler=sim.run_console)
+    address = await channel.start()
+    game_input.set_channel(dfu_channel.CommandChannel(address))
+
+handler(command) runs the command (default: just record it); whatever it
+returns is the result, and an exception becomes an ok=false reply.
+`stall` makes it stop answering, to exercise the typing fallback.
+"""
+import asyncio
+import json
+import time
+
+
+class FakeDFUChannel:
+    def __init__(self, handler=None, frame=1 / 60):
+        self.handler = handler
+        self.frame = frame
+        self.address = None
+        self.received = []  # (perf_counter, command)
+        self.stall = False
+        self._server = None
+
+    async def start(self, host="127.0.0.1", port=0):
+        self._server = await asyncio.start_server(self._client, host, port)
+        port = self._server.sockets[0].getsockname()[1]
+        self.address = f"{host}:{port}"
+        return self.address
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _client(self, reader, writer):
+        try:
+            while line := await reader.readline():
+                request = json.loads(line)
+                self.received.append((time.perf_counter(), request["command"]))
+                if self.stall:
+                    continue
+                await asyncio.sleep(self.frame)
+                try:
+                    result = self.handler(request["command"]) if self.handler else None
+                    reply = {"id": request["id"], "ok": True, "result": result or ""}
+                except Exception as e:
+                    reply = {"id": request["id"], "ok": False, "error": str(e)}
+                writer.write((json.dumps(reply) + "\n").encode())
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,113 @@
+# bench/fake_twitch_irc.py
+"""Local stand-in for Twitch's IRC-over-websocket chat server.
+
+Speaks just enough of the protocol for twitchio to log in, join a channel
+and exchange PRIVMSGs. Every message we inject gets a unique `id` tag and
+a send timestamp, and every PRIVMSG the bot sends back is recorded, so
+harnesses can measure end-to-end latency.
+
+    irc = FakeTwitchIRC()
+    await irc.start()
+    irc.attach(bot)            # point twitchio at ws://127.0.0.1:<port>/
+    await bot.connect()
+    await irc.joined.wait()
+    msg_id, t = await irc.say("someuser", "!left 5")
+"""
+import asyncio
+import itertools
+import time
+import zlib
+
+import aiohttp
+import twitchio.websocket
+from aiohttp import WSMsgType, web
+
+
+class FakeTwitchIRC:
+    def __init__(self, channel="daggerwalk", bot_is_mod=True):
+        self.channel = channel
+        self.bot_is_mod = bot_is_mod
+        self.nick = None
+        self.url = None
+        self.joined = asyncio.Event()
+        self.sent = {}  # msg id -> perf_counter when we sent it to the bot
+        self.received = []  # (perf_counter, channel, text) the bot sent to chat
+        self._ws = None
+        self._ids = itertools.count(1)
+        self._runner = None
+
+    async def start(self, host="127.0.0.1", port=0):
+        app = web.Application()
+        app.router.add_get("/", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f"ws://{host}:{port}/"
+        return self.url
+
+    async def stop(self):
+        if self._ws is not None:
+            await self._ws.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def attach(self, bot, nick="daggerwalk_bot"):
+        """Point a (not yet connected) twitchio bot at this server."""
+        twitchio.websocket.HOST = self.url
+        bot._http.nick = nick  # skips the token validation HTTP call...
+        if bot._http.session is None:
+            bot._http.session = aiohttp.ClientSession()  # ...which is also where this gets made
+
+    async def _send_raw(self, line):
+        await self._ws.send_str(line + "\r\n")
+
+    async def _handle(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self._ws = ws
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            for line in msg.data.split("\r\n"):
+                if line:
+                    await self._on_line(line)
+        self._ws = None
+        return ws
+
+    async def _on_line(self, line):
+        if line.startswith("NICK "):
+            self.nick = line.split()[1]
+            await self._send_raw(f":tmi.twitch.tv 001 {self.nick} :Welcome, GLHF!")
+            await self._send_raw(f":tmi.twitch.tv 376 {self.nick} :>")
+        elif line.startswith("CAP REQ"):
+            await self._send_raw(f":tmi.twitch.tv CAP * ACK {line.split(':', 1)[1]}")
+        elif line.startswith("JOIN "):
+            chan = line.split()[1].lstrip("#")
+            nick = self.nick
+            await self._send_raw(f":{nick}!{nick}@{nick}.tmi.twitch.tv JOIN #{chan}")
+            if self.bot_is_mod:
+                await self._send_raw(
+                    f"@badge-info=;badges=moderator/1;color=;display-name={nick};mod=1;subscriber=0;user-type=mod "
+                    f":tmi.twitch.tv USERSTATE #{chan}"
+                )
+            await self._send_raw(f":{nick}.tmi.twitch.tv 353 {nick} = #{chan} :{nick}")
+            await self._send_raw(f":{nick}.tmi.twitch.tv 366 {nick} #{chan} :End of /NAMES list")
+            self.joined.set()
+        elif line.startswith("PING"):
+            await self._send_raw(":tmi.twitch.tv PONG :tmi.twitch.tv")
+        elif line.startswith("PRIVMSG #"):
+            target, text = line[len("PRIVMSG #"):].split(" :", 1)
+            self.received.append((time.perf_counter(), target, text))
+
+    async def say(self, user, text, channel=None):
+        """Inject a chat message from `user`; returns (msg_id, perf_counter sent)."""
+        chan = channel or self.channel
+        msg_id = f"bench-{next(self._ids)}"
+        tags = (f"@badge-info=;badges=;color=;display-name={user};id={msg_id};mod=0;"
+                f"subscriber=0;turbo=0;user-id={zlib.crc32(user.encode())};user-type=")
+        t = time.perf_counter()
+        self.sent[msg_id] = t
+        await self._send_raw(f"{tags} :{user}!{user}@{user}.tmi.twitch.tv PRIVMSG #{chan} :{text}")
+        return msg_id, t
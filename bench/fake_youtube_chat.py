@@ -0,0 +1,114 @@
+# bench/fake_youtube_chat.py
+"""Local stand-in for the YouTube Data API's live chat endpoints.
+
+Serves just what chat_sources.YouTubeChatSource calls:
+
+    GET  /liveBroadcasts         one active broadcast with a liveChatId
+    GET  /liveChat/messages      messages after pageToken, with pollingIntervalMillis
+    POST /liveChat/messages      the bot's replies (echoed back into chat, like YouTube does)
+
+and charges the same quota units per call, so harnesses can check what a
+session would cost.
+
+    yt = FakeYouTubeChat(poll_interval=0.5)
+    api_url = await yt.start()
+    source = chat_sources.YouTubeChatSource(api_url=api_url, token_provider=lambda: "stand-in")
+    msg_id, t = yt.say("someviewer", "!left 5")
+"""
+import itertools
+import time
+
+from aiohttp import web
+
+QUOTA_COSTS = {"broadcasts": 1, "list": 5, "insert": 50}
+
+
+class FakeYouTubeChat:
+    def __init__(self, live_chat_id="stand-in-chat", poll_interval=1.0, token="stand-in"):
+        self.live_chat_id = live_chat_id
+        self.poll_interval = poll_interval
+        self.token = token
+        self.url = None
+        self.messages = []  # API liveChatMessage resources, in order
+        self.sent = {}  # msg id -> perf_counter when we said it
+        self.received = []  # (perf_counter, text) the bot posted
+        self.quota_used = dict.fromkeys(QUOTA_COSTS, 0)
+        self.polls = 0
+        self._ids = itertools.count(1)
+        self._runner = None
+
+    async def start(self, host="127.0.0.1", port=0):
+        app = web.Application()
+        app.router.add_get("/liveBroadcasts", self._broadcasts)
+        app.router.add_get("/liveChat/messages", self._list)
+        app.router.add_post("/liveChat/messages", self._insert)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        port = self._runner.addresses[0][1]
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    @property
+    def quota_total(self):
+        return sum(self.quota_used[m] * QUOTA_COSTS[m] for m in QUOTA_COSTS)
+
+    def _authorized(self, request):
+        return request.headers.get("Authorization") == f"Bearer {self.token}"
+
+    def _add(self, name, channel_id, text, owner=False):
+        msg_id = f"yt-{next(self._ids)}"
+        self.messages.append({
+            "kind": "youtube#liveChatMessage",
+            "id": msg_id,
+            "snippet": {
+                "type": "textMessageEvent",
+                "liveChatId": self.live_chat_id,
+                "displayMessage": text,
+                "textMessageDetails": {"messageText": text},
+            },
+            "authorDetails": {"channelId": channel_id, "displayName": name,
+                              "isChatOwner": owner, "isChatModerator": False},
+        })
+        return msg_id
+
+    def say(self, name, text):
+        """A viewer chats; returns (msg_id, perf_counter said)."""
+        msg_id = self._add(name, f"UC-{name}", text)
+        t = time.perf_counter()
+        self.sent[msg_id] = t
+        return msg_id, t
+
+    async def _broadcasts(self, request):
+        if not self._authorized(request):
+            return web.json_response({"error": {"code": 401}}, status=401)
+        self.quota_used["broadcasts"] += 1
+        return web.json_response({"items": [{"id": "stand-in-broadcast", "snippet": {"liveChatId": self.live_chat_id}}]})
+
+    async def _list(self, request):
+        if not self._authorized(request):
+            return web.json_response({"error": {"code": 401}}, status=401)
+        if request.query.get("liveChatId") != self.live_chat_id:
+            return web.json_response({"error": {"code": 404, "message": "liveChatNotFound"}}, status=404)
+        self.quota_used["list"] += 1
+        self.polls += 1
+        start = int(request.query.get("pageToken") or 0)
+        return web.json_response({
+            "items": self.messages[start:],
+            "nextPageToken": str(len(self.messages)),
+            "pollingIntervalMillis": int(self.poll_interval * 1000),
+        })
+
+    async def _insert(self, request):
+        if not self._authorized(request):
+            return web.json_response({"error": {"code": 401}}, status=401)
+        self.quota_used["insert"] += 1
+        body = await request.json()
+        text = body["snippet"]["textMessageDetails"]["messageText"]
+        self.received.append((time.perf_counter(), text))
+        msg_id = self._add("Daggerwalk", "UC-daggerwalk", text, owner=True)
+        return web.json_response({"id": msg_id, "snippet": body["snippet"]})
@@ -0,0 +1,180 @@
+# bench/harness.py
+"""Shared pieces for running the real DaggerfallBot offline.
+
+make_bot() builds a DaggerfallBot whose outbound integrations (Django,
+Helix, Bluesky) are replaced with local no-ops and whose keystrokes go to
+a RecordingBackend. Everything else - command parsing, dispatch, votes,
+chat replies, the blocking sleeps between keystrokes - is the real code.
+"""
+import asyncio
+import contextvars
+import os
+import tempfile
+import time
+
+# Which injected chat message the current task is handling
+current_msg = contextvars.ContextVar("bench_current_msg", default=None)
+
+# A plausible Django /log/ response, enough for !info and !quest
+SAMPLE_RESPONSE = {
+    "log": {
+        "region": "Daggerfall",
+        "location": "Ashfield Hall",
+        "weather": "Cloudy",
+        "season": "Summer",
+        "current_song": "song_gsunny2",
+        "date": "Tirdas, 14 Sun's Height, 3E 406, 13:42:10",
+        "region_fk": {"climate": "Woodlands", "emoji": "🌲"},
+        "poi": {"emoji": "🏰"},
+    },
+    "quest_completed": False,
+    "completed_quest": None,
+    "current_quest": {
+        "description": "Visit the ruins of Castle Wayrest.",
+        "poi": {"region": {"name": "Wayrest"}},
+        "xp": 50,
+    },
+}
+
+
+def percentile(values, p):
+    """Nearest-rank percentile; p in 0..100."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(p / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[k]
+
+
+def summarize(values):
+    return {
+        "n": len(values),
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else None,
+    }
+
+
+def enter_workdir():
+    """Run in a scratch dir so chat_commands_log.txt/daggerwalk.log don't touch the real ones."""
+    path = tempfile.mkdtemp(prefix="daggerwalk-bench-")
+    os.chdir(path)
+    return path
+
+
+class FakeChannel:
+    """Stands in for twitchio's Channel; records what the bot says."""
+
+    def __init__(self, name="daggerwalk"):
+        self.name = name
+        self.sent = []  # (perf_counter, text)
+
+    async def send(self, content):
+        self.sent.append((time.perf_counter(), content))
+
+
+class FakeAuthor:
+    def __init__(self, name):
+        self.name = name
+        self.display_name = name
+
+
+class FakeMessage:
+    """Just the parts of twitchio's Message that DaggerfallBot reads."""
+
+    def __init__(self, author, content, channel, msg_id):
+        self.author = FakeAuthor(author)
+        self.content = content
+        self.channel = channel
+        self.tags = {"id": msg_id, "display-name": author}
+        self.echo = False
+
+
+class Recorder:
+    """Collects first-keystroke and handled times per injected message."""
+
+    def __init__(self):
+        self.first_key = {}  # msg id -> perf_counter of first keystroke
+        self.handled = {}  # msg id -> perf_counter when handle_message returned
+        self.commands = {}  # msg id -> command name
+        self.inflight = 0
+
+    def on_key(self, key, t):
+        msg_id = current_msg.get()
+        if msg_id is not None and msg_id not in self.first_key:
+            self.first_key[msg_id] = t
+
+
+def make_bot(recorder, vote_duration=2.0, chat_delay=0.0, channel=None):
+    """Build a DaggerfallBot wired for offline runs. Call inside a running loop.
+
+    With `channel` the bot talks to that FakeChannel instead of IRC.
+    """
+    import daggerwalk_twitch_bot as dwb
+    import game_input
+    import music_index
+
+    dwb.Config._params = {"OAUTH_TOKEN": "oauth:bench", "CLIENT_ID": "bench"}
+    dwb.Config.VOTING_DURATION = vote_duration
+    dwb.Config.CHAT_DELAY = chat_delay
+    game_input.set_backend(game_input.RecordingBackend(listener=recorder.on_key))
+
+    class BenchBot(dwb.DaggerfallBot):
+        @property
+        def connected_channels(self):
+            return [channel] if channel is not None else super().connected_channels
+
+        async def event_ready(self):
+            # Only the parts of startup that need no network
+            self._startup_tasks_started = True
+            self.music = music_index.load()
+            self._set_response(SAMPLE_RESPONSE)
+            self._state_ready.set()
+            self.chat_bus.start()
+
+        async def handle_message(self, message):
+            msg_id = (message.tags or {}).get("id") if message.author else None
+            if msg_id is None:
+                return await super().handle_message(message)
+            current_msg.set(msg_id)
+            parts = message.content.split()
+            recorder.commands[msg_id] = parts[0][1:].lower() if parts and parts[0].startswith("!") else "chat"
+            recorder.inflight += 1
+            try:
+                await super().handle_message(message)
+            finally:
+                recorder.inflight -= 1
+                recorder.handled[msg_id] = time.perf_counter()
+
+        async def refresh_now(self):
+            self._set_response(SAMPLE_RESPONSE)
+            return True
+
+        async def set_stream_tags(self):
+            pass
+
+        async def update_stream_title(self, title):
+            pass
+
+    return BenchBot()
+
+
+async def drain(recorder, bot, idle=1.0, timeout=120.0):
+    """Wait until no message is being handled, no vote is running and no input is queued."""
+    import daggerwalk_twitch_bot as dwb
+
+    deadline = time.monotonic() + timeout
+    quiet_since = None
+    while time.monotonic() < deadline:
+        busy = recorder.inflight > 0 or bot.voting_active
+        if busy:
+            quiet_since = None
+        elif quiet_since is None:
+            quiet_since = time.monotonic()
+        elif time.monotonic() - quiet_since >= idle:
+            # In process, keys are still being pressed after their handler returned
+            await asyncio.wrap_future(dwb._input_worker.submit(lambda: None))
+            return True
+        await asyncio.sleep(0.05)
+    return False
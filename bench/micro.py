@@ -0,0 +1,188 @@
+# bench/micro.py
+"""Microbenchmarks for the bot's pure hot paths.
+
+    python -m bench.micro                                # run, print
+    python -m bench.micro --save-baseline micro_baseline.json
+    python -m bench.micro --baseline micro_baseline.json --threshold 0.2
+
+Each case runs `number` calls per repeat and keeps the per-call median
+and minimum over `repeat` repeats. With --baseline, any case whose median
+is more than --threshold slower than the baseline's is flagged and the
+exit status is 1. Baselines are machine-specific; make them on the
+machine you compare on.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+from bench import harness
+
+
+def _mapdata_text():
+    import sim_game
+    return json.dumps(sim_game.SimGame(data_dir=os.getcwd(), seed=1).snapshot(), indent=2)
+
+
+def _completed_quest_response():
+    return dict(harness.SAMPLE_RESPONSE, quest_completed=True,
+                completed_quest={"name": "Castle Wayrest", "xp": 50})
+
+
+def build_cases(bot, channel):
+    """name -> (callable, is_async)"""
+    import daggerwalk_twitch_bot as dwb
+
+    mapdata_text = _mapdata_text()
+    mapdata = bot.normalize_map_data(json.loads(mapdata_text))
+    completed = _completed_quest_response()
+    ballots = {f"viewer{i}": ("yes" if i % 3 else "no") for i in range(200)}
+    messages = {
+        "chat": harness.FakeMessage("viewer1", "hello chat, what a nice walk", channel, "m-chat"),
+        "unknown_command": harness.FakeMessage("viewer1", "!nosuchcommand 5", channel, "m-cmd"),
+        "vote": harness.FakeMessage("viewer2", "!yes", channel, "m-vote"),
+    }
+
+    async def vote_ballot():
+        bot.voting_active, bot.current_vote_type = True, "weather"
+        await bot.handle_message(messages["vote"])
+
+    import spatial_index
+    places = bot.places = spatial_index.SpatialIndex(os.path.abspath("spatial_index.bin"))
+    places.record(212, 290, harness.SAMPLE_RESPONSE["log"])
+    places.record(200, 300, {"region": "Ocean"})
+    sample = dict(mapdata, mapPixelX="212", mapPixelY="290", region="Daggerfall", location="Ashfield Hall")
+
+    def ocean_lookup():
+        places._near_cache.clear()  # measure the ring search, not the cache
+        return places.lookup(200, 300, region="Ocean")
+
+    return {
+        "event_message_chat": (lambda: bot.handle_message(messages["chat"]), True),
+        "event_message_unknown_command": (lambda: bot.handle_message(messages["unknown_command"]), True),
+        "event_message_vote": (vote_ballot, True),
+        "mapdata_parse_normalize": (lambda: bot.normalize_map_data(json.loads(mapdata_text)), False),
+        "build_django_payload": (lambda: dwb.build_django_payload(mapdata), False),
+        "build_status_line": (lambda: bot.build_status_line(harness.SAMPLE_RESPONSE), False),
+        "render_response": (bot._render_response, False),
+        "spatial_lookup": (lambda: places.lookup(212, 290, region="Daggerfall", location="Ashfield Hall"), False),
+        "spatial_lookup_ocean": (ocean_lookup, False),
+        "render_local": (lambda: bot._render_local(sample), False),
+        "quest_track_sample": (lambda: bot.quest_tracker.update(sample), False),
+        "info_command": (bot.game_info, True),
+        "quest_command": (bot.quest, True),
+        "format_quest_lines": (lambda: bot._format_quest_lines_from_response(harness.SAMPLE_RESPONSE), False),
+        "format_quest_lines_completed": (lambda: bot._format_quest_lines_from_response(completed), False),
+        "tally_votes_200": (lambda: bot.tally_votes(ballots), False),
+        "build_live_text": (lambda: bot.build_live_text("Daggerfall", "Rainy", "13:42:10"), False),
+        "song_resolve_number": (lambda: bot.music.resolve("127"), False),
+        "song_resolve_prefix": (lambda: bot.music.resolve("gsunny"), False),
+        "song_resolve_fuzzy": (lambda: bot.music.resolve("song_gsuny2"), False),
+    }
+
+
+async def time_case(fn, is_async, number, repeat):
+    per_call = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if is_async:
+            for _ in range(number):
+                await fn()
+        else:
+            for _ in range(number):
+                fn()
+        per_call.append((time.perf_counter() - start) / number)
+    return {"median_us": statistics.median(per_call) * 1e6, "min_us": min(per_call) * 1e6,
+            "number": number, "repeat": repeat}
+
+
+async def run(number, repeat, only=None):
+    import logging
+    logging.disable(logging.INFO)  # the handlers log every call; measure the code, not the log file
+
+    recorder = harness.Recorder()
+    channel = harness.FakeChannel()
+    bot = harness.make_bot(recorder, channel=channel)
+    await bot.event_ready()
+    cases = build_cases(bot, channel)
+
+    results = {}
+    for name, (fn, is_async) in cases.items():
+        if only and name not in only:
+            continue
+        await time_case(fn, is_async, max(1, number // 10), 1)  # warm up
+        results[name] = await time_case(fn, is_async, number, repeat)
+        bot.voting_active = False
+        channel.sent.clear()
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cases": results,
+    }
+
+
+def compare(result, baseline, threshold):
+    """[(name, baseline_us, current_us, ratio)] for cases slower than baseline by more than threshold."""
+    regressions = []
+    for name, cur in result["cases"].items():
+        base = baseline.get("cases", {}).get(name)
+        if not base:
+            continue
+        ratio = cur["median_us"] / base["median_us"] if base["median_us"] else float("inf")
+        if ratio > 1 + threshold:
+            regressions.append((name, base["median_us"], cur["median_us"], ratio))
+    return regressions
+
+
+def print_report(result, baseline=None):
+    print(f"\n{'case':<32}{'median us':>12}{'min us':>10}{'baseline':>10}{'change':>9}")
+    for name, r in result["cases"].items():
+        base = (baseline or {}).get("cases", {}).get(name)
+        base_s = f"{base['median_us']:.2f}" if base else "-"
+        change = f"{(r['median_us'] / base['median_us'] - 1) * 100:+.0f}%" if base and base["median_us"] else "-"
+        print(f"{name:<32}{r['median_us']:>12.2f}{r['min_us']:>10.2f}{base_s:>10}{change:>9}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=2000, help="calls per repeat")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--case", action="append", help="only run this case (repeatable)")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="compare against this results file")
+    parser.add_argument("--save-baseline", help="write results here as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown, 0.2 = 20%%")
+    args = parser.parse_args(argv)
+    paths = {k: os.path.abspath(v) for k, v in
+             (("json", args.json), ("baseline", args.baseline), ("save", args.save_baseline)) if v}
+
+    baseline = None
+    if "baseline" in paths:
+        with open(paths["baseline"]) as f:
+            baseline = json.load(f)
+
+    harness.enter_workdir()
+    result = asyncio.run(run(args.number, args.repeat, args.case))
+    print_report(result, baseline)
+
+    for key in ("json", "save"):
+        if key in paths:
+            with open(paths[key], "w") as f:
+                json.dump(result, f, indent=2)
+
+    if baseline is not None:
+        regressions = compare(result, baseline, args.threshold)
+        for name, base, cur, ratio in regressions:
+            print(f"REGRESSION {name}: {base:.2f}us -> {cur:.2f}us ({(ratio - 1) * 100:+.0f}%)")
+        if regressions:
+            return 1
+        print(f"No regressions over {args.threshold:.0%}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+# bench/multi_source.py
+"""Twitch and YouTube chat at once, through the chat bus, against local stand-ins.
+
+    python -m bench.multi_source --rate 10 --duration 15 --youtube-share 0.3
+
+Twitch messages go in through bot.event_message (as twitchio delivers
+them); YouTube messages come from FakeYouTubeChat and are picked up by
+the real YouTubeChatSource poller. Reports per-source latency (said ->
+handled), whether replies went back to the source they came from (after
+a burst of broadcasts, which must not spend YouTube's reply quota), and
+the YouTube quota the session spent.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+from bench import harness
+from bench.fake_youtube_chat import FakeYouTubeChat
+from bench.command_latency import MIXES
+
+# Commands whose only output is a reply to the sender
+REPLY_PROBE = "!left"  # no count -> "Enter the movement command followed by n ..."
+ANNOUNCEMENTS = 6  # broadcasts sent up front, more than YouTube's announcement budget holds
+
+
+async def run(rate, duration, youtube_share, poll_interval, quota, seed):
+    import chat_sources
+
+    rng = random.Random(seed)
+    recorder = harness.Recorder()
+    twitch = harness.FakeChannel()
+    bot = harness.make_bot(recorder, vote_duration=2.0, channel=twitch)
+
+    yt = FakeYouTubeChat(poll_interval=poll_interval)
+    await yt.start()
+    source = chat_sources.YouTubeChatSource(api_url=yt.url, token_provider=lambda: yt.token, quota_per_day=quota)
+    source.MIN_POLL_INTERVAL = min(source.MIN_POLL_INTERVAL, poll_interval)
+    bot.chat_bus.add(source)
+    await bot.event_ready()
+    while source.page_token is None:  # first poll (skips any backlog)
+        await asyncio.sleep(0.05)
+    # Timed posts and votes go everywhere; on YouTube they mustn't eat the replies' quota
+    for i in range(ANNOUNCEMENTS):
+        await bot.chat_bus.broadcast.send(f"📢 Announcement {i}")
+
+    said = {}  # msg id -> (source, perf_counter)
+    interval = 1.0 / rate
+    start = time.perf_counter()
+    n = 0
+    probes = {"twitch": 0, "youtube": 0}
+    probe_ids = set()
+    while time.perf_counter() - start < duration:
+        user = f"viewer{rng.randrange(200)}"
+        text = REPLY_PROBE if rng.random() < 0.1 else MIXES["movement"](rng)
+        if rng.random() < youtube_share:
+            msg_id, t = yt.say(user, text)
+            said[msg_id] = ("youtube", t)
+        else:
+            msg_id = f"tw-{n}"
+            said[msg_id] = ("twitch", time.perf_counter())
+            await bot.event_message(harness.FakeMessage(user, text, twitch, msg_id))
+        if text == REPLY_PROBE:
+            probe_ids.add(msg_id)
+        n += 1
+        await asyncio.sleep(max(0.0, start + n * interval - time.perf_counter()))
+
+    await asyncio.sleep(poll_interval * 2)  # last YouTube poll
+    drained = await harness.drain(recorder, bot)
+    elapsed = time.perf_counter() - start
+    await yt.stop()
+
+    # A probe only needs a reply once it was handled; YouTube chat said after
+    # the quota stopped polling isn't picked up within the run
+    for msg_id in probe_ids & recorder.handled.keys():
+        probes[said[msg_id][0]] += 1
+    latency = {"twitch": [], "youtube": []}
+    for msg_id, (src, t) in said.items():
+        if msg_id in recorder.handled:
+            latency[src].append(recorder.handled[msg_id] - t)
+    prompt = "Enter the movement command"
+    replies = {
+        "twitch": sum(prompt in text for _, text in twitch.sent),
+        "youtube": sum(prompt in text for _, text in yt.received),
+    }
+    return {
+        "sent": n,
+        "handled": len(recorder.handled),
+        "elapsed_s": elapsed,
+        "drained": drained,
+        "latency": {src: harness.summarize(v) for src, v in latency.items()},
+        "reply_probes": probes,
+        "replies_routed": replies,
+        "announcements": {
+            "sent": ANNOUNCEMENTS,
+            "twitch": sum("📢" in text for _, text in twitch.sent),
+            "youtube": sum("📢" in text for _, text in yt.received),
+        },
+        "youtube_polls": yt.polls,
+        "youtube_quota_units": yt.quota_total,
+        "youtube_quota_per_hour": yt.quota_total / elapsed * 3600 if elapsed else 0.0,
+    }
+
+
+def _ms(v):
+    return "-" if v is None else f"{v * 1000:.0f}"
+
+
+def print_report(r):
+    print(f"\n== {r['sent']} messages, handled {r['handled']} in {r['elapsed_s']:.1f}s"
+          f"{'' if r['drained'] else ' (did not drain!)'} ==")
+    for src, s in r["latency"].items():
+        print(f"{src:<8} n={s['n']:<5} said->handled p50 {_ms(s['p50'])}ms p99 {_ms(s['p99'])}ms max {_ms(s['max'])}ms")
+    for src in ("twitch", "youtube"):
+        ok = r["replies_routed"][src] == r["reply_probes"][src]
+        print(f"{src:<8} replies {r['replies_routed'][src]}/{r['reply_probes'][src]} to the right source"
+              f"{'' if ok else '  MISMATCH'}")
+    a = r["announcements"]
+    print(f"broadcasts {a['sent']} sent: twitch {a['twitch']}, youtube {a['youtube']} (the rest over its budget)")
+    print(f"youtube  {r['youtube_polls']} polls, {r['youtube_quota_units']} quota units "
+          f"(~{r['youtube_quota_per_hour']:.0f}/hour at this rate)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=10.0, help="chat messages per second, both sources")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--youtube-share", type=float, default=0.3, help="fraction of messages from YouTube")
+    parser.add_argument("--poll-interval", type=float, default=0.5, help="stand-in pollingIntervalMillis / 1000")
+    parser.add_argument("--quota", type=int, default=6000,
+                        help="YouTube units/day for chat (the bot's YOUTUBE_CHAT_QUOTA); raise it to take pacing out")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args(argv)
+    out = os.path.abspath(args.json) if args.json else None
+
+    harness.enter_workdir()
+    result = asyncio.run(run(args.rate, args.duration, args.youtube_share, args.poll_interval, args.quota, args.seed))
+    print_report(result)
+    if out:
+        with open(out, "w") as f:
+            json.dump(result, f, indent=2)
+    ok = result["replies_routed"] == result["reply_probes"]
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
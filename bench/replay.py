@@ -0,0 +1,189 @@
+# bench/replay.py
+"""Replay recorded chat into the real bot, faster than real time.
+
+    python -m bench.replay chat_commands_log.txt --speed 20
+    python -m bench.replay daggerwalk.log --speed 100 --start 2025-03-01T18:00 --minutes 60
+
+Reads either chat_commands_log.txt ("ts | user | command | args") or the
+"Chat: user: text" lines of daggerwalk.log, and dispatches each message to
+DaggerfallBot.event_message as its own task (as twitchio does) at its
+recorded offset divided by --speed. Chat goes to a FakeChannel and
+keystrokes to a RecordingBackend; Config.VOTING_DURATION and CHAT_DELAY
+are scaled by --speed too. The blocking sleeps between keystrokes are not,
+so at high speeds the report shows how far the bot falls behind real peak
+traffic.
+"""
+import argparse
+import asyncio
+import collections
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime, timezone
+
+from bench import harness
+
+CHAT_LOG_LINE = re.compile(r"^(?P<ts>\S+) \| (?P<user>[^|]+?) \| (?P<command>[^|]+?) \| ?(?P<args>.*)$")
+BOT_LOG_LINE = re.compile(r"^(?P<ts>\d{4}-\d\d-\d\d \d\d:\d\d:\d\d,\d{3}) - INFO - Chat: (?P<user>[^:]+): (?P<text>.*)$")
+VOTE_ENDED = re.compile(r"Vote ended for:【(?P<what>.*)】- Yes: (?P<yes>\d+) \| No: (?P<no>\d+)")
+
+
+def parse_line(line):
+    """(utc datetime, user, text) for a recorded chat line, or None."""
+    m = CHAT_LOG_LINE.match(line)
+    if m:
+        ts = datetime.fromisoformat(m["ts"])
+        args = m["args"].strip()
+        return ts, m["user"].strip(), f"!{m['command'].strip()}" + (f" {args}" if args else "")
+    m = BOT_LOG_LINE.match(line)
+    if m:
+        # daggerwalk.log timestamps are local time
+        ts = datetime.strptime(m["ts"], "%Y-%m-%d %H:%M:%S,%f").astimezone(timezone.utc)
+        return ts, m["user"].strip(), m["text"]
+    return None
+
+
+def load_session(paths, start=None, minutes=None, limit=None, include_bot=False):
+    """Recorded messages sorted by time, as [(seconds from first, user, text)]."""
+    import daggerwalk_twitch_bot as dwb
+
+    entries = []
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                parsed = parse_line(line.rstrip("\n"))
+                if parsed and (include_bot or parsed[1].lower() != dwb.Config.BOT_USERNAME):
+                    entries.append(parsed)
+    entries.sort(key=lambda e: e[0])
+    if start:
+        entries = [e for e in entries if e[0] >= start]
+    if minutes and entries:
+        end = entries[0][0].timestamp() + minutes * 60
+        entries = [e for e in entries if e[0].timestamp() <= end]
+    if limit:
+        entries = entries[:limit]
+    if not entries:
+        return []
+    t0 = entries[0][0].timestamp()
+    return [(ts.timestamp() - t0, user, text) for ts, user, text in entries]
+
+
+async def replay(session, speed):
+    import daggerwalk_twitch_bot as dwb
+
+    recorder = harness.Recorder()
+    channel = harness.FakeChannel()
+    bot = harness.make_bot(
+        recorder,
+        vote_duration=dwb.Config.VOTING_DURATION / speed,
+        chat_delay=dwb.Config.CHAT_DELAY / speed,
+        channel=channel,
+    )
+    await bot.event_ready()
+
+    scheduled = {}  # msg id -> perf_counter the message was due
+    dispatch_lag = []
+    tasks = []
+    start = time.perf_counter()
+    for i, (offset, user, text) in enumerate(session):
+        due = start + offset / speed
+        await asyncio.sleep(max(0.0, due - time.perf_counter()))
+        msg_id = f"replay-{i}"
+        scheduled[msg_id] = due
+        dispatch_lag.append(time.perf_counter() - due)
+        msg = harness.FakeMessage(user, text, channel, msg_id)
+        tasks.append(asyncio.create_task(bot.event_message(msg)))
+    send_elapsed = time.perf_counter() - start
+
+    drained = await harness.drain(recorder, bot)
+    elapsed = time.perf_counter() - start
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    per_cmd = collections.defaultdict(list)
+    for msg_id, cmd in recorder.commands.items():
+        if msg_id in recorder.handled:
+            per_cmd[cmd].append(recorder.handled[msg_id] - scheduled[msg_id])
+
+    keystrokes = game_keystrokes()
+    recorded_span = session[-1][0] if session else 0.0
+    votes = [
+        {"vote": m["what"], "yes": int(m["yes"]), "no": int(m["no"]), "passed": int(m["yes"]) > int(m["no"])}
+        for _, text in channel.sent if (m := VOTE_ENDED.search(text))
+    ]
+    return {
+        "speed": speed,
+        "messages": len(session),
+        "recorded_span_s": recorded_span,
+        "ideal_replay_s": recorded_span / speed,
+        "send_elapsed_s": send_elapsed,
+        "total_elapsed_s": elapsed,
+        "drained": drained,
+        "dispatch_lag": harness.summarize(dispatch_lag),
+        "handled": len(recorder.handled),
+        "chat_messages_sent": len(channel.sent),
+        "keystrokes": len(keystrokes),
+        "keystrokes_by_key": dict(collections.Counter(k for _, k in keystrokes).most_common()),
+        "votes": votes,
+        "commands": {cmd: harness.summarize(v) for cmd, v in sorted(per_cmd.items())},
+    }
+
+
+def game_keystrokes():
+    import game_input
+    return game_input.get_backend().keystrokes
+
+
+def _ms(v):
+    return "-" if v is None else f"{v * 1000:.0f}"
+
+
+def print_report(r):
+    print(f"\n== replay {r['messages']} messages spanning {r['recorded_span_s'] / 60:.1f} min at {r['speed']}x ==")
+    print(f"ideal {r['ideal_replay_s']:.1f}s, sent in {r['send_elapsed_s']:.1f}s, done in {r['total_elapsed_s']:.1f}s"
+          f"{'' if r['drained'] else ' (did not drain!)'}")
+    lag = r["dispatch_lag"]
+    print(f"dispatch lag p50 {_ms(lag['p50'])}ms p99 {_ms(lag['p99'])}ms max {_ms(lag['max'])}ms")
+    print(f"handled {r['handled']}, chat messages sent {r['chat_messages_sent']}, keystrokes {r['keystrokes']}")
+    if r["keystrokes_by_key"]:
+        print("  keys: " + ", ".join(f"{k!r}x{n}" for k, n in list(r["keystrokes_by_key"].items())[:12]))
+    for v in r["votes"]:
+        print(f"  vote {v['vote']}: yes {v['yes']} / no {v['no']} -> {'passed' if v['passed'] else 'failed'}")
+    print(f"{'command':<12}{'n':>6}{'p50':>10}{'p99':>10}{'max':>10}  (ms, due -> handled)")
+    for cmd, s in r["commands"].items():
+        print(f"{cmd:<12}{s['n']:>6}{_ms(s['p50']):>10}{_ms(s['p99']):>10}{_ms(s['max']):>10}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("logs", nargs="+", help="chat_commands_log.txt or daggerwalk.log (not both: commands would be doubled)")
+    parser.add_argument("--speed", type=float, default=10.0, help="1-100x real time")
+    parser.add_argument("--start", type=datetime.fromisoformat, help="skip messages before this (UTC)")
+    parser.add_argument("--minutes", type=float, help="only replay this many minutes from the first message")
+    parser.add_argument("--limit", type=int, help="only replay the first N messages")
+    parser.add_argument("--include-bot", action="store_true", help="also replay the bot's own logged commands")
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args(argv)
+    if not 1 <= args.speed <= 100:
+        parser.error("--speed must be between 1 and 100")
+
+    start = args.start.replace(tzinfo=args.start.tzinfo or timezone.utc) if args.start else None
+    logs = [os.path.abspath(p) for p in args.logs]
+    out = os.path.abspath(args.json) if args.json else None
+
+    harness.enter_workdir()
+    session = load_session(logs, start, args.minutes, args.limit, args.include_bot)
+    if not session:
+        print("No chat lines found to replay.")
+        return 1
+    result = asyncio.run(replay(session, args.speed))
+    print_report(result)
+    if out:
+        with open(out, "w") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+# bench/split_processes.py
+"""Bot-side ExecutorClient against a real input_executor.py process (on sim_game).
+
+    python -m bench.split_processes --rate 5 --duration 12 --kill-at 4 --down-for 3
+
+Sends movement ops at a steady rate, kills the executor part way through
+and starts a new one, the way the supervisor does after a DFU crash. The
+"bot" side here is just the client on an event loop: it should never
+block, whatever the executor is doing. Reports op outcomes (ok / lost /
+expired) and the worst loop stall.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+from bench import harness
+
+HERE = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+KEYS = ["w", "s", "a", "d", "\\"]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_executor(address, sim_dir):
+    env = dict(os.environ, DAGGERWALK_SIM="1", DAGGERWALK_SIM_DIR=sim_dir, DAGGERWALK_EXECUTOR=address,
+               PYTHONPATH=HERE)
+    return subprocess.Popen([sys.executable, os.path.join(HERE, "input_executor.py")], env=env)
+
+
+async def run(rate, duration, kill_at, down_for, delay, seed):
+    import input_executor
+
+    rng = random.Random(seed)
+    address = f"127.0.0.1:{free_port()}"
+    sim_dir = os.path.abspath("sim")
+    proc = start_executor(address, sim_dir)
+    restarted = False
+
+    client = input_executor.ExecutorClient(address)
+    client.open()
+
+    stalls = []
+
+    async def watch_loop():
+        while True:
+            t = time.perf_counter()
+            await asyncio.sleep(0.01)
+            stalls.append(time.perf_counter() - t - 0.01)
+
+    watcher = asyncio.create_task(watch_loop())
+    start = time.perf_counter()
+    n = 0
+    while time.perf_counter() - start < duration:
+        elapsed = time.perf_counter() - start
+        if proc is not None and elapsed >= kill_at and not restarted:
+            proc.kill()
+            proc.wait()
+            proc = None
+        if proc is None and elapsed >= kill_at + down_for:
+            proc = start_executor(address, sim_dir)
+            restarted = True
+        client.keys(rng.choice(KEYS), repeat=rng.randint(1, 3), delay=delay)
+        n += 1
+        await asyncio.sleep(max(0.0, start + n / rate - time.perf_counter()))
+
+    # Let the last ops finish
+    settle = time.perf_counter() + 5
+    while (client._outbox or client._inflight) and time.perf_counter() < settle:
+        await asyncio.sleep(0.05)
+    watcher.cancel()
+    if proc is not None:
+        proc.kill()
+        proc.wait()
+    return {
+        "sent": n,
+        "results": dict(client.stats),
+        "unsettled": len(client._outbox) + len(client._inflight),
+        "max_loop_stall_ms": max(stalls, default=0.0) * 1000,
+    }
+
+
+def print_report(r):
+    print(f"\n== {r['sent']} ops, {r['unsettled']} unsettled ==")
+    for result in ("ok", "error", "lost", "expired"):
+        print(f"{result:<8} {r['results'].get(result, 0)}")
+    print(f"worst event-loop stall on the bot side: {r['max_loop_stall_ms']:.1f}ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=5.0, help="ops per second")
+    parser.add_argument("--duration", type=float, default=12.0)
+    parser.add_argument("--kill-at", type=float, default=4.0, help="seconds in; kill the executor")
+    parser.add_argument("--down-for", type=float, default=3.0, help="seconds before starting a new one")
+    parser.add_argument("--delay", type=float, default=0.05, help="seconds between repeated keystrokes")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args(argv)
+    out = os.path.abspath(args.json) if args.json else None
+
+    harness.enter_workdir()
+    result = asyncio.run(run(args.rate, args.duration, args.kill_at, args.down_for, args.delay, args.seed))
+    print_report(result)
+    if out:
+        with open(out, "w") as f:
+            json.dump(result, f, indent=2)
+    return 0 if result["unsettled"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
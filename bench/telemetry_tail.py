@@ -0,0 +1,104 @@
+# bench/telemetry_tail.py
+"""TailReader against a fast TelemetryWriter, through rotations and a truncation.
+
+    python -m bench.telemetry_tail --rate 200 --duration 5 --max-bytes 65536
+
+A writer thread appends sim_game snapshots at --rate per second, rotating
+at --max-bytes, and truncates the file once half way through (like a
+mod reinstall wiping it). The reader polls every --poll seconds. Reports
+samples read vs written, gaps and duplicates by seq, and the reader's
+CPU time per poll and per sample.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+from bench import harness
+
+
+def run(rate, duration, max_bytes, poll):
+    import sim_game
+    import telemetry
+
+    path = os.path.abspath("MapData.ndjson")
+    sample = sim_game.SimGame("sim", seed=1).snapshot()
+    writer = telemetry.TelemetryWriter(path, max_bytes=max_bytes)
+    reader = telemetry.TailReader(path, from_start=True)
+    stop = threading.Event()
+    truncated_at = []
+
+    def write():
+        start = time.perf_counter()
+        n = 0
+        while not stop.is_set():
+            writer.write(sample)
+            n += 1
+            if not truncated_at and time.perf_counter() - start > duration / 2:
+                open(path, "w").close()
+                truncated_at.append(writer.seq)
+            time.sleep(max(0.0, start + n / rate - time.perf_counter()))
+
+    thread = threading.Thread(target=write, daemon=True)
+    thread.start()
+    seqs, cpu, polls = [], 0.0, 0
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        t = time.thread_time()
+        seqs += [s["seq"] for s in reader.read()]
+        cpu += time.thread_time() - t
+        polls += 1
+        time.sleep(poll)
+    stop.set()
+    thread.join()
+    t = time.thread_time()
+    seqs += [s["seq"] for s in reader.read()]
+    cpu += time.thread_time() - t
+
+    seen = set(seqs)
+    return {
+        "written": writer.seq,
+        "read": len(seqs),
+        "duplicates": len(seqs) - len(seen),
+        "out_of_order": sum(1 for a, b in zip(seqs, seqs[1:]) if b < a),
+        "missing": writer.seq - len(seen),
+        "truncated_after_seq": truncated_at[0] if truncated_at else None,
+        "polls": polls,
+        "bad_lines": reader.bad_lines,
+        "cpu_us_per_poll": cpu / polls * 1e6 if polls else 0.0,
+        "cpu_us_per_sample": cpu / len(seqs) * 1e6 if seqs else 0.0,
+        "line_bytes": len(json.dumps(sample, separators=(",", ":"))),
+    }
+
+
+def print_report(r):
+    print(f"\nwritten {r['written']}, read {r['read']} ({r['missing']} missing, {r['duplicates']} duplicates, "
+          f"{r['out_of_order']} out of order, {r['bad_lines']} bad lines)")
+    print(f"truncated after seq {r['truncated_after_seq']}; samples lost there are the only expected gap")
+    print(f"reader: {r['polls']} polls, {r['cpu_us_per_poll']:.0f}us CPU per poll, "
+          f"{r['cpu_us_per_sample']:.1f}us per sample ({r['line_bytes']} byte lines)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=200.0, help="samples written per second")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--max-bytes", type=int, default=64 * 1024, help="rotate the file past this size")
+    parser.add_argument("--poll", type=float, default=0.1, help="seconds between reads")
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args(argv)
+    out = os.path.abspath(args.json) if args.json else None
+
+    harness.enter_workdir()
+    result = run(args.rate, args.duration, args.max_bytes, args.poll)
+    print_report(result)
+    if out:
+        with open(out, "w") as f:
+            json.dump(result, f, indent=2)
+    return 0 if not result["duplicates"] and not result["out_of_order"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,23 +1,86 @@
 # bluesky_live.py
+from __future__ import annotations
+
+import logging
+import os
 from datetime import datetime, timedelta, timezone
-from atproto import Client
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from atproto import Client  # atproto takes most of a second to import; login() loads it
 
 STATUS_COLL = "app.bsky.actor.status"
 STATUS_RKEY = "self"
 MAX_MINUTES = 240
 REFRESH_EARLY = timedelta(minutes=5)
+RECONCILE_INTERVAL = timedelta(hours=2)  # how often to double-check the server copy
 
 LIVE_URI = "https://www.twitch.tv/daggerwalk"
+SESSION_FILE = "bluesky_session.txt"  # exported atproto session, reused across restarts (primary only)
+
+# Local model of what we last wrote, so steady state needs no network.
+# "live" is None until we've either written or read the record once.
+_last = {"live": None, "title": None, "desc": None, "expires": None, "reconciled_at": None}
+
+
+def _save_session(path: str, session_string: str) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(session_string)
+    os.replace(tmp, path)
+
+
+def _load_session(path: str) -> str | None:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
 
 
-def login(handle: str, app_password: str) -> Client | None:
+def login(handle: str, app_password: str, session_file: str = SESSION_FILE) -> Client | None:
+    """Resume the saved session if the server still accepts it, else log in fresh.
+
+    Every new or refreshed session is written back to session_file, so a
+    restart only hits createSession (which is rate limited) when the saved
+    tokens have been rejected.
+    """
     if not handle or not app_password:
         return None
+    from atproto import Client, SessionEvent
+
     c = Client()
+
+    def on_session_change(event, session):
+        if event in (SessionEvent.CREATE, SessionEvent.REFRESH):
+            try:
+                _save_session(session_file, session.export())
+            except Exception as e:
+                logging.error(f"Failed to save Bluesky session: {e}")
+
+    c.on_session_change(on_session_change)
+
+    saved = _load_session(session_file)
+    if saved:
+        try:
+            c.login(session_string=saved)
+            logging.info("Bluesky session resumed from file")
+            return c
+        except Exception as e:
+            logging.warning(f"Saved Bluesky session rejected, logging in again: {e}")
+            c = Client()
+            c.on_session_change(on_session_change)
+
     c.login(handle, app_password)
     return c
 
 
+def refresh_session(c: Client) -> None:
+    # Any authenticated call makes the client refresh tokens that are close to
+    # expiring; getSession is the cheapest one and fires on_session_change.
+    c.com.atproto.server.get_session()
+
+
 def _now_z() -> str:
     return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
 
@@ -46,19 +109,39 @@ def _record(title: str, desc: str) -> dict:
     }
 
 
+def _remember(live: bool, title=None, desc=None, expires=None) -> None:
+    _last.update(live=live, title=title, desc=desc, expires=expires)
+
+
+def _reconcile_due() -> bool:
+    at = _last["reconciled_at"]
+    return at is None or datetime.now(timezone.utc) - at >= RECONCILE_INTERVAL
+
+
 def set_live(c: Client, title: str, desc: str) -> None:
+    record = _record(title, desc)
     c.com.atproto.repo.put_record(
-        data={"repo": c.me.did, "collection": STATUS_COLL, "rkey": STATUS_RKEY, "record": _record(title, desc)}
+        data={"repo": c.me.did, "collection": STATUS_COLL, "rkey": STATUS_RKEY, "record": record}
     )
+    ext = record["embed"]["external"]
+    created = datetime.fromisoformat(record["createdAt"].replace("Z", "+00:00"))
+    _remember(True, ext["title"], ext["description"], created + timedelta(minutes=MAX_MINUTES))
 
 
 def clear_live(c: Client) -> None:
+    # Already cleared (by us) and not due for a server check: nothing to do
+    if _last["live"] is False and not _reconcile_due():
+        return
     c.com.atproto.repo.delete_record(
         data={"repo": c.me.did, "collection": STATUS_COLL, "rkey": STATUS_RKEY}
     )
+    _remember(False)
+    _last["reconciled_at"] = datetime.now(timezone.utc)  # a delete leaves a known server state
 
 
-def ensure_live(c: Client, title: str, desc: str) -> None:
+def _reconcile(c: Client) -> None:
+    """Replace the local model with what the server actually holds."""
+    now = datetime.now(timezone.utc)
     try:
         rec = c.com.atproto.repo.get_record(
             params={"repo": c.me.did, "collection": STATUS_COLL, "rkey": STATUS_RKEY}
@@ -68,20 +151,27 @@ def ensure_live(c: Client, title: str, desc: str) -> None:
         created = datetime.fromisoformat(val["createdAt"].replace("Z", "+00:00"))
         mins = int(val.get("durationMinutes", 0))
         exp = created + timedelta(minutes=mins) if mins else None
+        cur = val.get("embed", {}).get("external", {}) if isinstance(val.get("embed"), dict) else {}
 
-        needs_refresh = (
-            val.get("status") != "app.bsky.actor.status#live"
-            or mins != MAX_MINUTES
-            or not exp
-            or exp - datetime.now(timezone.utc) <= REFRESH_EARLY
-        )
+        live = val.get("status") == "app.bsky.actor.status#live" and mins == MAX_MINUTES and exp is not None
+        _last.update(live=live, title=cur.get("title"), desc=cur.get("description"), expires=exp)
+    except Exception:
+        # Missing or unreadable record: treat as not live so the next ensure rewrites it
+        _last.update(live=False, title=None, desc=None, expires=None)
+    _last["reconciled_at"] = now
 
-        # Update if the text changed (so it stays in sync with Twitch title)
-        cur = val.get("embed", {}).get("external", {}) if isinstance(val.get("embed"), dict) else {}
-        text_changed = (cur.get("title") != title) or (cur.get("description") != desc)
 
-        if needs_refresh or text_changed:
-            set_live(c, title, desc)
+def ensure_live(c: Client, title: str, desc: str) -> None:
+    if _reconcile_due():
+        _reconcile(c)
+
+    # Compare against the clamped text, since that's what we stored
+    text_changed = (_last["title"] != _clamp(title, 100)) or (_last["desc"] != _clamp(desc, 300))
+    needs_refresh = (
+        not _last["live"]
+        or _last["expires"] is None
+        or _last["expires"] - datetime.now(timezone.utc) <= REFRESH_EARLY
+    )
 
-    except Exception:
+    if needs_refresh or text_changed:
         set_live(c, title, desc)
@@ -0,0 +1,356 @@
+# chat_sources.py
+"""Chat from every platform onto one ordered command bus.
+
+Each source publishes its platform's messages to the ChatBus, shaped like
+twitchio's Message (.author.name, .content, .channel.send, .tags). The bus
+hands them to the bot's handler in arrival order, each in its own task,
+the way twitchio dispatches event_message. While a message is handled,
+current_source / current_channel say where it came from, so replies go
+back to that platform. Output that isn't a reply (timers, quest
+completions, votes) goes to bus.broadcast, i.e. every source.
+
+    bus = ChatBus(bot.handle_message)
+    bus.add(TwitchSource(bot))
+    bus.add(YouTubeChatSource())
+    bus.start()
+
+YouTubeChatSource polls the Data API's liveChatMessages endpoint. Every
+call costs quota (list 5 units, insert 50). Each QuotaBudget spreads its
+allowance over the day and lets chat burst a little when it's busy.
+Replies get their own REPLY_SHARE of the quota: polling spends units as
+soon as they exist, so from a shared budget the 50 an insert needs would
+never build up. Broadcasts (timed !info, votes, quest news) go out through
+announce() from a small ANNOUNCE_SHARE of their own and are skipped on
+YouTube once it's spent, so they can't use up what replies need. Point
+api_url at a local stand-in (bench/fake_youtube_chat.py) to run it
+without Google.
+"""
+import asyncio
+import contextvars
+import itertools
+import logging
+import os
+import pickle
+import time
+import aiohttp
+import metrics
+import resilience
+
+MESSAGES = metrics.counter("daggerwalk_chat_messages_total", "Chat messages received", ["source"])
+BUS_DEPTH = metrics.gauge("daggerwalk_chat_bus_depth", "Chat messages waiting to be dispatched")
+BUS_WAIT = metrics.histogram(
+    "daggerwalk_chat_bus_wait_seconds", "Received to dispatched on the chat bus", ["source"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1),
+)
+REPLIES_DROPPED = metrics.counter("daggerwalk_chat_replies_dropped_total", "Replies not sent", ["source", "reason"])
+YOUTUBE_QUOTA = metrics.counter("daggerwalk_youtube_chat_quota_units_total", "Data API units spent on live chat",
+                                ["method"])
+
+current_source = contextvars.ContextVar("chat_source", default="twitch")
+current_channel = contextvars.ContextVar("chat_channel", default=None)
+
+
+class ChatAuthor:
+    def __init__(self, name, id=None, is_mod=False):
+        self.name = name
+        self.display_name = name
+        self.id = id
+        self.is_mod = is_mod
+
+
+class ChatMessage:
+    """A non-Twitch chat message, shaped like the parts of twitchio's Message the bot reads."""
+
+    def __init__(self, author, content, channel, msg_id=None):
+        self.author = author
+        self.content = content
+        self.channel = channel
+        self.tags = {"id": msg_id, "display-name": author.name} if msg_id else {}
+        self.echo = False
+
+
+class Broadcast:
+    """Sends to every source that currently has a channel."""
+
+    def __init__(self, bus):
+        self.bus = bus
+
+    def __bool__(self):
+        return any(source.channel for source in self.bus.sources.values())
+
+    async def send(self, content):
+        for name, source in self.bus.sources.items():
+            channel = source.channel
+            if not channel:
+                continue
+            try:
+                # A source with a separate budget for output nobody asked for says so
+                await getattr(source, "announce", channel.send)(content)
+            except Exception as e:
+                REPLIES_DROPPED.labels(source=name, reason="error").inc()
+                logging.error(f"Broadcast to {name} failed: {e}")
+
+
+class ChatBus:
+    def __init__(self, handler):
+        self.handler = handler
+        self.sources = {}
+        self.broadcast = Broadcast(self)
+        self._queue = asyncio.Queue()
+        self._seq = itertools.count()
+        self._tasks = set()
+        self._worker = None
+
+    def add(self, source):
+        self.sources[source.name] = source
+        source.bus = self
+        if self._worker is not None:
+            source.start()
+
+    def publish(self, source_name, message):
+        MESSAGES.labels(source=source_name).inc()
+        self._queue.put_nowait((next(self._seq), source_name, time.perf_counter(), message))
+        BUS_DEPTH.set(self._queue.qsize())
+
+    def start(self):
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._dispatch(), name="chat_bus")
+            for source in self.sources.values():
+                source.start()
+        return self._worker
+
+    async def _dispatch(self):
+        while True:
+            seq, source_name, received, message = await self._queue.get()
+            BUS_DEPTH.set(self._queue.qsize())
+            BUS_WAIT.labels(source=source_name).observe(time.perf_counter() - received)
+            # The handler task copies this context: it knows its source and reply channel
+            current_source.set(source_name)
+            current_channel.set(message.channel)
+            task = asyncio.create_task(self._handle(source_name, message), name=f"chat:{source_name}")
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _handle(self, source_name, message):
+        try:
+            await self.handler(message)
+        except Exception as e:
+            logging.error(f"Error handling {source_name} message: {e}")
+
+
+class TwitchSource:
+    """twitchio delivers messages itself (bot.event_message publishes them); replies go to the joined channel."""
+    name = "twitch"
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.bus = None
+
+    @property
+    def channel(self):
+        channels = self.bot.connected_channels
+        return channels[0] if channels else None
+
+    def start(self):
+        pass
+
+
+class QuotaBudget:
+    """Token bucket over a daily API quota: an even share of the day, plus up to `burst_seconds` saved up."""
+
+    def __init__(self, units_per_day, burst_seconds=600, min_capacity=60):
+        self.rate = units_per_day / 86400
+        self.capacity = max(self.rate * burst_seconds, min_capacity)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, units):
+        """Seconds until `units` can be spent (0 if now)."""
+        self._refill()
+        return 0.0 if self.tokens >= units else (units - self.tokens) / self.rate
+
+    def try_spend(self, units):
+        self._refill()
+        if self.tokens < units:
+            return False
+        self.tokens -= units
+        return True
+
+
+def google_access_token(token_file="token.pickle"):
+    """Access token from the same OAuth credentials youtube_create_broadcast.py uses (refreshed if expired)."""
+    with open(token_file, "rb") as f:
+        creds = pickle.load(f)
+    if not creds.valid:
+        from google.auth.transport.requests import Request  # only needed with real credentials
+        creds.refresh(Request())
+        with open(token_file, "wb") as f:
+            pickle.dump(creds, f)
+    return creds.token
+
+
+class YouTubeReplyChannel:
+    def __init__(self, source):
+        self.source = source
+        self.name = "youtube"
+
+    async def send(self, content):
+        await self.source.send_message(content)
+
+
+class YouTubeChatSource:
+    name = "youtube"
+    API_URL = "https://www.googleapis.com/youtube/v3"
+    QUOTA_COSTS = {"list": 5, "insert": 50, "broadcasts": 1}
+    REPLY_SHARE = 0.25  # of the daily quota, kept for liveChatMessages.insert
+    REPLY_BURST = 4  # replies that can go out back to back
+    ANNOUNCE_SHARE = 0.05  # of the daily quota, for broadcasts: a handful a day
+    MAX_MESSAGE_LENGTH = 200
+    MIN_POLL_INTERVAL = 2.0
+    RETRY_INTERVAL = 30.0
+
+    def __init__(self, api_url=None, token_provider=google_access_token, quota_per_day=6000,
+                 live_chat_id=None, skip_backlog=True):
+        self.api_url = (api_url or os.environ.get("DAGGERWALK_YOUTUBE_API_URL") or self.API_URL).rstrip("/")
+        self.token_provider = token_provider
+        # polls and broadcast lookups
+        self.quota = QuotaBudget(quota_per_day * (1 - self.REPLY_SHARE - self.ANNOUNCE_SHARE))
+        self.reply_quota = QuotaBudget(quota_per_day * self.REPLY_SHARE,
+                                       min_capacity=self.QUOTA_COSTS["insert"] * self.REPLY_BURST)
+        self.announce_quota = QuotaBudget(quota_per_day * self.ANNOUNCE_SHARE,
+                                          min_capacity=self.QUOTA_COSTS["insert"])
+        self.live_chat_id = live_chat_id
+        self.skip_backlog = skip_backlog  # don't replay chat from before we started
+        self.page_token = None
+        self.bus = None
+        self._reply_channel = YouTubeReplyChannel(self)
+        self._sent_ids = set()  # our own replies come back in the next poll
+        self._session = None
+        self._task = None
+
+    @property
+    def channel(self):
+        return self._reply_channel if self.live_chat_id else None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="youtube_chat")
+
+    async def _request(self, method, path, **kwargs):
+        if self._session is None:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+        token = await asyncio.to_thread(self.token_provider)
+        headers = {"Authorization": f"Bearer {token}"}
+        async with self._session.request(method, f"{self.api_url}/{path}", headers=headers, **kwargs) as resp:
+            if resp.status >= 400:
+                raise Exception(f"YouTube {method} {path}: {resp.status} {await resp.text()}")
+            return await resp.json()
+
+    async def _spend(self, method):
+        wait = self.quota.wait_time(self.QUOTA_COSTS[method])
+        if wait:
+            await asyncio.sleep(wait)
+        self.quota.try_spend(self.QUOTA_COSTS[method])
+        YOUTUBE_QUOTA.labels(method=method).inc(self.QUOTA_COSTS[method])
+
+    async def find_live_chat(self):
+        """liveChatId of our active broadcast, or None if we're not live."""
+        await self._spend("broadcasts")
+        data = await resilience.get("youtube_chat").call(
+            self._request, "GET", "liveBroadcasts",
+            params={"part": "snippet", "broadcastStatus": "active", "broadcastType": "all"},
+        )
+        for item in data.get("items", []):
+            chat_id = item.get("snippet", {}).get("liveChatId")
+            if chat_id:
+                return chat_id
+        return None
+
+    async def poll_once(self):
+        """Fetch new messages, publish them; returns seconds to wait before the next poll."""
+        await self._spend("list")
+        params = {"liveChatId": self.live_chat_id, "part": "snippet,authorDetails"}
+        if self.page_token:
+            params["pageToken"] = self.page_token
+        data = await resilience.get("youtube_chat").call(self._request, "GET", "liveChat/messages", params=params)
+
+        backlog = self.page_token is None and self.skip_backlog
+        self.page_token = data.get("nextPageToken")
+        if not backlog:
+            for item in data.get("items", []):
+                self._publish(item)
+        interval = max(data.get("pollingIntervalMillis", 5000) / 1000, self.MIN_POLL_INTERVAL)
+        # Poll no faster than the quota allows on average
+        return max(interval, self.quota.wait_time(self.QUOTA_COSTS["list"]))
+
+    def _publish(self, item):
+        if item.get("id") in self._sent_ids:
+            self._sent_ids.discard(item["id"])
+            return
+        snippet = item.get("snippet", {})
+        if snippet.get("type") != "textMessageEvent":
+            return
+        details = item.get("authorDetails", {})
+        author = ChatAuthor(details.get("displayName", "someone"), id=details.get("channelId"),
+                            is_mod=details.get("isChatModerator", False) or details.get("isChatOwner", False))
+        text = snippet.get("textMessageDetails", {}).get("messageText") or snippet.get("displayMessage", "")
+        self.bus.publish(self.name, ChatMessage(author, text, self._reply_channel, msg_id=item.get("id")))
+
+    async def send_message(self, content):
+        if not self.live_chat_id:
+            return
+        if not self.reply_quota.try_spend(self.QUOTA_COSTS["insert"]):
+            REPLIES_DROPPED.labels(source=self.name, reason="quota").inc()
+            logging.warning(f"YouTube reply dropped, quota budget exhausted: {content[:60]}")
+            return
+        await self._insert(content)
+
+    async def announce(self, content):
+        """Broadcast to YouTube chat if the announcement budget allows; replies never wait on it."""
+        if not self.live_chat_id:
+            return
+        if not self.announce_quota.try_spend(self.QUOTA_COSTS["insert"]):
+            REPLIES_DROPPED.labels(source=self.name, reason="announce_quota").inc()
+            logging.debug(f"YouTube broadcast skipped, announcement budget spent: {content[:60]}")
+            return
+        await self._insert(content)
+
+    async def _insert(self, content):
+        YOUTUBE_QUOTA.labels(method="insert").inc(self.QUOTA_COSTS["insert"])
+        body = {
+            "snippet": {
+                "liveChatId": self.live_chat_id,
+                "type": "textMessageEvent",
+                "textMessageDetails": {"messageText": content[:self.MAX_MESSAGE_LENGTH]},
+            }
+        }
+        data = await resilience.get("youtube_chat").call(
+            self._request, "POST", "liveChat/messages", params={"part": "snippet"}, json=body
+        )
+        if data.get("id"):
+            self._sent_ids.add(data["id"])
+
+    async def _run(self):
+        logging.info(f"YouTube chat source polling {self.api_url}")
+        while True:
+            try:
+                if not self.live_chat_id:
+                    self.live_chat_id = await self.find_live_chat()
+                    if not self.live_chat_id:
+                        await asyncio.sleep(self.RETRY_INTERVAL * 2)
+                        continue
+                    logging.info(f"YouTube live chat: {self.live_chat_id}")
+                delay = await self.poll_once()
+            except resilience.DependencyUnavailable:
+                delay = self.RETRY_INTERVAL
+            except Exception as e:
+                logging.error(f"YouTube chat poll error: {e}")
+                if "liveChatEnded" in str(e) or "liveChatNotFound" in str(e):
+                    self.live_chat_id, self.page_token = None, None
+                delay = self.RETRY_INTERVAL
+            await asyncio.sleep(delay)
@@ -1,6 +1,6 @@
 import subprocess
+import asyncio
 import time
-import socket
 import logging
 import os
 import signal
@@ -19,18 +19,75 @@ logging.getLogger().addHandler(console_handler)
 # Configuration
 VENV_PYTHON_PATH = "daggerwalk_venv\\Scripts\\python.exe"  # Python interpreter in virtual environment
 BOT_SCRIPT_PATH = "daggerwalk_twitch_bot.py"
-CHECK_INTERVAL = 20  # Seconds between connectivity checks
-TEST_HOST = "8.8.8.8"  # Google DNS to check connectivity
-TEST_PORT = 53  # DNS port
+CHECK_INTERVAL = 5  # Seconds between connectivity probe rounds
+PROBE_TIMEOUT = 3  # Seconds before a single probe counts as failed
+OUTAGE_THRESHOLD = 3  # Consecutive failed rounds before declaring an outage
+RECOVERY_THRESHOLD = 2  # Consecutive good rounds before declaring recovery
+
+# (name, host, port) - each probe is a plain TCP connect
+PROBES = [
+    ("dns", "8.8.8.8", 53),  # Google DNS
+    ("twitch_irc", "irc.chat.twitch.tv", 6697),
+    ("django", "kershner.org", 443),
+]
 
 bot_process = None
 
-def check_internet():
-    """Check if internet is connected by trying to reach Google DNS"""
+async def probe(name, host, port, timeout=PROBE_TIMEOUT):
+    """Open (and close) a TCP connection; return (name, ok, latency_ms)"""
+    start = time.perf_counter()
+    writer = None
     try:
-        socket.socket(socket.AF_INET, socket.SOCK_STREAM).connect((TEST_HOST, TEST_PORT))
-        return True
-    except:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        return name, True, (time.perf_counter() - start) * 1000
+    except Exception:
+        return name, False, None
+    finally:
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+async def check_internet():
+    """Run all probes concurrently; the round passes if any probe succeeds"""
+    results = await asyncio.gather(*(probe(*p) for p in PROBES))
+    summary = ", ".join(
+        f"{name}={latency:.0f}ms" if ok else f"{name}=FAIL" for name, ok, latency in results
+    )
+    ok = any(ok for _, ok, _ in results)
+    if not all(ok for _, ok, _ in results):
+        logging.warning(f"Connectivity probes: {summary}")
+    else:
+        logging.debug(f"Connectivity probes: {summary}")
+    return ok
+
+class ConnectivityState:
+    """Hysteresis over probe rounds so short blips don't flip the state"""
+
+    def __init__(self, connected, outage_threshold=OUTAGE_THRESHOLD, recovery_threshold=RECOVERY_THRESHOLD):
+        self.connected = connected
+        self.outage_threshold = outage_threshold
+        self.recovery_threshold = recovery_threshold
+        self.fail_streak = 0
+        self.ok_streak = 0
+
+    def update(self, round_ok):
+        """Record one probe round; return True if the connected state flipped"""
+        if round_ok:
+            self.ok_streak += 1
+            self.fail_streak = 0
+        else:
+            self.fail_streak += 1
+            self.ok_streak = 0
+
+        if self.connected and self.fail_streak >= self.outage_threshold:
+            self.connected = False
+            return True
+        if not self.connected and self.ok_streak >= self.recovery_threshold:
+            self.connected = True
+            return True
         return False
 
 def start_bot():
@@ -70,31 +127,35 @@ def cleanup_and_exit(signum, frame):
 signal.signal(signal.SIGINT, cleanup_and_exit)
 signal.signal(signal.SIGTERM, cleanup_and_exit)
 
+async def monitor_loop():
+    # Initial check
+    state = ConnectivityState(await check_internet())
+    if state.connected:
+        start_bot()
+
+    while True:
+        await asyncio.sleep(CHECK_INTERVAL)
+        round_ok = await check_internet()
+        if not state.update(round_ok):
+            if not round_ok:
+                logging.info(f"Probe round failed ({state.fail_streak}/{state.outage_threshold})")
+            continue
+
+        if state.connected:
+            # Internet just connected
+            logging.info("Internet connection detected!")
+            start_bot()
+        else:
+            # Internet just disconnected
+            logging.info("Internet connection lost!")
+            stop_bot()
+
 # Main loop
 if __name__ == "__main__":
     logging.info("=== Starting Connection Monitor ===")
-    
-    # Initial check
-    was_connected = check_internet()
-    if was_connected:
-        start_bot()
-    
+
     try:
-        while True:
-            is_connected = check_internet()
-            
-            if is_connected and not was_connected:
-                # Internet just connected
-                logging.info("Internet connection detected!")
-                start_bot()
-                was_connected = True
-            elif not is_connected and was_connected:
-                # Internet just disconnected
-                logging.info("Internet connection lost!")
-                stop_bot()
-                was_connected = False
-            
-            time.sleep(CHECK_INTERVAL)
+        asyncio.run(monitor_loop())
     except Exception as e:
         logging.error(f"Monitor script error: {e}")
         stop_bot()  # Make sure we clean up
\ No newline at end of file
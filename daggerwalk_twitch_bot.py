@@ -1,12 +1,28 @@
+import startup_timeline  # first, so its clock includes every import below
+import startup_graph
+import chat_sources
+import scheduler
 from datetime import datetime, timedelta, timezone, date
 from twitchio.ext import commands
-import pygetwindow as gw
 from enum import Enum
 import bluesky_live
-import subprocess
-import pywinauto
+import resilience
+import contextvars
+import loop_watchdog
+import profiler
+import game_input
+import input_executor
+import failover
+import dfu_channel
+import telemetry
+import twitch_auth
+import spatial_index
+import quest_tracker
+import music_index
+import metrics
 import aiofiles
-import requests
+import collections
+import concurrent.futures
 import logging
 import aiohttp
 import asyncio
@@ -15,6 +31,9 @@ import json
 import time
 import os
 
+# requests (and atproto, via bluesky_live.login) are imported on first use:
+# they're most of the import time and nothing needs them before IRC is up
+
 
 logging.basicConfig(
     level=logging.INFO, 
@@ -22,6 +41,24 @@ logging.basicConfig(
     filename="daggerwalk.log",
     filemode="a"  # Append mode
 )
+startup_timeline.mark("imports")
+
+# Metrics, served as Prometheus text on Config.METRICS_PORT
+LOOP_LAG = metrics.histogram("daggerwalk_event_loop_lag_seconds", "How late the event loop wakes from a 1s sleep")
+CHAT_COMMANDS = metrics.counter("daggerwalk_chat_commands_total", "Chat commands received", ["command"])
+COMMAND_TO_KEYSTROKE = metrics.histogram(
+    "daggerwalk_command_to_keystroke_seconds", "Chat command received to first keystroke sent", ["command"]
+)
+INPUT_QUEUE_DEPTH = metrics.gauge("daggerwalk_input_queue_depth", "Keystrokes waiting to be sent to the game")
+MAPDATA_READ = metrics.histogram("daggerwalk_mapdata_read_seconds", "Time to read and parse MapData.json")
+VOTES_STARTED = metrics.counter("daggerwalk_votes_started_total", "Votes started", ["command"])
+VOTES_CAST = metrics.counter("daggerwalk_votes_cast_total", "!yes/!no votes cast", ["vote"])
+VOTE_RESULTS = metrics.counter("daggerwalk_vote_results_total", "Finished votes", ["command", "result"])
+RESTARTS = metrics.gauge("daggerwalk_restarts", "Times the supervisor has relaunched the bot")
+CONFIG_RELOADS = metrics.counter("daggerwalk_config_reloads_total", "parameters.json changes seen", ["result"])
+
+# (command, perf_counter at receipt) for the chat command being handled in this task
+_pending_command = contextvars.ContextVar("pending_command", default=None)
 
 
 class GameKeys(Enum):
@@ -42,6 +79,30 @@ class GameKeys(Enum):
     USE = "k"
     CAMERA = "O"
 
+class Rendered:
+    """!info, !quest and !state lines rendered from one snapshot.
+
+    Replaced (never mutated) whenever the Django response or local state
+    changes, bumping `version`, so chat commands only read attributes.
+    """
+    FIELDS = ("version", "at", "info", "region", "weather", "time_hms", "live_text",
+              "quest_current", "quest_completion", "state")
+
+    def __init__(self, **fields):
+        for name in self.FIELDS:
+            setattr(self, name, fields.get(name))
+        self.version = self.version or 0
+
+    def replace(self, **changes):
+        fields = {name: getattr(self, name) for name in self.FIELDS}
+        fields.update(changes, version=self.version + 1)
+        return Rendered(**fields)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
 class Config:
     """Bot configuration settings"""
     PARAMS_FILE = "parameters.json"
@@ -49,12 +110,25 @@ class Config:
     BOT_USERNAME = "daggerwalk_bot"
     REFRESH_INTERVAL = 300  # 5 minutes
     AUTOSAVE_INTERVAL = 600  # 10 minutes
+    TELEMETRY_INTERVAL = 1  # seconds between reads of the MapData.ndjson stream
+    TELEMETRY_MAX_AGE = 15  # seconds; an older sample means the stream stopped, read MapData.json instead
     CHAT_DELAY = 1.5  # seconds
     VOTING_DURATION = 30  # seconds
     AUTHORIZED_USERS = ["billcrystals", "daggerwalk", "daggerwalk_bot"]
     MAX_INPUT_REPEATS = 100
     DJANGO_BASE_API_URL = "https://kershner.org/api/daggerwalk"
     DJANGO_LOG_URL = "https://kershner.org/daggerwalk/log/"
+    METRICS_PORT = 9108  # localhost only; None disables the endpoint
+    PROFILE_SECONDS = 30  # default !profile / signal capture length
+    STARTUP_BUDGET_SECONDS = 20  # process start -> joined chat and taking commands
+    YOUTUBE_CHAT = False  # also take commands from the YouTube simulcast's live chat
+    YOUTUBE_CHAT_QUOTA = 6000  # Data API units/day for chat; broadcast setup needs some of the 10,000
+    DFU_CHANNEL = dfu_channel.DEFAULT_ADDRESS  # CommandChannel mod; console commands are typed if it's absent
+    STANDBY_LEASE = None  # lease file shared by a primary/standby pair (see failover.py); None runs alone
+    SPATIAL_INDEX = spatial_index.INDEX_FILE  # map pixel -> region/climate/POI, learned from Django responses
+    SPATIAL_SEED_LOGS = 1000  # recent /logs/ records to back-fill the index from at startup
+    CONFIG_POLL_INTERVAL = 5  # seconds between checks of PARAMS_FILE for edits
+    TOKEN_CHECK_INTERVAL = 900  # seconds between Twitch token validations (Twitch wants at least hourly)
 
     STREAM_TAGS = [
         "Retro",
@@ -91,19 +165,108 @@ class Config:
     
     SEASON_EMOJIS = {"Winter": "☃️", "Spring": "🌸", "Summer": "🌻", "Autumn": "🍂"}
 
+    # Settings above that PARAMS_FILE may override, with the check a new value must pass.
+    # Removing one from the file puts the default back.
+    TUNABLES = {
+        "REFRESH_INTERVAL": lambda v: _is_number(v) and v >= 30,
+        "AUTOSAVE_INTERVAL": lambda v: _is_number(v) and v >= 30,
+        "VOTING_DURATION": lambda v: _is_number(v) and v > 0,
+        "CHAT_DELAY": lambda v: _is_number(v) and v >= 0,
+        "MAX_INPUT_REPEATS": lambda v: isinstance(v, int) and not isinstance(v, bool) and v >= 1,
+        "AUTHORIZED_USERS": lambda v: isinstance(v, list) and all(isinstance(u, str) and u for u in v),
+    }
+    CREDENTIALS = ("CLIENT_ID", "OAUTH_TOKEN", "REFRESH_TOKEN", "CLIENT_SECRET", "daggerwalk_api_key",
+                   "BLUESKY_HANDLE", "BLUESKY_APP_PASSWORD")
+
     _params = None
+    _params_stamp = None  # (mtime_ns, size) of the file _params was read from
+    _defaults = None
 
     @classmethod
     def load_params(cls):
-        """Load API keys and credentials from parameters file (only once)"""
+        """Load API keys and credentials from parameters file (once; reload_params() picks up edits)"""
         if cls._params is None:  # Load only if not already loaded
             if not os.path.exists(cls.PARAMS_FILE):
                 logging.error(f"Missing {cls.PARAMS_FILE}")
                 exit(1)
-            with open(cls.PARAMS_FILE, "r") as file:
-                cls._params = json.load(file)
+            try:
+                cls._swap_params(*cls._read_params())
+            except ValueError as e:
+                logging.error(f"Invalid {cls.PARAMS_FILE}: {e}")
+                exit(1)
         
         return cls._params
+
+    @classmethod
+    def _read_params(cls):
+        st = os.stat(cls.PARAMS_FILE)
+        with open(cls.PARAMS_FILE, "r") as file:
+            return json.load(file), (st.st_mtime_ns, st.st_size)
+
+    @classmethod
+    def validate_params(cls, params):
+        """Raise ValueError naming the first setting in `params` that can't be used."""
+        if not isinstance(params, dict):
+            raise ValueError("not a JSON object")
+        for key in cls.CREDENTIALS:
+            if key in params and not isinstance(params[key], str):
+                raise ValueError(f"{key} must be a string")
+        for key, check in cls.TUNABLES.items():
+            if key in params and not check(params[key]):
+                raise ValueError(f"{key} can't be {params[key]!r}")
+
+    @classmethod
+    def _swap_params(cls, params, stamp):
+        """Validate, then replace the params and every tunable at once; returns the keys that changed."""
+        cls.validate_params(params)
+        if cls._defaults is None:
+            cls._defaults = {key: getattr(cls, key) for key in cls.TUNABLES}
+        old = cls._params or {}
+        changed = {key for key in old.keys() | params.keys() if old.get(key) != params.get(key)}
+        cls._params, cls._params_stamp = params, stamp
+        for key, default in cls._defaults.items():
+            setattr(cls, key, params.get(key, default))
+        return changed
+
+    @classmethod
+    def reload_params(cls):
+        """Re-read the parameters file if it changed on disk; returns the keys that changed.
+
+        A file that doesn't parse or validate (say, saved half-way through an
+        edit) is logged and skipped, and the current settings stay.
+        """
+        try:
+            st = os.stat(cls.PARAMS_FILE)
+        except FileNotFoundError:
+            return set()
+        if (st.st_mtime_ns, st.st_size) == cls._params_stamp:
+            return set()
+        try:
+            changed = cls._swap_params(*cls._read_params())
+        except (OSError, ValueError) as e:
+            cls._params_stamp = (st.st_mtime_ns, st.st_size)  # once per bad version, not every poll
+            CONFIG_RELOADS.labels(result="invalid").inc()
+            logging.error(f"{cls.PARAMS_FILE} not reloaded, keeping the current settings: {e}")
+            return set()
+        if changed:
+            CONFIG_RELOADS.labels(result="applied").inc()
+            logging.info(f"Reloaded {cls.PARAMS_FILE}: {', '.join(sorted(changed))} changed")
+        return changed
+
+    @classmethod
+    def save_params(cls, updates):
+        """Merge `updates` into the parameters file (replaced atomically) and the live settings."""
+        try:
+            params = cls._read_params()[0]  # the file as it is now, in case it was edited since
+        except (OSError, ValueError):
+            params = dict(cls.load_params())
+        params.update(updates)
+        tmp = f"{cls.PARAMS_FILE}.tmp"
+        with open(tmp, "w") as file:
+            json.dump(params, file, indent=4)
+        os.replace(tmp, cls.PARAMS_FILE)
+        st = os.stat(cls.PARAMS_FILE)
+        return cls._swap_params(params, (st.st_mtime_ns, st.st_size))
     
     @classmethod
     def get_oauth(cls):
@@ -132,52 +295,112 @@ class Config:
         password = params.get("BLUESKY_APP_PASSWORD", "")
         return handle, password
 
+def _observe_first_keystroke(command, received_at):
+    COMMAND_TO_KEYSTROKE.labels(command=command).observe(time.perf_counter() - received_at)
+
+
+# In process, every keystroke is pressed on this one thread, in order, the way the
+# executor runs its ops: a sequence or console command can't have other input land mid-way
+_input_worker = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="game_input")
+
+def _run_input(fn, *args):
+    """Queue fn(*args) on the input worker with this task's context (its pending command); returns the future"""
+    context = contextvars.copy_context()
+    _pending_command.set(None)  # the worker's copy reports it, once
+    return _input_worker.submit(context.run, fn, *args)
+
+def _observe_pending():
+    pending = _pending_command.get()
+    if pending:
+        _observe_first_keystroke(*pending)
+        _pending_command.set(None)
+
+def _press_now(key, repeat=1, delay=0.2):
+    """Press on the input worker; keys still queued count in INPUT_QUEUE_DEPTH"""
+    logging.info(f"Sending input: {key} ({repeat} times)")
+    sent = 0
+
+    def on_key(n):
+        INPUT_QUEUE_DEPTH.dec()
+        if n == 1:
+            _observe_pending()
+
+    try:
+        sent = game_input.press(key, repeat, delay, on_key=on_key)
+    except Exception as e:
+        logging.error(f"Input error: {e}")
+    finally:
+        INPUT_QUEUE_DEPTH.dec(repeat - sent)
+    return sent
+
+def _console_now(command):
+    try:
+        return game_input.console(command, press=lambda key: game_input.press(key, on_key=lambda n: _observe_pending()))
+    except Exception as e:
+        logging.error(f"Error sending console command: {e}")
+
 def send_game_input(key: str, repeat: int = 1, delay: float = 0.2):
     """Send keyboard input to Daggerfall Unity window"""
     try:
-        # Create a fresh Application instance each time
-        window = next((w for w in gw.getWindowsWithTitle("Daggerfall Unity") 
-                      if w.title == "Daggerfall Unity"), None)
-                      
-        if not window:
-            logging.warning("Game window not found")
+        backend = game_input.get_backend()
+        if getattr(backend, "remote", False):
+            # The executor process presses the keys; this returns at once
+            backend.keys(key, repeat, delay, command=_pending_command.get())
+            _pending_command.set(None)
             return
+
+        # The input worker presses them after anything queued before; this returns at once too
+        INPUT_QUEUE_DEPTH.inc(repeat)
+        _run_input(_press_now, key, repeat, delay)
             
-        # Force a completely new connection every time, with no caching
-        app = pywinauto.Application(backend="win32").connect(handle=window._hWnd)
-        dlg = app.window(handle=window._hWnd)
-        
-        logging.info(f"Sending input: {key} ({repeat} times)")
-        for _ in range(repeat):
-            dlg.send_keystrokes(key)
-            time.sleep(delay)
-            
     except Exception as e:
         logging.error(f"Input error: {e}")
 
+def _sequence_now(steps):
+    logging.info(f"Sending input sequence: {' '.join(key for key, _ in steps)}")
+    try:
+        return game_input.sequence(steps, on_key=lambda n: _observe_pending())
+    except Exception as e:
+        logging.error(f"Input error: {e}")
+
+async def send_game_sequence(steps):
+    """Press (key, pause) steps as one unit, so other input can't land mid-way, without blocking the loop."""
+    backend = game_input.get_backend()
+    if getattr(backend, "remote", False):
+        backend.sequence(steps, command=_pending_command.get())
+        _pending_command.set(None)
+        return
+    await asyncio.wrap_future(_run_input(_sequence_now, steps))
+
+def build_django_payload(data, reset=False):
+    """Map MapData.json fields onto the Django /log/ payload (chat_logs filled in by the caller)"""
+    return {
+        "worldX": int(data.get('worldX', 0)),
+        "worldZ": int(data.get('worldZ', 0)),
+        "mapPixelX": int(data.get('mapPixelX', 0)),
+        "mapPixelY": int(data.get('mapPixelY', 0)),
+        "region": data.get('region', 'Unknown'),
+        "location": data.get('location', 'Unknown'),
+        "locationType": data.get('locationType', 'Unknown'),
+        "playerX": float(data.get('playerX', 0)),
+        "playerY": float(data.get('playerY', 0)),
+        "playerZ": float(data.get('playerZ', 0)),
+        "date": data.get('date', ''),
+        "weather": data.get('weather', 'Unknown'),
+        "season": data.get('season', 'Unknown'),
+        "currentSong": data.get('currentSong', None),
+        "reset": reset,
+        "chat_logs": []
+    }
+
 def post_to_django(data, reset=False):
     """Post game state data to Django endpoint in background"""
+    import requests
+
     API_KEY = Config.get_api_key()
 
     try:
-        payload = {
-            "worldX": int(data.get('worldX', 0)),
-            "worldZ": int(data.get('worldZ', 0)),
-            "mapPixelX": int(data.get('mapPixelX', 0)),
-            "mapPixelY": int(data.get('mapPixelY', 0)),
-            "region": data.get('region', 'Unknown'),
-            "location": data.get('location', 'Unknown'),
-            "locationType": data.get('locationType', 'Unknown'),
-            "playerX": float(data.get('playerX', 0)),
-            "playerY": float(data.get('playerY', 0)),
-            "playerZ": float(data.get('playerZ', 0)),
-            "date": data.get('date', ''),
-            "weather": data.get('weather', 'Unknown'),
-            "season": data.get('season', 'Unknown'),
-            "currentSong": data.get('currentSong', None),
-            "reset": reset,
-            "chat_logs": []
-        }
+        payload = build_django_payload(data, reset)
 
         # Read chat command logs and include in payload
         log_file = "chat_commands_log.txt"
@@ -223,6 +446,10 @@ def post_to_django(data, reset=False):
     except Exception as e:
         logging.error(f"Error posting to Django: {str(e)}")
 
+def django_post_failed(response):
+    """post_to_django swallows errors; count None and 5xx as breaker failures."""
+    return response is None or response.status_code >= 500
+
 class DaggerfallBot(commands.Bot):
     def __init__(self):
         client_id, oauth = Config.get_oauth()
@@ -231,6 +458,7 @@ class DaggerfallBot(commands.Bot):
         self._bot_started_at_monotonic = time.monotonic()
         self._latest_response_data = None
         self._latest_response_at = None
+        self._background_refresh = None
         self.last_autosave = datetime.now(timezone.utc)
         self.voting_active = False
         self.current_vote_type = None
@@ -239,6 +467,19 @@ class DaggerfallBot(commands.Bot):
         self._state_ready = asyncio.Event()
         self._startup_tasks_started = False
         self._last_completed_quest_id = None
+        self._last_song = None  # MapData currentSong last seen by check_song_change
+        self._game_down_announced = False
+        self.failover = None  # set in event_ready when running as a hot-standby pair
+        self._standby_backlog = collections.deque(maxlen=200)  # (time.time(), source, message) seen as standby
+        self.music = music_index.MusicIndex()  # filled by the music_tracks startup step
+        self.telemetry = None  # TailReader over the backend's MapData.ndjson, once there is one
+        self.trail = collections.deque(maxlen=720)  # recent telemetry samples, ~1h at the mod's 5s
+        self._latest_sample_at = None
+        self.places = None  # SpatialIndex, once the spatial_index startup step has opened it
+        self.quest_tracker = quest_tracker.QuestTracker(locate=self._locate_poi)
+        self._arrival_refresh = None
+        self._live_text = None  # last live_text handed to the stream title / Bluesky status
+        self._title_task = None
 
         self.state = {
             "song": None,
@@ -263,9 +504,15 @@ class DaggerfallBot(commands.Bot):
             "camera": "toggle third-person camera"
         }
         
-        # Bluesky client initialization
+        # Bluesky logs in from a startup step once IRC is up, not here:
+        # login is a blocking network call and pulls in atproto
         self.bluesky_client = None
-        self._init_bluesky()
+        self.rendered = Rendered(state=self.format_state_line())
+
+        # Every chat source feeds one ordered bus; Twitch arrives via event_message
+        self.chat_bus = chat_sources.ChatBus(self.handle_message)
+        self.chat_bus.add(chat_sources.TwitchSource(self))
+        startup_timeline.mark("config")
 
 
     def _update_state(self, key, value):
@@ -274,6 +521,7 @@ class DaggerfallBot(commands.Bot):
             old = self.state[key]
             self.state[key] = value
             logging.info(f"State updated: {key} = {value} (was {old})")
+            self.rendered = self.rendered.replace(state=self.format_state_line())
         else:
             logging.warning(f"Attempted to set unknown state key: {key}")
 
@@ -295,23 +543,115 @@ class DaggerfallBot(commands.Bot):
             logging.info("event_ready called again — tasks already started; ignoring.")
             return
         self._startup_tasks_started = True
+        # Time-to-first-command: from here chat commands are acted on
+        startup_timeline.mark("ready")
+        startup_timeline.check("ready", Config.STARTUP_BUDGET_SECONDS)
         
-        await self.set_stream_tags()
-        
-        self.refresh_task = asyncio.create_task(self.data_refresh_loop())
-        self.autosave_task = asyncio.create_task(self.autosave_loop())
-        self.message_task = asyncio.create_task(self.message_scheduler())
-        self.crash_monitor_task = asyncio.create_task(self.crash_monitor())
-        self.side_effects_task = asyncio.create_task(self.side_effects_loop())
-        self.local_state_refresh_task = asyncio.create_task(self.local_state_refresh_loop())  
-
-    async def message_scheduler(self):
-        """Schedules periodic info (5m), help (20m), and quest (25m) messages."""
-        logging.info("Starting message scheduler")
-
-        # Wait until we have first successful refresh so we don't announce early/empty
-        await self._state_ready.wait()
+        self.chat_bus.start()
+        if getattr(game_input.get_backend(), "remote", False):
+            game_input.get_backend().open()  # link to the input executor process
+        if Config.STANDBY_LEASE:
+            self.failover = failover.Failover(failover.Lease(Config.STANDBY_LEASE),
+                                              on_promote=self.on_promoted, on_demote=self.on_demoted)
+            game_input.set_fence(self.failover.lease.holds)
+            self.failover.start()
+
+        self.watchdog = loop_watchdog.LoopWatchdog(asyncio.get_running_loop())
+        self.watchdog.start()
+        profiler.install_signal_handler(asyncio.get_running_loop(), Config.PROFILE_SECONDS)
+
+        # Periodic work all runs off one scheduler; jobs are added as the
+        # startup steps they depend on finish.
+        sched = self.scheduler = scheduler.Scheduler()
+        sched.start()
+
+        # Everything else starts as a graph: independent steps run concurrently,
+        # jobs start as soon as what they need is there. Movement and other
+        # commands that need no remote state are already being handled.
+        # Step/job names double as labels in loop watchdog stall reports.
+        # A standby warms up (chat, music, Bluesky login) but holds everything
+        # that acts (game, Django log, timed chat, YouTube quota) behind "primary".
+        graph = self.startup = startup_graph.StartupGraph()
+        graph.add("loop_lag_monitor", self.loop_lag_monitor, background=True)
+        graph.add("primary", self.wait_until_primary)
+        graph.add("youtube_chat", self.add_youtube_chat, after=["primary"])
+        graph.add("crash_monitor", lambda: sched.every("crash_monitor", 10, self.check_crashed, first_in=10),
+                  after=["primary"])
+        graph.add("autosave", lambda: sched.every(
+            "autosave", Config.AUTOSAVE_INTERVAL, self.autosave, first_in=Config.AUTOSAVE_INTERVAL),
+            after=["primary"])
+        graph.add("stream_tags", self.set_stream_tags)
+        graph.add("music_tracks", self.load_music_tracks)
+        # Only the primary resumes the saved session: a refresh rotates the refresh token,
+        # so the standby refreshing the same file would sign the primary out
+        graph.add("bluesky_login", lambda: asyncio.to_thread(self._init_bluesky), after=["primary"])
+        graph.add("first_refresh", self.first_refresh, after=["primary"])
+        graph.add("spatial_index", self.open_spatial_index)
+        graph.add("config_reload", lambda: sched.every(
+            "config_reload", Config.CONFIG_POLL_INTERVAL, self.reload_config, first_in=Config.CONFIG_POLL_INTERVAL))
+        # The standby gets the primary's refreshed token through config_reload
+        graph.add("twitch_token", lambda: sched.every(
+            "twitch_token", Config.TOKEN_CHECK_INTERVAL, self.keep_twitch_token), after=["primary"])
+        graph.add("telemetry", lambda: sched.every("telemetry", Config.TELEMETRY_INTERVAL, self.read_telemetry))
+        graph.add("local_state_refresh", lambda: sched.every("local_state_refresh", 30, self.check_song_change),
+                  after=["music_tracks"])
+        graph.add("bluesky_session", lambda: sched.every(
+            "bluesky_session", 1800, self.refresh_bluesky_session, first_in=1800), after=["bluesky_login"])
+        # first_refresh already did the initial post
+        graph.add("data_refresh", lambda: sched.every(
+            "data_refresh", Config.REFRESH_INTERVAL, self.scheduled_refresh, first_in=Config.REFRESH_INTERVAL),
+            after=["first_refresh"])
+        graph.add("scheduled_messages", self.schedule_messages, after=["first_refresh"])
+        graph.add("side_effects", self.schedule_side_effects, after=["first_refresh", "bluesky_login"])
+        graph.start()
+
+    @property
+    def is_primary(self):
+        # Promoted is enough for chat; a primary that loses the lease exits (on_demoted)
+        return self.failover is None or self.failover.promoted.is_set()
+
+    async def wait_until_primary(self):
+        if self.failover:
+            await self.failover.promoted.wait()
+
+    def add_youtube_chat(self):
+        if Config.YOUTUBE_CHAT:
+            self.chat_bus.add(chat_sources.YouTubeChatSource(quota_per_day=Config.YOUTUBE_CHAT_QUOTA))
+
+    def on_promoted(self, previous):
+        """Lease acquired: fence the executor, then act on chat the old primary may not have got to."""
+        backend = game_input.get_backend()
+        if getattr(backend, "remote", False):
+            backend.fence(self.failover.lease.epoch)
+        if self._live_text:  # rendered while standby, never pushed
+            self._title_task = asyncio.create_task(self._push_stream_title(), name="stream_title")
+        if previous is None:
+            self._standby_backlog.clear()
+            return
+        # Anything after its last beat may have died with it (at-least-once; a
+        # command it handled in its final beat interval can run twice)
+        cutoff = previous.get("beat", 0)
+        replay = [(source, message) for t, source, message in self._standby_backlog if t > cutoff]
+        self._standby_backlog.clear()
+        for source, message in replay:
+            self.chat_bus.publish(source, message)
+        if replay:
+            logging.warning(f"Replaying {len(replay)} chat message(s) from the takeover gap")
+
+    def on_demoted(self):
+        # Another instance holds the lease: every job and handler here assumes
+        # it's primary, so start over as the standby
+        os._exit(failover.EXIT_DEMOTED)
+
+    async def loop_lag_monitor(self, interval=1.0):
+        """Measure how late the loop wakes up; anything above ~0 means something blocked it."""
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            LOOP_LAG.observe(max(0.0, time.perf_counter() - start - interval))
 
+    def schedule_messages(self):
+        """Periodic info (5m), help (20m), and quest (25m) messages, once the first refresh is in."""
         INFO_INTERVAL = 300      # 5 minutes
         HELP_INTERVAL = 1200     # 20 minutes
         QUEST_INTERVAL = 1500    # 25 minutes
@@ -319,94 +659,145 @@ class DaggerfallBot(commands.Bot):
         HELP_OFFSET = 360        # 6 minutes after start
         QUEST_OFFSET = 120       # 2 minutes after start (staggered to avoid overlaps)
 
-        async def run_periodic_message(message_coro, interval, initial_delay=0):
-            if initial_delay > 0:
-                await asyncio.sleep(initial_delay)
-            while True:
-                try:
-                    await message_coro()
-                except Exception as e:
-                    logging.error(f"periodic message error: {e}")
-                await asyncio.sleep(interval)
-
         # Small initial delay for !info so it doesn't race with manual commands at startup
-        info_task = asyncio.create_task(
-            run_periodic_message(self.game_info, INFO_INTERVAL, initial_delay=10)
-        )
-        help_task = asyncio.create_task(
-            run_periodic_message(self.help, HELP_INTERVAL, initial_delay=HELP_OFFSET)
-        )
-        quest_task = asyncio.create_task(
-            run_periodic_message(self.quest, QUEST_INTERVAL, initial_delay=QUEST_OFFSET)
-        )
-
-        await asyncio.gather(info_task, help_task, quest_task)
+        self.scheduler.every("scheduled !info", INFO_INTERVAL, self.game_info, first_in=10)
+        self.scheduler.every("scheduled !help", HELP_INTERVAL, self.help, first_in=HELP_OFFSET)
+        self.scheduler.every("scheduled !quest", QUEST_INTERVAL, self.quest, first_in=QUEST_OFFSET)
 
     async def set_stream_tags(self):
         """Set Twitch stream tags"""
         try:
-            client_id, oauth = Config.get_oauth()
-            
-            async with aiohttp.ClientSession() as session:
-                headers = {
-                    "Authorization": f"Bearer {oauth}",
-                    "Client-Id": client_id
-                }
-                
-                # Get broadcaster ID
-                async with session.get(
-                    f"https://api.twitch.tv/helix/users?login={Config.TWITCH_CHANNEL}",
-                    headers=headers
-                ) as resp:
-                    if resp.status != 200:
-                        logging.error(f"Failed to get user ID: {resp.status}")
-                        return
-                    data = await resp.json()
-                    broadcaster_id = data["data"][0]["id"]
-                
-                # Set tags
-                async with session.patch(
-                    f"https://api.twitch.tv/helix/channels?broadcaster_id={broadcaster_id}",
-                    headers=headers,
-                    json={"tags": Config.STREAM_TAGS}
-                ) as resp:
-                    if resp.status == 204:
-                        logging.info(f"✓ Set stream tags: {', '.join(Config.STREAM_TAGS)}")
-                    else:
-                        text = await resp.text()
-                        logging.error(f"Failed to set tags: {resp.status} - {text}")
-                        
+            await resilience.get("helix").call(self._patch_stream_tags)
         except Exception as e:
             logging.error(f"Error setting stream tags: {e}")
 
+    async def _patch_stream_tags(self):
+        client_id, oauth = Config.get_oauth()
 
-    async def data_refresh_loop(self):
-        """Only refresh cached log/quest data; do NOT run side-effects here."""
-        logging.info("Starting data refresh loop")
-        first_success = False
+        async with aiohttp.ClientSession() as session:
+            headers = {
+                "Authorization": f"Bearer {oauth}",
+                "Client-Id": client_id
+            }
+
+            # Get broadcaster ID
+            async with session.get(
+                f"https://api.twitch.tv/helix/users?login={Config.TWITCH_CHANNEL}",
+                headers=headers
+            ) as resp:
+                if resp.status != 200:
+                    raise Exception(f"Failed to get user ID: {resp.status}")
+                data = await resp.json()
+                broadcaster_id = data["data"][0]["id"]
+
+            # Set tags
+            async with session.patch(
+                f"https://api.twitch.tv/helix/channels?broadcaster_id={broadcaster_id}",
+                headers=headers,
+                json={"tags": Config.STREAM_TAGS}
+            ) as resp:
+                if resp.status == 204:
+                    logging.info(f"✓ Set stream tags: {', '.join(Config.STREAM_TAGS)}")
+                else:
+                    text = await resp.text()
+                    raise Exception(f"Failed to set tags: {resp.status} - {text}")
+
+
+    async def refresh_once(self):
+        """Post MapData to Django and cache the response; True on success."""
+        data = await self.get_map_json_data()
+        response = await resilience.get("django").call(
+            post_to_django, data, is_failure=django_post_failed
+        )
+        if not (response and response.status_code == 201):
+            return False
+        new_data = response.json()
+
+        # Check for NEW quest completion BEFORE updating cache
+        await self._check_and_announce_quest_completion(new_data)
+        await self._learn_place(data, new_data)
+
+        # Then update cache
+        self._set_response(new_data)
+        return True
+
+    def _set_response(self, data):
+        """Cache a Django response and re-render the chat lines that come from it."""
+        self._latest_response_data = data
+        self._latest_response_at = datetime.now(timezone.utc)
+        self.quest_tracker.set_target(quest_tracker.quest_target(data.get("current_quest")))
+        self._render_response()
+
+    def _render_response(self):
+        data = self._latest_response_data
+        if not data:
+            return
+        status, region, weather, time_hms = self.build_status_line(data)
+        completion_line, current_line = self._format_quest_lines_from_response(data)
+        self.rendered = self.rendered.replace(
+            at=self._latest_response_at,
+            info=status,
+            region=region,
+            weather=weather,
+            time_hms=time_hms,
+            live_text=self.build_live_text(region or "", weather or "", time_hms) if time_hms else None,
+            quest_current=current_line,
+            quest_completion=completion_line,
+        )
+        self._push_live_text(self.rendered.live_text)
+
+    def _response_is_stale(self):
+        return not self._latest_response_at or (
+            (datetime.now(timezone.utc) - self._latest_response_at).total_seconds() > Config.REFRESH_INTERVAL * 2
+        )
+
+    def _refresh_in_background(self):
+        """Refresh off the request path; chat keeps getting the last rendered lines meanwhile."""
+        if self._background_refresh is None or self._background_refresh.done():
+            self._background_refresh = asyncio.create_task(self.refresh_now(), name="refresh_now")
+
+    async def first_refresh(self):
+        """Startup step: retry the first refresh with backoff until it lands."""
+        delay = 5
         while True:
             try:
-                data = await self.get_map_json_data()
-                response = await asyncio.to_thread(post_to_django, data)
-                if response and response.status_code == 201:
-                    new_data = response.json()
-                    
-                    # Check for NEW quest completion BEFORE updating cache
-                    await self._check_and_announce_quest_completion(new_data)
-                    
-                    # Then update cache
-                    self._latest_response_data = new_data
-                    self._latest_response_at = datetime.now(timezone.utc)
-
-                    if not first_success:
-                        first_success = True
-                        self._state_ready.set()  # unblocks scheduler/commands that want initial state
-
-                # Stuck check (run on a calm interval, not on every command/refresh)
-                await self.check_if_bot_is_stuck()
+                if await self.refresh_once():
+                    break
             except Exception as e:
-                logging.error(f"data_refresh_loop error: {e}")
-            await asyncio.sleep(Config.REFRESH_INTERVAL)
+                logging.error(f"first_refresh error: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, Config.REFRESH_INTERVAL)
+        self._state_ready.set()  # unblocks scheduler/commands that want initial state
+
+    async def _await_initial_state(self, timeout=5):
+        """Give the startup refresh a moment before a command falls back to its own."""
+        if not self._state_ready.is_set():
+            try:
+                await asyncio.wait_for(self._state_ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def scheduled_refresh(self):
+        """Only refresh cached log/quest data; do NOT run side-effects here."""
+        try:
+            await self.refresh_once()
+
+            # Stuck check (run on a calm interval, not on every command/refresh)
+            with resilience.deadline(30):
+                await self.check_if_bot_is_stuck()
+        except Exception as e:
+            logging.error(f"scheduled_refresh error: {e}")
+
+        degraded = {n: d for n, d in resilience.snapshot().items() if d["state"] != resilience.CLOSED}
+        if degraded:
+            logging.warning(f"Degraded dependencies: {degraded}")
+        if self.watchdog.stats:
+            ranked = ", ".join(f"{label} x{n} {total:.1f}s (worst {worst:.1f}s)" for label, n, total, worst in self.watchdog.top())
+            logging.info(f"Top event loop blockers: {ranked}")
+        late = {name: f"{s['max_jitter']:.2f}s" for name, s in self.scheduler.stats().items() if s["max_jitter"] > 1}
+        overran = {name: s["overruns"] for name, s in self.scheduler.stats().items() if s["overruns"]}
+        if late or overran:
+            logging.warning(f"Scheduler: worst start delay {late}, overruns {overran}")
 
     async def _check_and_announce_quest_completion(self, new_data):
         """Check if quest was completed and announce if so"""
@@ -421,8 +812,8 @@ class DaggerfallBot(commands.Bot):
                 completed_quest_id != getattr(self, '_last_completed_quest_id', None)):
                 
                 completion_line, _ = self._format_quest_lines_from_response(new_data)
-                if completion_line and self.connected_channels:
-                    await self.connected_channels[0].send(completion_line)
+                if completion_line and self.chat_bus.broadcast:
+                    await self.chat_bus.broadcast.send(completion_line)
                     self._last_completed_quest_id = completed_quest_id
                     logging.info(f"Quest completion announced: {completed_quest_id}")
                 else:
@@ -431,148 +822,287 @@ class DaggerfallBot(commands.Bot):
         except Exception as e:
             logging.error(f"_check_and_announce_quest_completion error: {e}")
 
-    async def side_effects_loop(self):
-        """Run operational side-effects on a steady cadence, decoupled from refresh."""
-        await self._state_ready.wait()
-        logging.info("Starting side effects loop")
-
-        last_shutdown_notice_date = None
+    def schedule_side_effects(self):
+        """Bluesky live status and the nightly shutdown notice.
 
-        while True:
-            try:
-                est = pytz.timezone("US/Eastern")
-                now_est = datetime.now(est)
+        OFF window: last 10 min before midnight + first 10 min after (Eastern).
+        """
+        self.scheduler.window("off_air", "23:50", "00:10", on_enter=self.go_off_air, on_exit=self.keep_live)
+        self.scheduler.every("bluesky_live", 60, self.keep_live)
 
-                midnight_next = (now_est + timedelta(days=1)).replace(
-                    hour=0, minute=0, second=0, microsecond=0
-                )
-                minutes_until = int((midnight_next - now_est).total_seconds() // 60)
+    async def go_off_air(self):
+        if self.bluesky_client:
+            await resilience.get("bluesky").call(
+                bluesky_live.clear_live, self.bluesky_client
+            )
 
-                # OFF window: last 10 min before midnight + first 10 min after
-                off_window = (
-                    (0 < minutes_until <= 10)
-                    or (now_est.hour == 0 and now_est.minute < 10)
-                )
-
-                if off_window:
-                    if self.bluesky_client:
-                        await asyncio.to_thread(
-                            bluesky_live.clear_live, self.bluesky_client
-                        )
-
-                    if (
-                        0 < minutes_until <= 10
-                        and last_shutdown_notice_date != now_est.date()
-                    ):
-                        last_shutdown_notice_date = now_est.date()
-                        if self.connected_channels:
-                            await self.connected_channels[0].send(
-                                f"🛌 The Walker will rest for the night in {minutes_until} minutes, "
-                                "at midnight EST. They'll be back in the morning!"
-                            )
-                else:
-                    if self.bluesky_client:
-                        title = self.state.get("bluesky_live_text") or "Live"
-                        await asyncio.to_thread(
-                            bluesky_live.ensure_live,
-                            self.bluesky_client,
-                            title,
-                            "",
-                        )
-
-            except Exception as e:
-                logging.error(f"side_effects_loop error: {e}")
-
-            await asyncio.sleep(60)
+        # Entering the window before midnight (not starting up after it): warn chat
+        now_est = datetime.now(self.scheduler.tz)
+        midnight_next = (now_est + timedelta(days=1)).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        minutes_until = round((midnight_next - now_est).total_seconds() / 60)
+        if 0 < minutes_until <= 10 and self.chat_bus.broadcast:
+            await self.chat_bus.broadcast.send(
+                f"🛌 The Walker will rest for the night in {minutes_until} minutes, "
+                "at midnight EST. They'll be back in the morning!"
+            )
+
+    async def keep_live(self):
+        if self.scheduler.in_window("off_air") or not self.bluesky_client:
+            return
+        title = self.state.get("bluesky_live_text") or "Live"
+        await resilience.get("bluesky").call(
+            bluesky_live.ensure_live,
+            self.bluesky_client,
+            title,
+            "",
+        )
 
+    async def refresh_bluesky_session(self):
+        """Keep the saved Bluesky session fresh so restarts can resume it."""
+        if not self.bluesky_client:
+            return
+        try:
+            await resilience.get("bluesky").call(bluesky_live.refresh_session, self.bluesky_client)
+        except resilience.DependencyUnavailable:
+            pass
+        except Exception as e:
+            # Session rejected (e.g. revoked): do a full login once
+            logging.warning(f"Bluesky session refresh failed, re-logging in: {e}")
+            await asyncio.to_thread(self._init_bluesky)
+
+    async def reload_config(self):
+        """Pick up parameters.json edits (credentials and tunables) without a restart."""
+        changed = await asyncio.to_thread(Config.reload_params)
+        if not changed:
+            return
+        if "OAUTH_TOKEN" in changed:
+            self._use_twitch_token(Config.get_oauth()[1])
+        for key, job in (("REFRESH_INTERVAL", "data_refresh"), ("AUTOSAVE_INTERVAL", "autosave")):
+            if key in changed:
+                self.scheduler.set_interval(job, getattr(Config, key))
+        if changed & {"BLUESKY_HANDLE", "BLUESKY_APP_PASSWORD"} and self.is_primary:
+            await asyncio.to_thread(self._init_bluesky)
+
+    def _use_twitch_token(self, token):
+        """Helix calls use the new token from the next one; IRC from its next (re)connect."""
+        # twitchio 2.x has no public way to swap the token of a running client
+        self._connection._token = token
+        self._http.token = token
+
+    async def keep_twitch_token(self):
+        """Validate the Twitch token and refresh it before it expires (see twitch_auth.py)."""
+        params = Config.load_params()
+        client_id, token = Config.get_oauth()
+        auth = resilience.get("twitch_auth")
+        expires_in = await auth.call(twitch_auth.validate, token)
+        if expires_in is None or expires_in > twitch_auth.REFRESH_MARGIN:
+            return
+        if not (params.get("REFRESH_TOKEN") and params.get("CLIENT_SECRET")):
+            logging.warning(f"Twitch token has {expires_in}s left and there's no REFRESH_TOKEN/CLIENT_SECRET "
+                            f"in {Config.PARAMS_FILE} to renew it with")
+            return
+        try:
+            tokens = await auth.call(twitch_auth.refresh, client_id, params["CLIENT_SECRET"], params["REFRESH_TOKEN"])
+        except twitch_auth.RefreshRejected as e:
+            logging.error(f"Twitch refused the refresh token; the bot needs authorizing again: {e}")
+            return
+        prefix = "oauth:" if params.get("OAUTH_TOKEN", "").startswith("oauth:") else ""
+        await asyncio.to_thread(Config.save_params, {
+            "OAUTH_TOKEN": prefix + tokens.access_token,
+            "REFRESH_TOKEN": tokens.refresh_token,
+        })
+        self._use_twitch_token(tokens.access_token)
+        logging.info(f"Twitch token refreshed; expires in {tokens.expires_in}s")
+
+    async def load_music_tracks(self):
+        """Build the music index (track list + MusicChanger categories) once."""
+        self.music = await asyncio.to_thread(music_index.load)
+        self._render_response()  # track numbers in !info
+
+    async def check_song_change(self):
+        """Check MapData.json for song changes and quest proximity (local file only, no Django needed)."""
+        data = await self.get_map_json_data()
+        self._note_song(data.get("currentSong"))
+        await self._track_quest(data)
 
-    async def local_state_refresh_loop(self):
-        """Check MapData.json periodically for song changes."""
-        await self._state_ready.wait()
-        logging.info("Starting local state refresh loop")
+    async def read_telemetry(self):
+        """Take in every MapData.ndjson sample written since the last read."""
+        path = getattr(game_input.get_backend(), "telemetry_path", None)
+        if not path:
+            return
+        if self.telemetry is None or self.telemetry.path != path:
+            self.telemetry = telemetry.TailReader(path)
+        samples = await asyncio.to_thread(self.telemetry.read)
+        if not samples:
+            return
+        for sample in samples:
+            sample = self.normalize_map_data(sample)
+            self.trail.append(sample)
+            self._note_song(sample.get("currentSong"))  # catches songs shorter than the 30s check
+            await self._track_quest(sample)
+        self._latest_sample_at = time.monotonic()
+        self._render_local(self.trail[-1])
+
+    async def open_spatial_index(self):
+        """Startup step: open the spatial index, then back-fill it from recent Django logs."""
+        import requests
+
+        self.places = await asyncio.to_thread(spatial_index.SpatialIndex, Config.SPATIAL_INDEX)
+        logging.info(f"Spatial index open: {len(self.places.regions) - 1} regions, {len(self.places)} POIs")
+        try:
+            response = await resilience.get("django").call(
+                requests.get, f"{Config.DJANGO_BASE_API_URL}/logs/?limit={Config.SPATIAL_SEED_LOGS}&ordering=-id",
+                timeout=10, is_failure=django_post_failed)
+            seeded = self.places.seed(response.json().get("results", []))
+            if seeded:
+                await asyncio.to_thread(self.places.flush)
+            logging.info(f"Spatial index: {seeded} pixels back-filled from /logs/")
+        except Exception as e:
+            logging.warning(f"Spatial index back-fill skipped: {e}")
 
-        # Ensure track map is loaded
-        if not hasattr(self, "_track_map"):
-            music_data_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), "list_music_tracks.json")
-            self._music_tracks = await self.load_json_async(music_data_path)
-            self._track_map = {track["TrackName"]: track["TrackID"] for track in self._music_tracks}
+    async def _learn_place(self, posted, response_data):
+        """Stamp the pixel we just posted with the region/climate/POI Django says is there."""
+        if self.places is None:
+            return
+        try:
+            x, y = int(posted["mapPixelX"]), int(posted["mapPixelY"])
+        except (KeyError, ValueError):
+            return
+        if self.places.record(x, y, response_data.get("log")):
+            await asyncio.to_thread(self.places.flush)
 
-        last_song = self.state.get("song")
-        last_weather = self.state.get("weather")
+    def _locate_poi(self, name, region):
+        return self.places.find_poi(name, region) if self.places is not None else None
 
-        while True:
-            try:
-                data = await self.get_map_json_data()
-                new_song_name = data.get("currentSong")
-
-                if new_song_name and new_song_name != last_song:
-                    track_id = self._track_map.get(new_song_name)
-                    song_display = f"{new_song_name} (Track {track_id})" if track_id is not None else new_song_name
-                    self._update_state("song", song_display)
-                    last_song = new_song_name
-                    logging.info(f"Detected new song: {song_display}")
+    async def _track_quest(self, sample):
+        """Announce nearing/reaching the quest POI as soon as a sample shows it; refresh on arrival."""
+        event = self.quest_tracker.update(sample)
+        if event is None or not self.is_primary:
+            return
+        target = self.quest_tracker.target
+        name = target.name or "the quest"
+        if event == "arrived":
+            line = f"📍The Walker has arrived at {name}!"
+        else:
+            line = f"🧭The Walker is approaching {name}" + (f" in {target.region}!" if target.region else "!")
+        if self.chat_bus.broadcast:
+            await self.chat_bus.broadcast.send(line)
+        if event == "arrived" and (self._arrival_refresh is None or self._arrival_refresh.done()):
+            # Out of cycle, so Django's completion (and XP) follows now rather than at the next refresh
+            self._arrival_refresh = asyncio.create_task(self.refresh_on_arrival(), name="arrival_refresh")
+
+    async def refresh_on_arrival(self):
+        try:
+            if not await self.refresh_once():
+                logging.warning("Arrival refresh didn't reach Django; the next scheduled refresh will")
+        except Exception as e:
+            logging.error(f"refresh_on_arrival error: {e}")
 
-            except Exception as e:
-                logging.error(f"local_state_refresh_loop error: {e}")
+    def _render_local(self, sample):
+        """Re-render !info from a telemetry sample, with Django's per-place details from the index."""
+        if self.places is None:
+            return
+        try:
+            x, y = int(sample["mapPixelX"]), int(sample["mapPixelY"])
+        except (KeyError, ValueError):
+            return
+        place = self.places.lookup(x, y, region=sample.get("region"), location=sample.get("location"))
+        if not place.region:
+            return
+        song = sample.get("currentSong")
+        log = {
+            "region": place.region,
+            "location": sample.get("location"),
+            "weather": sample.get("weather"),
+            "season": sample.get("season"),
+            "date": sample.get("date"),
+            "current_song": song if song != "None" else "",
+            "region_fk": {"climate": place.climate, "emoji": place.climate_emoji},
+            "poi": {"emoji": place.poi_emoji},
+            "last_known_region": {"name": place.near_region},
+        }
+        status, region, weather, time_hms = self.build_status_line({"log": log})
+        if status == self.rendered.info:
+            return
+        self.rendered = self.rendered.replace(
+            info=status,
+            region=region,
+            weather=weather,
+            time_hms=time_hms,
+            live_text=self.build_live_text(region or "", weather or "", time_hms) if time_hms else None,
+        )
+        self._push_live_text(self.rendered.live_text)
 
-            await asyncio.sleep(30)
+    def _push_live_text(self, live_text):
+        """Stream title and Bluesky status follow live_text, pushed off the request path when it changes."""
+        if not live_text or live_text == self._live_text:
+            return
+        self._live_text = live_text
+        self._update_state("bluesky_live_text", live_text)
+        if self.is_primary and (self._title_task is None or self._title_task.done()):
+            self._title_task = asyncio.create_task(self._push_stream_title(), name="stream_title")
+
+    async def _push_stream_title(self):
+        sent = None
+        while sent != self._live_text:  # it may change again while a PATCH is in flight
+            sent = self._live_text
+            await self.update_stream_title(sent)
+
+    def _note_song(self, new_song_name):
+        if new_song_name and new_song_name != self._last_song:
+            track_id = self.music.id_for(new_song_name)
+            song_display = f"{new_song_name} (Track {track_id})" if track_id is not None else new_song_name
+            self._update_state("song", song_display)
+            self._last_song = new_song_name
+            logging.info(f"Detected new song: {song_display}")
 
     async def refresh_now(self):
         """One-shot refresh of cached data without chat output."""
         try:
             data = await self.get_map_json_data()
-            response = await asyncio.to_thread(post_to_django, data)
+            response = await resilience.get("django").call(
+                post_to_django, data, is_failure=django_post_failed
+            )
             if response and response.status_code == 201:
-                self._latest_response_data = response.json()
-                self._latest_response_at = datetime.now(timezone.utc)
+                new_data = response.json()
+                await self._learn_place(data, new_data)
+                self._set_response(new_data)
                 return True
         except Exception as e:
             logging.error(f"refresh_now error: {e}")
         return False
 
-    async def autosave_loop(self):
+    async def autosave(self):
         """Periodic game auto-save"""
-        logging.info("Starting autosave loop")
-        while True:
-            try:
-                await asyncio.sleep(Config.AUTOSAVE_INTERVAL)
-                await self.save_game()
-                self.last_autosave = datetime.now(timezone.utc)
-                logging.info(f"Auto-saved at {self.last_autosave}")
-            except Exception as e:
-                logging.error(f"Autosave error: {e}")
+        await self.save_game()
+        self.last_autosave = datetime.now(timezone.utc)
+        logging.info(f"Auto-saved at {self.last_autosave}")
 
     def is_daggerfall_running(self):
-        """Check if Daggerfall Unity process is running using built-in tasklist"""
-        try:
-            # logging.info("Checking running processes via tasklist...")
-            output = subprocess.check_output("tasklist", shell=True, text=True)
-            lines = output.strip().splitlines()
-            process_names = [line.split()[0] for line in lines[3:] if line]  # Skip header lines
-            return any("DaggerfallUnity.exe" == name for name in process_names)
-
-        except subprocess.CalledProcessError as e:
-            logging.error(f"Failed to run tasklist: {e}")
-            return False
-        except Exception as e:
-            logging.error(f"Unexpected error in is_daggerfall_running: {e}")
-            return False
+        """Check if the Daggerfall Unity process is running"""
+        return game_input.get_backend().is_running()
+
+    async def check_crashed(self):
+        if getattr(game_input.get_backend(), "remote", False):
+            # The executor owns the game and restarts with it; chat stays up
+            running = self.is_daggerfall_running()
+            if not running and not self._game_down_announced and self.chat_bus.broadcast:
+                await self.chat_bus.broadcast.send("⚠️ Daggerfall Unity has crashed! Restarting the game, back in a sec...")
+            self._game_down_announced = not running
+            return
+        if not self.is_daggerfall_running():
+            logging.error("Daggerfall Unity process not found — assuming crash")
+            if self.chat_bus.broadcast:
+                try:
+                    await self.chat_bus.broadcast.send(
+                        "⚠️ Daggerfall Unity has crashed! Restarting the stack, back in a sec..."
+                    )
+                except Exception:
+                    pass
 
-    async def crash_monitor(self):
-        logging.info("Starting crash monitor loop...")
-        while True:
-            await asyncio.sleep(10)
-            if not self.is_daggerfall_running():
-                logging.error("Daggerfall Unity process not found — assuming crash")
-                if self.connected_channels:
-                    try:
-                        await self.connected_channels[0].send(
-                            "⚠️ Daggerfall Unity has crashed! Restarting the stack, back in a sec..."
-                        )
-                    except Exception:
-                        pass
-
-                os._exit(100)  # special exit code that means "DFU crashed"
+            os._exit(100)  # special exit code that means "DFU crashed"
 
     async def log_chat_command(self, username, command, args):
         """Append chat commands to a local log file"""
@@ -585,11 +1115,30 @@ class DaggerfallBot(commands.Bot):
             logging.error(f"Failed to log chat command: {e}")
     
     async def event_message(self, message):
-        """Handle incoming chat messages and commands"""
+        """twitchio hook: Twitch chat joins the other sources on the chat bus"""
+        self.chat_bus.publish("twitch", message)
+
+    def reply_channel(self):
+        """The source the current command came from; every source for output that isn't a reply."""
+        return chat_sources.current_channel.get() or self.chat_bus.broadcast
+
+    @staticmethod
+    def chat_user(message):
+        """Chat name, qualified by platform for anything but Twitch so names can't collide."""
+        source = chat_sources.current_source.get()
+        return message.author.name if source == "twitch" else f"{source}:{message.author.name}"
+
+    async def handle_message(self, message):
+        """Handle incoming chat messages and commands (from the chat bus, in arrival order)"""
         if not message.author:
             return
+        if not self.is_primary:
+            # Standby: hold on to it in case the primary dies before acting on it
+            self._standby_backlog.append((time.time(), chat_sources.current_source.get(), message))
+            return
 
-        logging.info(f"Chat: {message.author.name}: {message.content}")
+        user = self.chat_user(message)
+        logging.info(f"Chat: {user}: {message.content}")
         
         parts = message.content.split()
         if not parts or not parts[0].startswith("!"):
@@ -597,11 +1146,13 @@ class DaggerfallBot(commands.Bot):
             
         command = parts[0][1:].lower()  # Remove ! prefix
         args = parts[1:] if len(parts) > 1 else []
+        _pending_command.set((command, time.perf_counter()))
+        loop_watchdog.tag_current_task(f"!{command}")
 
         # Log the command asynchronously to a local file
         try:
             ts = datetime.now(timezone.utc).isoformat()
-            logline = f"{ts} | {message.author.name} | {command} | {' '.join(args)}\n"
+            logline = f"{ts} | {user} | {command} | {' '.join(args)}\n"
             async with aiofiles.open("chat_commands_log.txt", mode="a") as f:
                 await f.write(logline)
         except Exception as e:
@@ -609,6 +1160,7 @@ class DaggerfallBot(commands.Bot):
 
         # Handle voting commands
         if command in self.votable_commands:
+            CHAT_COMMANDS.labels(command=command).inc()
             if command == "song" and not self.validate_song_arg(args)[0]:
                 await message.channel.send(self.validate_song_arg(args)[1])
                 return
@@ -616,7 +1168,7 @@ class DaggerfallBot(commands.Bot):
             return
 
         if command in ["yes", "no"] and self.voting_active:
-            await self.cast_vote(message.author.name, command)
+            await self.cast_vote(user, command)
             return
 
         # Map commands to methods
@@ -640,6 +1192,7 @@ class DaggerfallBot(commands.Bot):
             "modlist": self.modlist,
             "help": self.help,
             "exec": lambda: self.admin_command(message, lambda: self.exec_command(args)),
+            "profile": lambda: self.admin_command(message, lambda: self.profile(message, args)),
             "esc": lambda: self.send_movement(GameKeys.ESC, args),
             "killall": self.killall,
             "info": self.game_info,
@@ -649,11 +1202,13 @@ class DaggerfallBot(commands.Bot):
         }
 
         if command in command_map:
+            CHAT_COMMANDS.labels(command=command).inc()
+            startup_timeline.mark("first_command")
             await command_map[command]()
 
     async def admin_command(self, message, cmd):
-        """Execute admin-only commands"""
-        if message.author.name.lower() in Config.AUTHORIZED_USERS:
+        """Execute admin-only commands (Twitch only: other platforms' display names aren't unique)"""
+        if chat_sources.current_source.get() == "twitch" and message.author.name.lower() in Config.AUTHORIZED_USERS:
             await cmd()
 
     async def handle_movement_arg_required(self, message, key: GameKeys, args):
@@ -672,7 +1227,8 @@ class DaggerfallBot(commands.Bot):
 
     def validate_song_arg(self, args):
         """Validate song selection"""
-        default_msg = f'Specify song number (-1 to 131), "category" or "random."  ex - !song 127.  Full list: https://kershner.org/daggerwalk/?tab=songs'
+        default_msg = (f'Specify song number ({music_index.MIN_TRACK_ID} to {music_index.MAX_TRACK_ID}) or name, '
+                       f'"category" or "random."  ex - !song 127, !song gsunny2.  Full list: https://kershner.org/daggerwalk/?tab=songs')
         
         if not args:
             return False, default_msg
@@ -683,15 +1239,10 @@ class DaggerfallBot(commands.Bot):
         if song == "category" or song == "random":
             return True, None
                 
-        # Then try to convert to integer
-        try:
-            song_num = int(song)
-            if -1 <= song_num <= 131:
-                return True, None
-            return False, default_msg
-        except ValueError:
-            # If it's not a valid string or convertible to int, it's invalid
-            return False, default_msg
+        # Then a track number or (part of) a track name
+        if self.music.resolve(song) is not None:
+            return True, None
+        return False, default_msg
         
     def validate_weather_arg(self, args):
         """Validate weather selection"""
@@ -763,44 +1314,55 @@ class DaggerfallBot(commands.Bot):
                 return
 
         logging.info(f"Starting vote for {vote_type}")
+        VOTES_STARTED.labels(command=vote_type).inc()
         self.voting_active = True
         self.current_vote_type = vote_type
         self.current_vote_message = message
         self.votes = {}
         
         # Automatically count the vote initiator as a "yes" vote
-        self.votes[message.author.name] = "yes"
+        self.votes[self.chat_user(message)] = "yes"
         
-        channel = self.connected_channels[0]
+        # Anyone on any platform can vote, so votes are announced everywhere
+        channel = self.chat_bus.broadcast
         # Update the message to show initial vote count
         await channel.send(f"🗳️ Vote started for:【{self.votable_commands[vote_type]}】- Use !yes or !no - {Config.VOTING_DURATION} seconds (Yes: 1 | No: 0)")
-        self.voting_task = asyncio.create_task(self.end_vote_timer(channel))
+        self.voting_task = asyncio.create_task(self.end_vote_timer(channel), name=f"vote !{vote_type}")
+
+    @staticmethod
+    def tally_votes(votes):
+        """(yes, no) counts from a {username: "yes"/"no"} ballot box"""
+        yes_votes = sum(1 for v in votes.values() if v == "yes")
+        no_votes = sum(1 for v in votes.values() if v == "no")
+        return yes_votes, no_votes
 
     async def cast_vote(self, username, vote):
         if not self.voting_active:
             return
             
         logging.info(f"Vote cast by {username}: {vote}")
+        VOTES_CAST.labels(vote=vote).inc()
         self.votes[username] = vote
-        yes_votes = sum(1 for v in self.votes.values() if v == "yes")
-        no_votes = sum(1 for v in self.votes.values() if v == "no")
+        yes_votes, no_votes = self.tally_votes(self.votes)
         
-        channel = self.connected_channels[0]
+        channel = self.chat_bus.broadcast
         await channel.send(f"Votes for:【{self.votable_commands[self.current_vote_type]}】- Yes: {yes_votes} | No: {no_votes}")
 
     async def end_vote_timer(self, channel):
+        chat_sources.current_channel.set(None)  # the voted command's output goes to every source
         await asyncio.sleep(Config.VOTING_DURATION)
         
         if not self.voting_active:
             return
             
-        yes_votes = sum(1 for v in self.votes.values() if v == "yes")
-        no_votes = sum(1 for v in self.votes.values() if v == "no")
+        yes_votes, no_votes = self.tally_votes(self.votes)
         
         logging.info(f"Vote ended for {self.current_vote_type} - Yes: {yes_votes}, No: {no_votes}")
         await channel.send(f"✅ Vote ended for:【{self.votable_commands[self.current_vote_type]}】- Yes: {yes_votes} | No: {no_votes}")
         
-        if yes_votes > no_votes:
+        passed = yes_votes > no_votes
+        VOTE_RESULTS.labels(command=self.current_vote_type, result="passed" if passed else "failed").inc()
+        if passed:
             await self.execute_voted_command()
         
         self.voting_active = False
@@ -861,23 +1423,23 @@ class DaggerfallBot(commands.Bot):
         if current_region == "Ocean":
             # No province to select for Ocean, so just open the map, wait a bit, and exit the map
             logging.info("Ocean region detected - using alternate map sequence")
-            send_game_input(GameKeys.MAP.value)  # Open map
-            time.sleep(7)
-            send_game_input(GameKeys.MAP.value)  # Press V to exit
+            await send_game_sequence([
+                (GameKeys.MAP.value, 7),  # Open map, wait
+                (GameKeys.MAP.value, 0),  # Press V to exit
+            ])
         else:
             # Original behavior for non-ocean regions
-            send_game_input(GameKeys.MAP.value)  # Open map
-            time.sleep(3)
-            send_game_input("{ENTER}")  # Press ENTER
-            time.sleep(6)  # Wait 6 seconds
-            send_game_input(GameKeys.MAP.value)  # Press V
-            time.sleep(2)
-            send_game_input(GameKeys.MAP.value)  # Press V again
+            await send_game_sequence([
+                (GameKeys.MAP.value, 3),  # Open map
+                ("{ENTER}", 6),  # Press ENTER, wait 6 seconds
+                (GameKeys.MAP.value, 2),  # Press V
+                (GameKeys.MAP.value, 0),  # Press V again
+            ])
 
     async def toggle_camera(self):
         """Toggle Third Person Camera mod in game"""
         logging.info("Executing camera command")
-        time.sleep(1)
+        await asyncio.sleep(1)
         send_game_input(GameKeys.CAMERA.value)
         current = self.state.get("camera_mode", "first")
         new_mode = "third" if current == "first" else "first"
@@ -893,19 +1455,11 @@ class DaggerfallBot(commands.Bot):
     async def use_shotgun(self):
         """Use shotgun weapon by raising weapon, firing, and then lowering it"""
         logging.info("Executing shotgun command")
-        
-        # Raise weapon
-        logging.info("Raising weapon")
-        send_game_input('Z')
-        time.sleep(0.5)
-        
-        # Fire weapon
-        logging.info("Firing weapon")
-        send_game_input('X')
-        
-        # Wait before lowering weapon
-        time.sleep(2)
-        send_game_input('Z')
+        await send_game_sequence([
+            ('Z', 0.5),  # Raise weapon
+            ('X', 2),  # Fire, wait before lowering
+            ('Z', 0),  # Lower weapon
+        ])
 
     async def reset(self):
         """Reset to random location"""
@@ -918,21 +1472,22 @@ class DaggerfallBot(commands.Bot):
         
         await asyncio.sleep(5)
 
-        channel = self.connected_channels[0]
+        channel = self.reply_channel()
         await channel.send('Sent to last known location!')
         
     async def song(self, choice=None):
         """Change background music"""
         logging.info(f"Executing song command with choice: {choice}")
         
-        self.send_console_command(f"song {choice}")
+        # The mod only takes track numbers; names are resolved here
+        track_id = None if str(choice).lower() == "random" else self.music.resolve(choice)
+        self.send_console_command(f"song {choice if track_id is None else track_id}")
         
         await asyncio.sleep(5)
         
-        channel = self.connected_channels[0]
+        channel = self.reply_channel()
         await channel.send('Song changed!')
-        track_id = getattr(self, "_track_map", {}).get(str(choice), None)
-        song_display = f"{choice} (Track {track_id})" if track_id is not None else str(choice)
+        song_display = self.music.display(track_id) if track_id is not None else str(choice)
         self._update_state("song", song_display)
 
     async def song_category(self, categories):
@@ -945,7 +1500,7 @@ class DaggerfallBot(commands.Bot):
         
         await asyncio.sleep(5)
         
-        channel = self.connected_channels[0]
+        channel = self.reply_channel()
         categories_str_display = ", ".join(categories)
         await channel.send(f'Song shuffle categories changed to: {categories_str_display}!')
         self._update_state("song_category", categories_str_display.lower())
@@ -958,7 +1513,7 @@ class DaggerfallBot(commands.Bot):
 
         await asyncio.sleep(5)
         
-        channel = self.connected_channels[0]
+        channel = self.reply_channel()
         weather_emoji = Config.WEATHER_EMOJIS.get(weather_choice.title(), "🌈")
         await channel.send(f'Weather changed to: {weather_emoji}{weather_choice.title()}!')
 
@@ -970,7 +1525,7 @@ class DaggerfallBot(commands.Bot):
 
         await asyncio.sleep(5)
         
-        channel = self.connected_channels[0]
+        channel = self.reply_channel()
         await channel.send(f'Levitate set to: {levitate_choice}!')
         self._update_state("levitate", levitate_choice.lower())
 
@@ -982,7 +1537,7 @@ class DaggerfallBot(commands.Bot):
 
         await asyncio.sleep(5)
         
-        channel = self.connected_channels[0]
+        channel = self.reply_channel()
         await channel.send("Toggled enemy AI!")
         current = self.state.get("ai_enabled", True)
         self._update_state("ai_enabled", not current)
@@ -995,7 +1550,7 @@ class DaggerfallBot(commands.Bot):
         
         await asyncio.sleep(5)
         
-        channel = self.connected_channels[0]
+        channel = self.reply_channel()
         await channel.send("Teleported outside of current building, or did nothing if already outside.")
 
     async def set_gravity(self, gravity_level):
@@ -1006,7 +1561,7 @@ class DaggerfallBot(commands.Bot):
 
         await asyncio.sleep(5)
         
-        channel = self.connected_channels[0]
+        channel = self.reply_channel()
         await channel.send(f'Gravity set to: {gravity_level}!')
         self._update_state("gravity", int(gravity_level))
 
@@ -1050,8 +1605,8 @@ class DaggerfallBot(commands.Bot):
             send_game_input(GameKeys.CONSOLE.value)
         except Exception as e:
             logging.error(f"playvid error: {e}")
-            if self.connected_channels:
-                await self.connected_channels[0].send("Failed to play that video.")
+            if self.reply_channel():
+                await self.reply_channel().send("Failed to play that video.")
 
     async def killall(self):
         """Kill all enemies"""
@@ -1063,28 +1618,12 @@ class DaggerfallBot(commands.Bot):
         logging.info(f"Sending console command: {command}")
         
         try:
-            # Get the game window
-            window = next((w for w in gw.getWindowsWithTitle("Daggerfall Unity") 
-                          if w.title == "Daggerfall Unity"), None)
-                          
-            if not window:
-                logging.warning("Game window not found for console command")
+            backend = game_input.get_backend()
+            if getattr(backend, "remote", False):
+                backend.console(command, command=_pending_command.get())
+                _pending_command.set(None)
                 return
-                
-            app = pywinauto.Application(backend="win32").connect(handle=window._hWnd)
-            dlg = app.window(handle=window._hWnd)
-            
-            # Open console
-            send_game_input(GameKeys.CONSOLE.value)
-            time.sleep(0.5)
-            
-            send_game_input(command)  # Send command
-            time.sleep(0.5)
-            
-            # Send ENTER and close console using regular game input
-            send_game_input("{ENTER}")
-            time.sleep(1)
-            send_game_input(GameKeys.CONSOLE.value)
+            _run_input(_console_now, command)
             
         except Exception as e:
             logging.error(f"Error sending console command: {e}")
@@ -1095,18 +1634,24 @@ class DaggerfallBot(commands.Bot):
         async with aiofiles.open(file_path, 'r') as f:
             return json.loads(await f.read())
 
+    @staticmethod
+    def normalize_map_data(map_data):
+        """MapData.json values as stripped strings, the shape everything downstream expects."""
+        return {k: str(v).strip() for k, v in map_data.items()}
+
     async def get_map_json_data(self):
         """Get and process map data from Daggerfall Unity"""
+        if self.trail and time.monotonic() - self._latest_sample_at < Config.TELEMETRY_MAX_AGE:
+            return dict(self.trail[-1])  # newer than MapData.json, and already parsed
         try:
-            # Get map data path
-            user_home = os.path.expanduser('~')
-            mapdata_path = os.path.join(user_home, 'AppData', 'LocalLow', 
-                                        'Daggerfall Workshop', 'Daggerfall Unity', 
-                                        'MapData.json')
+            mapdata_path = game_input.get_backend().mapdata_path
             
             # Load and process map data
+            start = time.perf_counter()
             map_data = await self.load_json_async(mapdata_path)
-            return {k: str(v).strip() for k, v in map_data.items()}
+            result = self.normalize_map_data(map_data)
+            MAPDATA_READ.observe(time.perf_counter() - start)
+            return result
             
         except Exception as e:
             logging.error(f"Error reading map data: {e}")
@@ -1122,154 +1667,142 @@ class DaggerfallBot(commands.Bot):
             time_of_day = "night"
         return f"Walking through {region} on a {weather.lower()} {time_of_day}"    
 
-    async def update_stream_title(self, region: str, weather: str, time_str: str):
+    async def update_stream_title(self, title: str):
         try:
-            title = self.build_live_text(region, weather, time_str)
-
-            client_id, oauth_token = Config.get_oauth()
-
-            if oauth_token.startswith("oauth:"):
-                oauth_token = oauth_token[6:]
-
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    "https://api.twitch.tv/helix/users",
-                    headers={
-                        "Client-ID": client_id,
-                        "Authorization": f"Bearer {oauth_token}",
-                    }
-                ) as resp:
-                    data = await resp.json()
-                    broadcaster_id = data["data"][0]["id"]
-
-                async with session.patch(
-                    f"https://api.twitch.tv/helix/channels?broadcaster_id={broadcaster_id}",
-                    headers={
-                        "Client-ID": client_id,
-                        "Authorization": f"Bearer {oauth_token}",
-                        "Content-Type": "application/json"
-                    },
-                    json={"title": title}
-                ) as patch_resp:
-                    if patch_resp.status == 204:
-                        logging.info(f"Stream title updated to: {title}")
-                    else:
-                        err = await patch_resp.text()
-                        raise Exception(f"{patch_resp.status} - {err}")
-
+            await resilience.get("helix").call(self._patch_stream_title, title)
         except Exception as e:
             logging.error(f"Failed to update stream title: {e}")
 
+    async def _patch_stream_title(self, title: str):
+        client_id, oauth_token = Config.get_oauth()
+
+        if oauth_token.startswith("oauth:"):
+            oauth_token = oauth_token[6:]
+
+        async with aiohttp.ClientSession() as session:
+            async with session.get(
+                "https://api.twitch.tv/helix/users",
+                headers={
+                    "Client-ID": client_id,
+                    "Authorization": f"Bearer {oauth_token}",
+                }
+            ) as resp:
+                data = await resp.json()
+                broadcaster_id = data["data"][0]["id"]
+
+            async with session.patch(
+                f"https://api.twitch.tv/helix/channels?broadcaster_id={broadcaster_id}",
+                headers={
+                    "Client-ID": client_id,
+                    "Authorization": f"Bearer {oauth_token}",
+                    "Content-Type": "application/json"
+                },
+                json={"title": title}
+            ) as patch_resp:
+                if patch_resp.status == 204:
+                    logging.info(f"Stream title updated to: {title}")
+                else:
+                    err = await patch_resp.text()
+                    raise Exception(f"{patch_resp.status} - {err}")
+
+    def build_status_line(self, response_data):
+        """Render the !info status line; returns (status, region, weather, time_hms)."""
+        log = response_data.get('log') or {}
+        region_fk = log.get('region_fk') or {}
+        poi = log.get('poi') or {}
+
+        # Basics
+        region = (log.get('region') or '').strip()
+        location = (log.get('location') or '').strip()
+        weather = (log.get('weather') or '').strip()
+        season = (log.get('season') or '').strip()
+        current_song = (log.get('current_song') or '').strip()
+
+        # Ocean + "near" handling
+        in_ocean = region.lower() == 'ocean'
+        last_known_name = ''
+        if in_ocean:
+            lkr = log.get('last_known_region')
+            if isinstance(lkr, dict):  # if you nest this in the serializer (recommended)
+                last_known_name = (lkr.get('name') or '').strip()
+
+        # Climate/emoji (already proper Unicode via serializers; no decode needed)
+        climate = (region_fk.get('climate') or '').strip()
+        climate_emoji = region_fk.get('emoji') or ''
+
+        poi_emoji = poi.get('emoji') or ''
+
+        # Time formatting (date like: "…, HH:MM:SS")
+        date_str = log.get('date', '') or ''
+        date_val, time_12hr, time_hms = "", "", ""
+        if date_str and ',' in date_str:
+            parts = [p.strip() for p in date_str.split(',')]
+            time_hms = parts[-1] if parts else ""
+            try:
+                dt_t = datetime.strptime(time_hms, '%H:%M:%S')
+                time_12hr = dt_t.strftime('%I:%M %p').lstrip('0')
+                date_val = ", ".join(parts[:-1]).strip()
+            except ValueError:
+                # leave raw if parse fails
+                date_val = date_str
+
+        # Emojis
+        weather_emoji = Config.WEATHER_EMOJIS.get(weather, "🌈")
+        season_emoji = Config.SEASON_EMOJIS.get(season, "❓")
+
+        # Music info
+        track_id = self.music.id_for(current_song)
+        music_info = f"🎵{current_song} (Track {track_id})" if current_song and track_id is not None else ""
+
+        # Map link
+        map_link = "🗺️Map: https://kershner.org/daggerwalk"
+
+        # Location string
+        if in_ocean:
+            near = f" near {last_known_name}" if last_known_name else ""
+            location_part = f"🌊Ocean{near}"
+        else:
+            # e.g. "🌍Daggerfall🌲Woodlands 🏰Wayrest"
+            left = f"🌍{region}{climate_emoji}{climate}".strip()
+            right = f"{poi_emoji}{location}".strip()
+            location_part = f"{left} {right}".strip()
+
+        # Final status line
+        status = " ".join(filter(None, [
+            location_part,
+            f"⌚{time_12hr}" if time_12hr else "",
+            f"📅{date_val}" if date_val else "",
+            f"{season_emoji}{season}" if season else "",
+            f"{weather_emoji}{weather}" if weather else "",
+            music_info,
+            map_link,
+        ]))
+        return status, region, weather, time_hms
+
     async def game_info(self):
-        """Display game state information (cached only)."""
+        """Display game state information (pre-rendered; no parsing or I/O here)."""
+        await self._await_initial_state()
         
         try:
-            # Ensure we have cached data; do a one-shot refresh if empty or very stale
-            if not self._latest_response_data or (
-                self._latest_response_at and
-                (datetime.now(timezone.utc) - self._latest_response_at).total_seconds() > Config.REFRESH_INTERVAL * 2
-            ):
-                ok = await self.refresh_now()
-                if not ok and self.connected_channels:
-                    await self.connected_channels[0].send("No info yet — gathering data…")
-                    return
-
-            # Cache music tracks if needed
-            if not hasattr(self, '_music_tracks'):
-                music_data_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'list_music_tracks.json')
-                self._music_tracks = await self.load_json_async(music_data_path)
-                self._track_map = {track['TrackName']: track['TrackID'] for track in self._music_tracks}
-
-            response_data = self._latest_response_data
-
-            # === Rest of the existing method unchanged ===
-            log = response_data.get('log') or {}
-            region_fk = log.get('region_fk') or {}
-            poi = log.get('poi') or {}
-
-            # Basics
-            region = (log.get('region') or '').strip()
-            location = (log.get('location') or '').strip()
-            weather = (log.get('weather') or '').strip()
-            season = (log.get('season') or '').strip()
-            current_song = (log.get('current_song') or '').strip()
-
-            # Ocean + "near" handling
-            in_ocean = region.lower() == 'ocean'
-            last_known_name = ''
-            if in_ocean:
-                lkr = log.get('last_known_region')
-                if isinstance(lkr, dict):  # if you nest this in the serializer (recommended)
-                    last_known_name = (lkr.get('name') or '').strip()
-
-            # Climate/emoji (already proper Unicode via serializers; no decode needed)
-            climate = (region_fk.get('climate') or '').strip()
-            climate_emoji = region_fk.get('emoji') or ''
-
-            poi_emoji = poi.get('emoji') or ''
-
-            # Time formatting (date like: "…, HH:MM:SS")
-            date_str = log.get('date', '') or ''
-            date_val, time_12hr, time_hms = "", "", ""
-            if date_str and ',' in date_str:
-                parts = [p.strip() for p in date_str.split(',')]
-                time_hms = parts[-1] if parts else ""
-                try:
-                    dt_t = datetime.strptime(time_hms, '%H:%M:%S')
-                    time_12hr = dt_t.strftime('%I:%M %p').lstrip('0')
-                    date_val = ", ".join(parts[:-1]).strip()
-                except ValueError:
-                    # leave raw if parse fails
-                    date_val = date_str
-
-            # Emojis
-            weather_emoji = Config.WEATHER_EMOJIS.get(weather, "🌈")
-            season_emoji = Config.SEASON_EMOJIS.get(season, "❓")
-
-            # Music info
-            track_id = getattr(self, '_track_map', {}).get(current_song, None)
-            music_info = f"🎵{current_song} (Track {track_id})" if current_song and track_id is not None else ""
-
-            # Map link
-            map_link = "🗺️Map: https://kershner.org/daggerwalk"
-
-            # Location string
-            if in_ocean:
-                near = f" near {last_known_name}" if last_known_name else ""
-                location_part = f"🌊Ocean{near}"
-            else:
-                # e.g. "🌍Daggerfall🌲Woodlands 🏰Wayrest"
-                left = f"🌍{region}{climate_emoji}{climate}".strip()
-                right = f"{poi_emoji}{location}".strip()
-                location_part = f"{left} {right}".strip()
-
-            # Final status line
-            status = " ".join(filter(None, [
-                location_part,
-                f"⌚{time_12hr}" if time_12hr else "",
-                f"📅{date_val}" if date_val else "",
-                f"{season_emoji}{season}" if season else "",
-                f"{weather_emoji}{weather}" if weather else "",
-                music_info,
-                map_link,
-            ]))
+            # Serve what's rendered; if it's missing or very stale, refresh in the background
+            if self._response_is_stale():
+                self._refresh_in_background()
+            rendered = self.rendered
+            if rendered.info is None:
+                if self.reply_channel():
+                    await self.reply_channel().send("No info yet — gathering data…")
+                return
 
             # Debounce to avoid duplicate !info within a short window
             now_m = time.monotonic()
             last_m = getattr(self, "_last_info_sent_at", 0.0)
             if now_m - last_m >= 3.5:
-                if self.connected_channels:
-                    await self.connected_channels[0].send(status)
+                if self.reply_channel():
+                    await self.reply_channel().send(rendered.info)
                 self._last_info_sent_at = now_m
             else:
                 logging.info("Suppressed duplicate !info within debounce window")
 
-            # Update stream title when we have HH:MM:SS
-            if time_hms:
-                live_text = self.build_live_text(region or "", weather or "", time_hms)
-                self._update_state("bluesky_live_text", live_text)
-                await self.update_stream_title(region or "", weather or "", time_hms)
-
         except Exception as e:
             logging.error(f"Info error: {e}")
 
@@ -1293,11 +1826,19 @@ class DaggerfallBot(commands.Bot):
             logging.info(f"Skipping stuck check - in quiet hours (hour={now.hour}, minute={now.minute})")
             return
         
+        import requests
+
+        django = resilience.get("django")
+
+        async def get_results(url):
+            response = await django.call(requests.get, url, timeout=5, is_failure=django_post_failed)
+            return response.json().get("results", [])
+
         try:
             base = Config.DJANGO_BASE_API_URL
             logging.info(f"Fetching logs from {base}/logs/...")
 
-            logs = requests.get(f"{base}/logs/?limit=2&ordering=-id", timeout=5).json().get("results", [])
+            logs = await get_results(f"{base}/logs/?limit=2&ordering=-id")
             logging.info(f"Retrieved {len(logs)} logs")
             
             if len(logs) < 2:
@@ -1324,8 +1865,10 @@ class DaggerfallBot(commands.Bot):
             logging.info("Positions are identical - checking stop/walk commands...")
 
             # get last stop and walk
-            stop_cmds = requests.get(f"{base}/chat_commands/?limit=1&ordering=-id&command=stop", timeout=5).json().get("results", [])
-            walk_cmds = requests.get(f"{base}/chat_commands/?limit=1&ordering=-id&command=walk", timeout=5).json().get("results", [])
+            stop_cmds, walk_cmds = await asyncio.gather(
+                get_results(f"{base}/chat_commands/?limit=1&ordering=-id&command=stop"),
+                get_results(f"{base}/chat_commands/?limit=1&ordering=-id&command=walk"),
+            )
             stop_id = stop_cmds[0]["id"] if stop_cmds else 0
             walk_id = walk_cmds[0]["id"] if walk_cmds else 0
             logging.info(f"Last stop ID: {stop_id}, last walk ID: {walk_id}")
@@ -1343,15 +1886,15 @@ class DaggerfallBot(commands.Bot):
                         return
 
             # still grab most recent command overall (to handle bighop case)
-            cmds = requests.get(f"{base}/chat_commands/?limit=1&ordering=-id", timeout=5).json().get("results", [])
+            cmds = await get_results(f"{base}/chat_commands/?limit=1&ordering=-id")
             last_cmd = cmds[0]["command"].lower() if cmds else None
             logging.info(f"Last command: {last_cmd}")
 
-            if not self.connected_channels:
+            if not self.reply_channel():
                 logging.warning("No connected channels for stuck message")
                 return
             
-            channel = self.connected_channels[0]
+            channel = self.reply_channel()
             logging.info("Bot appears stuck - sending unstuck message...")
             await channel.send("The Walker might be stuck, attempting to free them...")
 
@@ -1374,7 +1917,7 @@ class DaggerfallBot(commands.Bot):
     async def help(self):
         """Display available commands"""
         logging.info("Executing help command")
-        channel = self.connected_channels[0]
+        channel = self.reply_channel()
         
         combined_message = (
             "💀🌲Daggerwalk Commands: "
@@ -1389,7 +1932,7 @@ class DaggerfallBot(commands.Bot):
     async def more_commands(self):
         """Display more commands"""
         logging.info("Executing more commands")
-        channel = self.connected_channels[0]
+        channel = self.reply_channel()
         
         combined_message = (
             "🗡️More Daggerwalk Commands: "
@@ -1401,7 +1944,7 @@ class DaggerfallBot(commands.Bot):
     async def modlist(self):
         """Display active mods"""
         logging.info("Executing modlist command")
-        channel = self.connected_channels[0]
+        channel = self.reply_channel()
         await channel.send("Daggerwalk uses the following Daggerfall Unity mods:")
         await asyncio.sleep(Config.CHAT_DELAY)
         await channel.send(", ".join(Config.ACTIVE_MODS))
@@ -1416,10 +1959,25 @@ class DaggerfallBot(commands.Bot):
         logging.info("Executing load command")
         send_game_input(GameKeys.LOAD.value)
 
+    async def profile(self, message, args):
+        """Sample every thread for a while and write collapsed stacks (admin only)"""
+        seconds = int(args[0]) if args and args[0].isdigit() else Config.PROFILE_SECONDS
+        prof = profiler.start_capture(seconds, loop=asyncio.get_running_loop())
+        if prof is None:
+            await message.channel.send("A profile is already running.")
+            return
+        await message.channel.send(f"Profiling for {prof.seconds}s...")
+        while not prof.done.is_set():
+            await asyncio.sleep(0.5)
+        if prof.path:
+            await message.channel.send(f"Profile saved: {prof.path} ({prof.samples} samples)")
+        else:
+            await message.channel.send("Profile failed, see log.")
+
     async def exec_command(self, args):
         """Execute console command (admin only)"""
         if not args:
-            await self.connected_channels[0].send("Usage: !exec <command> <args>")
+            await self.reply_channel().send("Usage: !exec <command> <args>")
             return
         logging.info(f"Executing admin command: {' '.join(args)}")
         self.send_console_command(" ".join(args))
@@ -1481,62 +2039,91 @@ class DaggerfallBot(commands.Bot):
 
     async def quest(self):
         """Report current quest (and most recent completion if present)."""
-        await self.refresh_now()
+        await self._await_initial_state()
         
         try:
-            # If we’ve never cached a response (e.g., right after startup), try one-shot refresh
-            if not self._latest_response_data:
-                ok = await self.refresh_now()
-                if not ok:
-                    if self.connected_channels:
-                        await self.connected_channels[0].send("No quest info available yet.")
-                    return
+            if self._response_is_stale():
+                self._refresh_in_background()
+            rendered = self.rendered
+            if rendered.quest_current is None:
+                if self.reply_channel():
+                    await self.reply_channel().send("No quest info available yet.")
+                return
 
-            completion_line, current_line = self._format_quest_lines_from_response(self._latest_response_data)
+            completion_line, current_line = rendered.quest_completion, rendered.quest_current
 
-            if self.connected_channels:
+            if self.reply_channel():
                 # Prefer showing current quest; include completion if the last update completed one
                 if current_line:
-                    await self.connected_channels[0].send(current_line)
+                    await self.reply_channel().send(current_line)
                 if completion_line:
-                    await self.connected_channels[0].send(completion_line)
+                    await self.reply_channel().send(completion_line)
 
         except Exception as e:
             logging.error(f"!quest error: {e}")
-            if self.connected_channels:
-                await self.connected_channels[0].send("Failed to fetch quest info.")
+            if self.reply_channel():
+                await self.reply_channel().send("Failed to fetch quest info.")
+
+    def format_state_line(self):
+        """Current local bot state in plain format, as !state shows it."""
+        parts = []
+        s = self.state
+
+        if s.get("song"):
+            parts.append(f"Song: {s['song']}")
+        if s.get("song_category"):
+            parts.append(f"Song Category: {s['song_category']}")
+        if s.get("gravity") is not None:
+            parts.append(f"Gravity: {s['gravity']}")
+        if s.get("levitate"):
+            parts.append(f"Levitate: {s['levitate']}")
+        if s.get("ai_enabled") is not None:
+            ai_str = "on" if s['ai_enabled'] else "off"
+            parts.append(f"AI: {ai_str}")
+        if s.get("camera_mode"):
+            parts.append(f"Camera: {s['camera_mode']}")
+        if s.get("next_log_time"):
+            est = pytz.timezone("US/Eastern")
+            t = s['next_log_time'].astimezone(est)
+            parts.append(f"Next log: {t.strftime('%I:%M %p EST').lstrip('0')}")
+        return " • ".join(parts) if parts else "No state values set yet."
 
     async def show_state(self):
-        """Display current local bot state in plain format."""
+        """Display current local bot state (pre-rendered on every state change)."""
         try:
-            parts = []
-            s = self.state
-
-            if s.get("song"):
-                parts.append(f"Song: {s['song']}")
-            if s.get("song_category"):
-                parts.append(f"Song Category: {s['song_category']}")
-            if s.get("gravity") is not None:
-                parts.append(f"Gravity: {s['gravity']}")
-            if s.get("levitate"):
-                parts.append(f"Levitate: {s['levitate']}")
-            if s.get("ai_enabled") is not None:
-                ai_str = "on" if s['ai_enabled'] else "off"
-                parts.append(f"AI: {ai_str}")
-            if s.get("camera_mode"):
-                parts.append(f"Camera: {s['camera_mode']}")
-            if s.get("next_log_time"):
-                est = pytz.timezone("US/Eastern")
-                t = s['next_log_time'].astimezone(est)
-                parts.append(f"Next log: {t.strftime('%I:%M %p EST').lstrip('0')}")
-
-            msg = " • ".join(parts) if parts else "No state values set yet."
-            if self.connected_channels:
-                await self.connected_channels[0].send(msg)
+            msg = self.rendered.state or self.format_state_line()
+            if self.reply_channel():
+                await self.reply_channel().send(msg)
             logging.info(f"Displayed state: {msg}")
         except Exception as e:
             logging.error(f"show_state error: {e}")
 
 if __name__ == "__main__":
+    RESTARTS.set(int(os.environ.get("DAGGERWALK_RESTARTS", 0)))
+    if os.environ.get("DAGGERWALK_METRICS_PORT"):
+        Config.METRICS_PORT = int(os.environ["DAGGERWALK_METRICS_PORT"]) or None
+    if os.environ.get("DAGGERWALK_LEASE"):
+        # One of a primary/standby pair; whoever holds the lease acts
+        Config.STANDBY_LEASE = os.environ["DAGGERWALK_LEASE"]
+    if Config.METRICS_PORT:
+        try:
+            metrics.start_http_server(Config.METRICS_PORT)
+        except OSError as e:
+            logging.error(f"Metrics endpoint failed to start: {e}")
+    if os.environ.get("DAGGERWALK_EXECUTOR"):
+        # Keystrokes go to a separate input_executor process (which owns the game, or the sim)
+        game_input.set_backend(input_executor.ExecutorClient(
+            os.environ["DAGGERWALK_EXECUTOR"], on_first_key=_observe_first_keystroke))
+    elif os.environ.get("DAGGERWALK_SIM"):
+        # Headless: simulated game instead of the Daggerfall Unity window
+        import sim_game
+        game_input.set_backend(sim_game.from_env().start())
+    if "DAGGERWALK_DFU_CHANNEL" in os.environ:
+        Config.DFU_CHANNEL = os.environ["DAGGERWALK_DFU_CHANNEL"] or None  # empty: always type
+    if Config.DFU_CHANNEL:
+        game_input.set_channel(dfu_channel.CommandChannel(Config.DFU_CHANNEL))
+    if os.environ.get("DAGGERWALK_YOUTUBE_CHAT"):
+        # DAGGERWALK_YOUTUBE_API_URL points it at a local stand-in
+        Config.YOUTUBE_CHAT = True
     bot = DaggerfallBot()
     bot.run()
\ No newline at end of file
@@ -0,0 +1,122 @@
+# dfu_channel.py
+"""Console commands straight to Daggerfall Unity, without typing them.
+
+The CommandChannel mod (dfu_mods/CommandChannel.cs) listens on a localhost
+TCP port and runs console commands on the game's main thread. Messages
+are JSON lines, like input_executor's:
+
+    -> {"id": 3, "command": "set_weather 4"}
+    <- {"id": 3, "ok": true, "result": "Weather set to Rain"}
+    <- {"id": 4, "ok": false, "error": "Unknown command tai2"}
+
+An ack comes back in a frame or two, against ~2.5s of sleeps to open the
+console, type, press enter and close it, and it doesn't depend on the
+window having focus.
+
+game_input.console() tries the channel first and types the command if the
+channel can't be reached or doesn't answer within ACK_TIMEOUT. A timed-out
+command may still have run, so it can run twice; every command the bot
+sends is safe to repeat. An ok=false reply is the game's answer and is not
+retried by typing. After a failed connect the channel isn't tried again
+for RETRY_AFTER seconds, so a game without the mod costs nothing.
+
+bench/fake_dfu_channel.py is a local stand-in for the mod.
+"""
+import itertools
+import json
+import logging
+import socket
+import threading
+import time
+import metrics
+
+DEFAULT_ADDRESS = "127.0.0.1:8766"
+CONNECT_TIMEOUT = 0.2
+ACK_TIMEOUT = 1.0  # a couple of frames, even on a bad one
+RETRY_AFTER = 5.0
+
+COMMANDS = metrics.counter("daggerwalk_dfu_channel_commands_total", "Console commands over the command channel",
+                           ["result"])
+ACK_SECONDS = metrics.histogram(
+    "daggerwalk_dfu_channel_ack_seconds", "Console command sent to acknowledged by the game",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+
+
+class ChannelUnavailable(ConnectionError):
+    """The command wasn't acknowledged; the caller should type it instead."""
+
+
+def parse_address(address):
+    host, _, port = (address or DEFAULT_ADDRESS).rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+class CommandChannel:
+    def __init__(self, address=None, ack_timeout=ACK_TIMEOUT):
+        self.host, self.port = parse_address(address)
+        self.ack_timeout = ack_timeout
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()  # one request at a time; the bot and executor call from threads
+        self._sock = None
+        self._buffer = b""
+        self._down_until = 0.0
+
+    def __repr__(self):
+        return f"CommandChannel({self.host}:{self.port})"
+
+    def run(self, command):
+        """Run a console command in the game; returns the reply dict. Raises ChannelUnavailable."""
+        with self._lock:
+            if time.monotonic() < self._down_until:
+                COMMANDS.labels(result="skipped").inc()
+                raise ChannelUnavailable(f"{self!r} down, retrying in {self._down_until - time.monotonic():.0f}s")
+            request_id = next(self._ids)
+            start = time.perf_counter()
+            try:
+                self._ensure_connected()
+                self._sock.sendall((json.dumps({"id": request_id, "command": command}) + "\n").encode())
+                reply = self._read_reply(request_id, start + self.ack_timeout)
+            except (OSError, ValueError) as e:
+                self._close()
+                self._down_until = time.monotonic() + RETRY_AFTER
+                COMMANDS.labels(result="unavailable").inc()
+                raise ChannelUnavailable(f"{self!r}: {e}") from e
+            ACK_SECONDS.observe(time.perf_counter() - start)
+            COMMANDS.labels(result="ok" if reply.get("ok") else "error").inc()
+            if not reply.get("ok"):
+                logging.warning(f"DFU rejected '{command}': {reply.get('error')}")
+            return reply
+
+    def _ensure_connected(self):
+        if self._sock is None:
+            self._sock = socket.create_connection((self.host, self.port), timeout=CONNECT_TIMEOUT)
+            self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._buffer = b""
+            logging.info(f"Connected to DFU command channel at {self.host}:{self.port}")
+
+    def _read_reply(self, request_id, deadline):
+        while True:
+            line, sep, rest = self._buffer.partition(b"\n")
+            if sep:
+                self._buffer = rest
+                reply = json.loads(line)
+                if reply.get("id") == request_id:
+                    return reply
+                continue  # late ack for a request we already gave up on
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                raise socket.timeout("no ack")
+            self._sock.settimeout(remaining)
+            chunk = self._sock.recv(4096)
+            if not chunk:
+                raise ConnectionResetError("DFU closed the command channel")
+            self._buffer += chunk
+
+    def _close(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
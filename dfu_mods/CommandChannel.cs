@@ -0,0 +1,160 @@
+using System;
+using System.Collections.Concurrent;
+using System.IO;
+using System.Net;
+using System.Net.Sockets;
+using System.Text;
+using System.Threading;
+using UnityEngine;
+using DaggerfallWorkshop.Game;
+using DaggerfallWorkshop.Game.Utility.ModSupport;
+using Newtonsoft.Json;
+using Newtonsoft.Json.Linq;
+using Wenzil.Console;
+
+// Runs console commands sent over a localhost socket, so the bot doesn't
+// have to open the console and type them (see dfu_channel.py).
+//
+//   -> {"id": 3, "command": "set_weather 4"}
+//   <- {"id": 3, "ok": true, "result": "..."}
+//
+// The socket is read on a background thread; commands run on the main
+// thread in Update(), one frame after they arrive at most.
+public class CommandChannel : MonoBehaviour
+{
+    public static Mod mod;
+
+    // Configuration
+    private const int PORT = 8766;
+
+    private class Request
+    {
+        public long Id;
+        public string Command;
+        public StreamWriter Writer;
+    }
+
+    private readonly ConcurrentQueue<Request> pending = new ConcurrentQueue<Request>();
+    private TcpListener listener;
+    private Thread listenThread;
+    private volatile bool running = false;
+
+    [Invoke(StateManager.StateTypes.Start, 0)]
+    public static void Init(InitParams initParams)
+    {
+        Debug.Log("CommandChannel: Init() was called! Registering mod...");
+        mod = initParams.Mod;
+        mod.IsReady = true;
+
+        var go = new GameObject(mod.Title);
+        go.AddComponent<CommandChannel>();
+
+        Debug.Log("CommandChannel: GameObject created and component attached.");
+    }
+
+    void Awake()
+    {
+        try
+        {
+            listener = new TcpListener(IPAddress.Loopback, PORT);
+            listener.Start();
+            running = true;
+            listenThread = new Thread(AcceptLoop) { IsBackground = true, Name = "CommandChannel" };
+            listenThread.Start();
+            Debug.Log($"CommandChannel: Listening on 127.0.0.1:{PORT}");
+        }
+        catch (Exception e)
+        {
+            Debug.LogError($"CommandChannel: Could not listen on port {PORT}: {e.Message}");
+        }
+    }
+
+    void OnDestroy()
+    {
+        running = false;
+        try { listener?.Stop(); } catch (Exception) { }
+    }
+
+    private void AcceptLoop()
+    {
+        while (running)
+        {
+            try
+            {
+                TcpClient client = listener.AcceptTcpClient();
+                client.NoDelay = true;
+                var thread = new Thread(() => ReadLoop(client)) { IsBackground = true, Name = "CommandChannelClient" };
+                thread.Start();
+            }
+            catch (Exception e)
+            {
+                if (running)
+                    Debug.LogWarning($"CommandChannel: Accept failed: {e.Message}");
+            }
+        }
+    }
+
+    private void ReadLoop(TcpClient client)
+    {
+        using (client)
+        using (NetworkStream stream = client.GetStream())
+        using (var reader = new StreamReader(stream, new UTF8Encoding(false)))
+        using (var writer = new StreamWriter(stream, new UTF8Encoding(false)) { AutoFlush = true, NewLine = "\n" })
+        {
+            try
+            {
+                string line;
+                while (running && (line = reader.ReadLine()) != null)
+                {
+                    JObject message = JObject.Parse(line);
+                    pending.Enqueue(new Request
+                    {
+                        Id = (long)message["id"],
+                        Command = (string)message["command"] ?? "",
+                        Writer = writer,
+                    });
+                }
+            }
+            catch (Exception e)
+            {
+                Debug.LogWarning($"CommandChannel: Connection closed: {e.Message}");
+            }
+        }
+    }
+
+    void Update()
+    {
+        Request request;
+        while (pending.TryDequeue(out request))
+        {
+            var reply = new JObject { ["id"] = request.Id };
+            try
+            {
+                string[] parts = request.Command.Split(new[] { ' ' }, StringSplitOptions.RemoveEmptyEntries);
+                if (parts.Length == 0)
+                    throw new ArgumentException("Empty command");
+                string[] args = new string[parts.Length - 1];
+                Array.Copy(parts, 1, args, 0, args.Length);
+
+                string result = ConsoleCommandsDatabase.ExecuteCommand(parts[0], args);
+                reply["ok"] = true;
+                reply["result"] = result ?? "";
+            }
+            catch (Exception e)
+            {
+                reply["ok"] = false;
+                reply["error"] = e.Message;
+            }
+
+            try
+            {
+                lock (request.Writer)
+                    request.Writer.WriteLine(reply.ToString(Formatting.None));
+            }
+            catch (Exception e)
+            {
+                Debug.LogWarning($"CommandChannel: Could not acknowledge '{request.Command}': {e.Message}");
+            }
+        }
+    }
+}
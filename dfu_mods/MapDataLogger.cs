@@ -14,6 +14,7 @@ using DaggerfallConnect.Utility;
 public class MapDataLogger : MonoBehaviour
 {
     private string outputFilePath;
+    private string streamFilePath;
     private bool isInitialized = false;
     private bool saveLoaded = false;
     public static Mod mod;
@@ -21,6 +22,11 @@ public class MapDataLogger : MonoBehaviour
     // Configuration
     private const float UPDATE_INTERVAL_MINUTES = 1f;
     private const int MAX_QUEUE_SIZE = 3;
+    // Append-only stream (MapData.ndjson, read by telemetry.py): one line per sample
+    private const float STREAM_INTERVAL_SECONDS = 5f;
+    private const long STREAM_MAX_BYTES = 5 * 1024 * 1024; // then renamed to MapData.ndjson.1
+    private long streamSeq = 0;
+    private volatile bool isAppending = false;
     
     // Async writing queue management
     private volatile bool isWriting = false;
@@ -43,6 +49,7 @@ public class MapDataLogger : MonoBehaviour
     void Awake()
     {
         outputFilePath = Path.Combine(Application.persistentDataPath, "MapData.json");
+        streamFilePath = Path.Combine(Application.persistentDataPath, "MapData.ndjson");
         Debug.Log($"MapDataLogger: Awake() called. Output file path set to: {outputFilePath}");
 
         StreamingWorld.OnInitWorld += InitializeLogger;
@@ -55,6 +62,7 @@ public class MapDataLogger : MonoBehaviour
         Debug.Log("MapDataLogger: Save loaded, enabling logging.");
         LogPlayerPosition(GameManager.Instance.PlayerGPS.CurrentMapPixel); // Immediate first update
         StartCoroutine(PeriodicLogging());
+        StartCoroutine(PeriodicStreaming());
     }
 
     void InitializeLogger()
@@ -80,6 +88,7 @@ public class MapDataLogger : MonoBehaviour
         {
             LogPlayerPosition(GameManager.Instance.PlayerGPS.CurrentMapPixel); // Immediate first update
             StartCoroutine(PeriodicLogging());
+            StartCoroutine(PeriodicStreaming());
         }
     }
 
@@ -109,6 +118,15 @@ public class MapDataLogger : MonoBehaviour
         }
     }
 
+    private IEnumerator PeriodicStreaming()
+    {
+        while (isInitialized && saveLoaded)
+        {
+            yield return new WaitForSeconds(STREAM_INTERVAL_SECONDS);
+            StreamPlayerPosition(GameManager.Instance.PlayerGPS.CurrentMapPixel);
+        }
+    }
+
     void LogPlayerPosition(DFPosition mapPixel)
     {
         if (!isInitialized || !saveLoaded)
@@ -123,6 +141,50 @@ public class MapDataLogger : MonoBehaviour
             return;
         }
 
+        string jsonData = JsonConvert.SerializeObject(BuildPositionData(mapPixel), Formatting.Indented);
+        QueueDataWrite(jsonData);
+    }
+
+    void StreamPlayerPosition(DFPosition mapPixel)
+    {
+        if (!isInitialized || !saveLoaded || isAppending)
+            return; // a slow disk drops samples rather than queueing them
+
+        if (GameManager.Instance == null || GameManager.Instance.PlayerEntity == null || GameManager.Instance.PlayerGPS == null)
+            return;
+
+        var sample = Newtonsoft.Json.Linq.JObject.FromObject(BuildPositionData(mapPixel));
+        sample.AddFirst(new Newtonsoft.Json.Linq.JProperty("seq", ++streamSeq));
+        string line = sample.ToString(Formatting.None) + "\n";
+
+        isAppending = true;
+        Task.Run(() =>
+        {
+            try
+            {
+                var info = new FileInfo(streamFilePath);
+                if (info.Exists && info.Length + line.Length > STREAM_MAX_BYTES)
+                {
+                    string rotated = streamFilePath + ".1";
+                    if (File.Exists(rotated))
+                        File.Delete(rotated);
+                    File.Move(streamFilePath, rotated);
+                }
+                File.AppendAllText(streamFilePath, line);
+            }
+            catch (Exception e)
+            {
+                Debug.LogError($"MapDataLogger: Failed to append to stream! Exception: {e}");
+            }
+            finally
+            {
+                isAppending = false;
+            }
+        });
+    }
+
+    private object BuildPositionData(DFPosition mapPixel)
+    {
         var playerGPS = GameManager.Instance.PlayerGPS;
         var weatherManager = GameManager.Instance.WeatherManager;
         var player = GameManager.Instance.PlayerEntity;
@@ -166,8 +228,7 @@ public class MapDataLogger : MonoBehaviour
             currentSong = GetCurrentSongInfo()
         };
 
-        string jsonData = JsonConvert.SerializeObject(positionData, Formatting.Indented);
-        QueueDataWrite(jsonData);
+        return positionData;
     }
 
     private void QueueDataWrite(string jsonData)
@@ -0,0 +1,216 @@
+# failover.py
+"""Hot standby: two bot processes in chat, one lease, only its holder acts.
+
+Both instances connect to chat and load what they can at startup; only
+the lease holder (the primary) acts on commands, drives the game and runs
+the timed jobs. The lease is a small JSON file the primary rewrites every
+BEAT_INTERVAL:
+
+    {"owner": "host:1234", "host": "host", "pid": 1234, "epoch": 7, "beat": 1760841600.12}
+
+The standby checks it every POLL_INTERVAL and takes over when the beat is
+older than TTL, or straight away when the owner's pid is gone (a crash
+is noticed on the next poll, not after the TTL). Taking over bumps the
+epoch. Reads and writes happen under a lock file, so two instances
+starting together can't both win.
+
+The primary renews from its own thread, not the event loop, so a loop
+held up for a moment (a slow handler, a GC pause) doesn't cost it the
+lease. The loop still has to show signs of life: once it hasn't ticked
+for MAX_LOOP_STALL the renewals stop, and the standby takes over a TTL
+later, so a hung primary is replaced about MAX_LOOP_STALL + TTL (4s)
+after it hangs. Hot standby only runs with split processes, where
+keystrokes go to the executor and don't block the loop.
+
+Fencing: the epoch is the token. The input executor refuses ops from an
+older epoch than it has seen, and in process the primary stops pressing
+keys once it hasn't managed to renew for most of a TTL. A primary that
+finds the lease taken exits with EXIT_DEMOTED and comes back as the
+standby.
+
+    lease = Lease("runtime/bot.lease")
+    fo = Failover(lease, on_promote=bot.on_promoted, on_demote=bot.on_demoted)
+    fo.start()
+    await fo.promoted.wait()
+"""
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import psutil
+import metrics
+
+TTL = 2.0  # seconds without a beat before the standby takes over; above the loop stalls the watchdog reports
+BEAT_INTERVAL = 0.25
+POLL_INTERVAL = 0.1
+MAX_LOOP_STALL = TTL  # seconds the loop may go without ticking before renewals stop
+STALE_LOCK = 2.0  # a lock file this old belongs to a process that died holding it
+EXIT_DEMOTED = 101
+
+PRIMARY = metrics.gauge("daggerwalk_failover_primary", "1 while this instance holds the lease")
+EPOCH = metrics.gauge("daggerwalk_failover_epoch", "Lease epoch this instance last held")
+TAKEOVERS = metrics.counter("daggerwalk_failover_takeovers_total", "Times this instance became primary")
+TAKEOVER_GAP = metrics.histogram(
+    "daggerwalk_failover_takeover_gap_seconds", "Previous primary's last beat to this instance taking over",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 30),
+)
+
+
+class Lease:
+    def __init__(self, path, owner=None, ttl=TTL):
+        self.path = path
+        self.host = socket.gethostname()
+        self.owner = owner or f"{self.host}:{os.getpid()}"
+        self.ttl = ttl
+        self.epoch = None  # set while we hold it
+        self.previous = None  # record we took over from
+        self._renewed = None  # monotonic time of our last successful write
+
+    def read(self):
+        """Current lease record, or None if there's none. Raises OSError/ValueError if it can't be read now."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def expired(self, record):
+        if record is None:
+            return True
+        if time.time() - record.get("beat", 0) > self.ttl:
+            return True
+        # Same machine: a dead owner is known now, not a TTL from now
+        return record.get("host") == self.host and not psutil.pid_exists(record.get("pid", -1))
+
+    def holds(self):
+        """True while we hold the lease and renewed it recently enough that nobody can have taken it."""
+        return self.epoch is not None and time.monotonic() - self._renewed < self.ttl * 0.8
+
+    @contextlib.contextmanager
+    def _locked(self):
+        lock = self.path + ".lock"
+        try:
+            fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock) > STALE_LOCK:
+                    os.remove(lock)
+            except OSError:
+                pass
+            yield False
+            return
+        try:
+            os.close(fd)
+            yield True
+        finally:
+            with contextlib.suppress(OSError):
+                os.remove(lock)
+
+    def _write(self, epoch):
+        record = {"owner": self.owner, "host": self.host, "pid": os.getpid(), "epoch": epoch, "beat": time.time()}
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(record, f)
+        os.replace(tmp, self.path)
+        self.epoch = epoch
+        self._renewed = time.monotonic()
+
+    def try_acquire(self):
+        """Take the lease if it's free or expired; True if we now hold it."""
+        with self._locked() as locked:
+            if not locked:
+                return False
+            current = self.read()
+            if not self.expired(current):
+                return False
+            self.previous = current
+            self._write((current or {}).get("epoch", 0) + 1)
+            return True
+
+    def renew(self):
+        """True if renewed, False if someone else holds it now, None if we couldn't tell this time."""
+        with self._locked() as locked:
+            if not locked:
+                return None
+            current = self.read()
+            if current is None or current.get("owner") != self.owner or current.get("epoch") != self.epoch:
+                self.epoch = None
+                return False
+            self._write(self.epoch)
+            return True
+
+
+class Failover:
+    def __init__(self, lease, on_promote=None, on_demote=None):
+        self.lease = lease
+        self.on_promote = on_promote  # called with the record we took over from (or None)
+        self.on_demote = on_demote
+        self.promoted = asyncio.Event()
+        self._task = None
+        self._loop_alive = None  # monotonic time the loop last ticked, read by the beat thread
+
+    def start(self):
+        if self._task is None:
+            PRIMARY.set(0)
+            self._task = asyncio.create_task(self._run(), name="failover")
+        return self._task
+
+    def _attempt(self, fn):
+        try:
+            return fn()
+        except (OSError, ValueError) as e:
+            logging.warning(f"Lease {self.lease.path}: {e}")
+            return None  # the primary may be mid-replace (Windows); try again next tick
+
+    async def _run(self):
+        while not self._attempt(self.lease.try_acquire):
+            await asyncio.sleep(POLL_INTERVAL)
+        self._promote()
+        lost = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        self._loop_alive = time.monotonic()
+        threading.Thread(target=self._beat, args=(loop, lost), name="failover-beat", daemon=True).start()
+        while not lost.is_set():
+            self._loop_alive = time.monotonic()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(lost.wait(), BEAT_INTERVAL)
+        PRIMARY.set(0)
+        if self.on_demote:
+            self.on_demote()
+
+    def _beat(self, loop, lost):
+        """Renew the lease every BEAT_INTERVAL while the loop is alive; runs in its own thread."""
+        stalled = False
+        while True:
+            time.sleep(BEAT_INTERVAL)
+            if time.monotonic() - self._loop_alive > MAX_LOOP_STALL:
+                if not stalled:
+                    logging.error(f"Event loop stuck for over {MAX_LOOP_STALL:.0f}s; letting the lease lapse")
+                stalled = True
+                continue
+            stalled = False
+            epoch = self.lease.epoch
+            if self._attempt(self.lease.renew) is False:
+                logging.error(f"Lost the lease (held epoch {epoch}); standing down")
+                loop.call_soon_threadsafe(lost.set)
+                return
+
+    def _promote(self):
+        previous = self.lease.previous
+        PRIMARY.set(1)
+        EPOCH.set(self.lease.epoch)
+        TAKEOVERS.inc()
+        if previous:
+            gap = time.time() - previous.get("beat", 0)
+            TAKEOVER_GAP.observe(gap)
+            logging.warning(f"Took over as primary (epoch {self.lease.epoch}) from {previous.get('owner')}, "
+                            f"{gap:.2f}s after its last beat")
+        else:
+            logging.info(f"Primary (epoch {self.lease.epoch})")
+        self.promoted.set()
+        if self.on_promote:
+            self.on_promote(previous)
@@ -0,0 +1,186 @@
+# game_input.py
+"""Where the bot's keystrokes go.
+
+The live stream uses Win32Backend (the real Daggerfall Unity window).
+Benchmarks and simulations swap in another backend with set_backend()
+before the bot starts; the bot only ever talks to get_backend().
+
+A backend provides:
+    connect()      -> object with send_keystrokes(key), or None if no game window
+    is_running()   -> bool, whether the game process is alive
+    mapdata_path   -> where the MapDataLogger mod's MapData.json is (or None)
+    telemetry_path -> its append-only MapData.ndjson stream (or None; see telemetry.py)
+
+sim_game.SimGame is the headless backend. input_executor.ExecutorClient
+is a remote one: keystrokes go to a separate executor process instead.
+
+press() and console() are the blocking key-sending routines, shared by
+the bot (in-process) and the executor. With set_channel(), console()
+hands commands to the CommandChannel mod (dfu_channel.py) and only types
+them when that fails. set_fence() gives press() a check
+to pass before every keystroke (failover.Lease.holds on a hot-standby
+pair), so an instance that may have been replaced stops typing.
+"""
+import logging
+import os
+import subprocess
+import threading
+import time
+
+
+class Win32Backend:
+    """Real Daggerfall Unity window via pygetwindow + pywinauto (Windows only)."""
+
+    WINDOW_TITLE = "Daggerfall Unity"
+    PROCESS_NAME = "DaggerfallUnity.exe"
+    mapdata_path = os.path.join(os.path.expanduser('~'), 'AppData', 'LocalLow',
+                                'Daggerfall Workshop', 'Daggerfall Unity', 'MapData.json')
+    telemetry_path = os.path.join(os.path.dirname(mapdata_path), 'MapData.ndjson')
+
+    def connect(self):
+        # Imported here so the bot can be loaded (and benchmarked) off Windows
+        import pygetwindow as gw
+        import pywinauto
+
+        window = next((w for w in gw.getWindowsWithTitle(self.WINDOW_TITLE)
+                       if w.title == self.WINDOW_TITLE), None)
+        if not window:
+            return None
+
+        # Force a completely new connection every time, with no caching
+        app = pywinauto.Application(backend="win32").connect(handle=window._hWnd)
+        return app.window(handle=window._hWnd)
+
+    def is_running(self):
+        """Check if Daggerfall Unity process is running using built-in tasklist"""
+        try:
+            output = subprocess.check_output("tasklist", shell=True, text=True)
+            lines = output.strip().splitlines()
+            process_names = [line.split()[0] for line in lines[3:] if line]  # Skip header lines
+            return any(self.PROCESS_NAME == name for name in process_names)
+
+        except subprocess.CalledProcessError as e:
+            logging.error(f"Failed to run tasklist: {e}")
+            return False
+        except Exception as e:
+            logging.error(f"Unexpected error in is_running: {e}")
+            return False
+
+
+class RecordingBackend:
+    """Accepts every keystroke and records it; the game is always 'running'.
+
+    `listener(key, t)` is called for each keystroke if given, where t is
+    time.perf_counter() at the moment the key was "pressed".
+    """
+
+    mapdata_path = None
+    telemetry_path = None
+
+    def __init__(self, listener=None):
+        self.listener = listener
+        self.keystrokes = []  # (perf_counter, key)
+        self._lock = threading.Lock()
+
+    def connect(self):
+        return self
+
+    def send_keystrokes(self, key):
+        t = time.perf_counter()
+        with self._lock:
+            self.keystrokes.append((t, key))
+        if self.listener:
+            self.listener(key, t)
+
+    def is_running(self):
+        return True
+
+
+_backend = Win32Backend()
+
+
+def get_backend():
+    return _backend
+
+
+def set_backend(backend):
+    global _backend
+    _backend = backend
+
+
+_fence = None
+_channel = None
+
+
+def set_fence(check):
+    """check() -> bool, asked before each keystroke; None removes it."""
+    global _fence
+    _fence = check
+
+
+def set_channel(channel):
+    """dfu_channel.CommandChannel for console(); None to always type."""
+    global _channel
+    _channel = channel
+
+
+CONSOLE_KEY = "`"
+
+
+def press(key, repeat=1, delay=0.2, on_key=None):
+    """Send `key` to the game window `repeat` times; returns how many were sent. Blocks.
+
+    on_key(n) is called after the n-th keystroke.
+    """
+    dlg = get_backend().connect()
+    if not dlg:
+        logging.warning("Game window not found")
+        return 0
+    sent = 0
+    for _ in range(repeat):
+        if _fence and not _fence():
+            logging.warning(f"Fenced: no longer primary, dropped {repeat - sent} x {key}")
+            break
+        dlg.send_keystrokes(key)
+        sent += 1
+        if on_key:
+            on_key(sent)
+        time.sleep(delay)
+    return sent
+
+
+def sequence(steps, on_key=None):
+    """Press each (key, pause) in order, waiting `pause` seconds after it; returns keys sent. Blocks.
+
+    on_key(1) is called after the first keystroke.
+    """
+    sent = 0
+    for key, pause in steps:
+        sent += press(key, delay=0, on_key=None if sent else on_key)
+        time.sleep(pause)
+    return sent
+
+
+def console(command, press=press):
+    """Run `command` in the game console; False if it couldn't be delivered.
+
+    Over the command channel if there is one (milliseconds), otherwise by
+    opening the console and typing it (blocks ~2.5s).
+    """
+    if _channel is not None and (not _fence or _fence()):
+        try:
+            _channel.run(command)
+            return True
+        except OSError as e:
+            logging.warning(f"Command channel unavailable, typing '{command}' instead: {e}")
+    if not get_backend().connect():
+        logging.warning("Game window not found for console command")
+        return False
+    press(CONSOLE_KEY)
+    time.sleep(0.5)
+    press(command)
+    time.sleep(0.5)
+    press("{ENTER}")
+    time.sleep(1)
+    press(CONSOLE_KEY)
+    return True
@@ -0,0 +1,331 @@
+# input_executor.py
+"""Game-input executor: the only process that touches the game window.
+
+The chat bot (IRC, votes, Django, Bluesky) and the keystroke sender run as
+separate processes, so a slow pywinauto connect or a DFU crash can't stall
+or kill chat, and either side can be restarted on its own:
+
+    python input_executor.py                    # real DFU window (Windows)
+    DAGGERWALK_SIM=1 python input_executor.py   # headless sim_game
+    DAGGERWALK_EXECUTOR=127.0.0.1:8765 python daggerwalk_twitch_bot.py
+
+They talk over a localhost TCP socket in JSON lines. The bot sends ops:
+
+    {"id": 7, "op": "keys", "key": "a", "repeat": 5, "delay": 0.15}
+    {"id": 8, "op": "console", "command": "set_weather 4"}
+    {"id": 9, "op": "sequence", "steps": [["Z", 0.5], ["X", 2], ["Z", 0]]}
+
+and the executor runs them one at a time, in order, replying
+{"id": 7, "event": "started"} at the first keystroke and
+{"id": 7, "ok": true, "sent": 5} when done. It also sends "hello" on
+connect (pid, mapdata_path, telemetry_path, running) and "game" events when the game
+process comes or goes.
+
+Several bots may be connected (a hot-standby pair, see failover.py). Ops
+can carry the sender's lease "epoch"; the executor refuses ops from an
+epoch older than the newest it has seen ({"id": 9, "ok": false,
+"fenced": true}), and a {"op": "fence", "epoch": 8} op raises it without
+pressing anything, so a new primary shuts the old one out on its first
+message. When DFU dies the executor says so and exits with
+EXIT_GAME_CRASHED; the supervisor restarts DFU and the executor while the
+bot stays in chat.
+
+On the bot side ExecutorClient is a game_input backend with remote=True:
+ops are queued without blocking, sent when the link is up, and counted as
+ok / error / fenced / lost (in flight when the link dropped; may or may
+not have run, never resent) / expired (waited longer than MAX_QUEUE_AGE
+for a link).
+"""
+import asyncio
+import collections
+import concurrent.futures
+import itertools
+import json
+import logging
+import os
+import sys
+import time
+import dfu_channel
+import game_input
+import metrics
+
+DEFAULT_ADDRESS = "127.0.0.1:8765"
+EXIT_GAME_CRASHED = 100  # same code the bot used when it owned the crash check
+CRASH_CHECK_INTERVAL = 10
+MAX_QUEUE_AGE = 10.0  # seconds; stale movement is worse than none
+RECONNECT_DELAY = 1.0
+
+OPS = metrics.counter("daggerwalk_executor_ops_total", "Game-input ops sent to the executor", ["op", "result"])
+ACK_SECONDS = metrics.histogram("daggerwalk_executor_ack_seconds", "Op queued to executor acknowledged done", ["op"])
+LINK_UP = metrics.gauge("daggerwalk_executor_link_up", "1 while the bot is connected to the input executor")
+PENDING_OPS = metrics.gauge("daggerwalk_executor_pending_ops", "Ops queued or in flight to the executor")
+
+
+def parse_address(address):
+    host, _, port = (address or DEFAULT_ADDRESS).rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+async def _send(writer, message):
+    writer.write((json.dumps(message) + "\n").encode())
+    await writer.drain()
+
+
+# --- executor process ---
+
+class Executor:
+    def __init__(self, backend=None):
+        self.backend = backend or game_input.get_backend()
+        # One thread: ops run strictly in order, and the blocking sleeps stay off the loop
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="keys")
+        self._writers = set()
+        self._server = None
+        self.epoch = 0  # newest lease epoch seen; older ones are fenced off
+
+    async def serve(self, host, port):
+        self._server = await asyncio.start_server(self._client, host, port)
+        logging.info(f"Input executor listening on {host}:{port} (pid {os.getpid()})")
+        await self._crash_monitor()
+
+    async def _client(self, reader, writer):
+        self._writers.add(writer)
+        loop = asyncio.get_running_loop()
+        try:
+            running = await loop.run_in_executor(None, self.backend.is_running)
+            await _send(writer, {"event": "hello", "pid": os.getpid(), "running": running,
+                                 "mapdata_path": self.backend.mapdata_path,
+                                 "telemetry_path": getattr(self.backend, "telemetry_path", None)})
+            while line := await reader.readline():
+                request = json.loads(line)
+                await self._run_op(request, writer)
+        except (ConnectionError, ValueError) as e:
+            logging.warning(f"Bot connection closed: {e}")
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _run_op(self, request, writer):
+        loop = asyncio.get_running_loop()
+        op_id = request.get("id")
+        epoch = request.get("epoch")
+        if epoch is not None:
+            if epoch < self.epoch:
+                logging.warning(f"Fenced {request['op']} op from epoch {epoch} (current {self.epoch})")
+                await self._notify(writer, {"id": op_id, "ok": False, "fenced": True})
+                return
+            self.epoch = epoch
+        if request["op"] == "fence":
+            await self._notify(writer, {"id": op_id, "ok": True, "sent": 0})
+            return
+
+        def started(n):
+            if n == 1:
+                loop.call_soon_threadsafe(asyncio.ensure_future, self._notify(writer, {"id": op_id, "event": "started"}))
+
+        def run():
+            if request["op"] == "keys":
+                return game_input.press(request["key"], request.get("repeat", 1), request.get("delay", 0.2),
+                                        on_key=started)
+            if request["op"] == "console":
+                first = []
+
+                def press(key, repeat=1, delay=0.2):
+                    return game_input.press(key, repeat, delay, on_key=None if first else started)
+
+                ok = game_input.console(request["command"], press=lambda key: first.append(press(key)))
+                return sum(first) if ok else 0
+            if request["op"] == "sequence":
+                return game_input.sequence(request["steps"], on_key=started)
+            raise ValueError(f"unknown op {request['op']!r}")
+
+        try:
+            sent = await loop.run_in_executor(self._pool, run)
+            reply = {"id": op_id, "ok": True, "sent": sent}
+        except Exception as e:
+            logging.error(f"Executor op {request} failed: {e}")
+            reply = {"id": op_id, "ok": False, "error": str(e)}
+        await self._notify(writer, reply)
+
+    async def _notify(self, writer, message):
+        try:
+            await _send(writer, message)
+        except ConnectionError:
+            pass  # the bot reconnects; this op is reported lost on its side
+
+    async def _crash_monitor(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(CRASH_CHECK_INTERVAL)
+            if not await loop.run_in_executor(None, self.backend.is_running):
+                logging.error("Daggerfall Unity process not found — assuming crash")
+                for writer in list(self._writers):
+                    await self._notify(writer, {"event": "game", "running": False})
+                    writer.close()
+                os._exit(EXIT_GAME_CRASHED)
+
+
+# --- bot side ---
+
+class ExecutorClient:
+    """game_input backend that hands keystrokes to the executor process."""
+    remote = True
+
+    def __init__(self, address=None, on_first_key=None):
+        self.host, self.port = parse_address(address)
+        self.on_first_key = on_first_key  # (command, perf_counter received) for COMMAND_TO_KEYSTROKE
+        self.mapdata_path = game_input.Win32Backend.mapdata_path  # until the executor says otherwise
+        self.telemetry_path = game_input.Win32Backend.telemetry_path
+        self.game_running = True  # last word from the executor; unknown counts as running
+        self.executor_pid = None
+        self.connected = False
+        self.epoch = None  # lease epoch sent with every op, on a hot-standby pair
+        self.stats = collections.Counter()
+        self._ids = itertools.count(1)
+        self._outbox = collections.deque()  # ops waiting for a link
+        self._inflight = {}  # id -> (op, queued perf_counter, command)
+        self._writer = None
+        self._wake = None
+        self._task = None
+
+    # backend interface
+    def connect(self):
+        return self if self.connected else None
+
+    def is_running(self):
+        return self.game_running
+
+    def keys(self, key, repeat=1, delay=0.2, command=None):
+        self._queue({"op": "keys", "key": key, "repeat": repeat, "delay": delay}, command)
+
+    def console(self, command_text, command=None):
+        self._queue({"op": "console", "command": command_text}, command)
+
+    def sequence(self, steps, command=None):
+        self._queue({"op": "sequence", "steps": [list(step) for step in steps]}, command)
+
+    def fence(self, epoch):
+        """We hold the lease at `epoch`: tag our ops with it and have the executor refuse older ones."""
+        self.epoch = epoch
+        self._queue({"op": "fence"}, None)
+
+    def open(self):
+        """Start the link task (needs a running loop)."""
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="input_executor_link")
+        return self._task
+
+    def _queue(self, message, command):
+        message["id"] = next(self._ids)
+        if self.epoch is not None:
+            message["epoch"] = self.epoch
+        self._outbox.append((message, time.perf_counter(), command))
+        PENDING_OPS.set(len(self._outbox) + len(self._inflight))
+        if self._wake is not None:
+            self._wake.set()
+
+    def _count(self, op, result):
+        self.stats[result] += 1
+        OPS.labels(op=op, result=result).inc()
+
+    async def _run(self):
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            except OSError:
+                self._expire()
+                await asyncio.sleep(RECONNECT_DELAY)
+                continue
+            self._writer = writer
+            logging.info(f"Connected to input executor at {self.host}:{self.port}")
+            flush = asyncio.create_task(self._flush(writer), name="input_executor_flush")
+            try:
+                await self._read(reader)
+            except (ConnectionError, ValueError) as e:
+                logging.warning(f"Input executor link lost: {e}")
+            finally:
+                flush.cancel()
+                self.connected = False
+                LINK_UP.set(0)
+                writer.close()
+                self._writer = None
+                self._lose_inflight()
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    def _expire(self):
+        now = time.perf_counter()
+        while self._outbox and now - self._outbox[0][1] > MAX_QUEUE_AGE:
+            message, _, _ = self._outbox.popleft()
+            self._count(message["op"], "expired")
+            logging.warning(f"Dropped {message['op']} op, no executor for {MAX_QUEUE_AGE:.0f}s: {message}")
+        PENDING_OPS.set(len(self._outbox) + len(self._inflight))
+
+    def _lose_inflight(self):
+        for op_id, (op, _, _) in self._inflight.items():
+            self._count(op, "lost")
+        if self._inflight:
+            logging.warning(f"{len(self._inflight)} input op(s) in flight when the executor link dropped")
+        self._inflight.clear()
+        PENDING_OPS.set(len(self._outbox))
+
+    async def _flush(self, writer):
+        while True:
+            self._wake.clear()
+            self._expire()
+            while self._outbox and self.connected:
+                message, queued, command = self._outbox.popleft()
+                self._inflight[message["id"]] = (message["op"], queued, command)
+                await _send(writer, message)
+            await self._wake.wait()
+
+    async def _read(self, reader):
+        while True:
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError("executor closed the connection")
+            message = json.loads(line)
+            event = message.get("event")
+            if event == "hello":
+                self.executor_pid = message.get("pid")
+                self.game_running = message.get("running", True)
+                self.mapdata_path = message.get("mapdata_path") or self.mapdata_path
+                self.telemetry_path = message.get("telemetry_path")
+                self.connected = True
+                LINK_UP.set(1)
+                self._wake.set()
+            elif event == "game":
+                self.game_running = message.get("running", True)
+            elif event == "started":
+                entry = self._inflight.get(message.get("id"))
+                if entry and entry[2] and self.on_first_key:
+                    self.on_first_key(*entry[2])
+            elif "id" in message:
+                entry = self._inflight.pop(message["id"], None)
+                if entry:
+                    op, queued, _ = entry
+                    ACK_SECONDS.labels(op=op).observe(time.perf_counter() - queued)
+                    self._count(op, "ok" if message.get("ok") else "fenced" if message.get("fenced") else "error")
+                    if not message.get("ok") and not message.get("fenced"):
+                        logging.error(f"Executor {op} op failed: {message.get('error')}")
+                PENDING_OPS.set(len(self._outbox) + len(self._inflight))
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        filename="input_executor.log",
+        filemode="a",
+    )
+    if os.environ.get("DAGGERWALK_SIM"):
+        import sim_game
+        game_input.set_backend(sim_game.from_env().start())
+    channel = os.environ.get("DAGGERWALK_DFU_CHANNEL", dfu_channel.DEFAULT_ADDRESS)
+    if channel:
+        game_input.set_channel(dfu_channel.CommandChannel(channel))
+    host, port = parse_address(os.environ.get("DAGGERWALK_EXECUTOR"))
+    asyncio.run(Executor().serve(host, port))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
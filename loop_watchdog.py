@@ -0,0 +1,114 @@
+# loop_watchdog.py
+"""Detect event-loop stalls and name whatever was blocking the loop.
+
+A heartbeat callback on the loop stamps the time every few tens of ms. A
+daemon thread watches that stamp; when it goes stale for longer than
+`threshold`, the thread grabs the loop thread's stack and the task that
+was running. The stall is logged and counted under that task's label.
+
+Label tasks with tag_current_task("!left") (chat commands) or by naming
+them via create_task(..., name="autosave").
+"""
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+import weakref
+import metrics
+
+STALLS = metrics.counter("daggerwalk_loop_stalls_total", "Event loop stalls over the watchdog threshold", ["source"])
+STALL_SECONDS = metrics.histogram(
+    "daggerwalk_loop_stall_seconds", "Duration of event loop stalls", ["source"],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 30),
+)
+
+_task_labels = weakref.WeakKeyDictionary()
+
+
+def tag_current_task(label):
+    """Attribute any stall in the current task to `label`."""
+    task = asyncio.current_task()
+    if task is not None:
+        _task_labels[task] = label
+
+
+def task_label(task):
+    if task is None:
+        return "callback"  # plain loop callback, not inside a task
+    return _task_labels.get(task) or task.get_name()
+
+
+def _culprit(stack):
+    """Innermost frame from our own code, e.g. 'daggerwalk_twitch_bot.py:892 toggle_map'."""
+    for frame in reversed(stack):
+        if "site-packages" not in frame.filename and "asyncio" not in frame.filename:
+            return f"{os.path.basename(frame.filename)}:{frame.lineno} {frame.name}"
+    return ""
+
+
+class LoopWatchdog:
+    def __init__(self, loop, threshold=0.25, tick=0.05):
+        self.loop = loop
+        self.threshold = threshold
+        self.tick = tick
+        self.stats = {}  # label -> [count, total_seconds, worst_seconds]
+        self._last_tick = time.monotonic()
+        self._loop_thread_id = None
+        self._stall = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """Call from the loop thread."""
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self.loop.call_soon(self._heartbeat)
+        threading.Thread(target=self._watch, name="loop-watchdog", daemon=True).start()
+        logging.info(f"Loop watchdog started (threshold {self.threshold * 1000:.0f}ms)")
+
+    def stop(self):
+        self._stop.set()
+
+    def _heartbeat(self):
+        self._last_tick = time.monotonic()
+        if not self._stop.is_set():
+            self.loop.call_later(self.tick, self._heartbeat)
+
+    def _watch(self):
+        while not self._stop.wait(self.tick):
+            lag = time.monotonic() - self._last_tick
+            if self._stall is None and lag > self.threshold:
+                self._capture(lag)
+            elif self._stall is not None and lag <= self.threshold:
+                self._finish()
+
+    def _capture(self, lag):
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.extract_stack(frame) if frame else []
+        try:
+            task = asyncio.current_task(self.loop)
+        except RuntimeError:
+            task = None
+        label = task_label(task)
+        self._stall = {"label": label, "started": self._last_tick}
+        logging.warning(
+            f"Event loop blocked >{lag * 1000:.0f}ms by {label} at {_culprit(stack)}\n"
+            + "".join(traceback.format_list(stack[-8:]))
+        )
+
+    def _finish(self):
+        stall, self._stall = self._stall, None
+        duration = max(0.0, self._last_tick - stall["started"] - self.tick)
+        label = stall["label"]
+        STALLS.labels(source=label).inc()
+        STALL_SECONDS.labels(source=label).observe(duration)
+        count, total, worst = self.stats.get(label, (0, 0.0, 0.0))
+        self.stats[label] = (count + 1, total + duration, max(worst, duration))
+        logging.warning(f"Event loop stall by {label} lasted {duration * 1000:.0f}ms")
+
+    def top(self, n=5):
+        """Worst offenders by total blocked time: [(label, count, total, worst), ...]"""
+        ranked = sorted(self.stats.items(), key=lambda kv: kv[1][1], reverse=True)
+        return [(label, *vals) for label, vals in ranked[:n]]
@@ -0,0 +1,157 @@
+# music_index.py
+"""Every music track the bot can ask the MusicChanger mod for, indexed once.
+
+Built at startup from two sources:
+  - list_music_tracks.json ([{"TrackID": 119, "TrackName": "song_gsunny2"}, ...]), if present
+  - the category switch in dfu_mods/MusicChanger.cs (GetSongCategory), which
+    also names every track the mod shuffles through
+
+and then queried from chat:
+
+    index = music_index.load()
+    index.resolve("127")         # 127
+    index.resolve("gsunny")      # 119 (unique prefix, "song_" optional)
+    index.resolve("song_gsuny2") # 119 (close match)
+    index.category_of(119)       # "world"
+    index.in_category("battle")  # [ids]
+
+Names are kept sorted so prefix lookups are a bisect; difflib is only
+reached for names that match nothing exactly or by prefix.
+"""
+import bisect
+import difflib
+import json
+import logging
+import os
+import re
+
+HERE = os.path.dirname(os.path.realpath(__file__))
+TRACKS_FILE = os.path.join(HERE, "list_music_tracks.json")
+MOD_SOURCE = os.path.join(HERE, "dfu_mods", "MusicChanger.cs")
+
+# DFU's SongFiles enum: song_none (-1) through the last track. Numbers in this
+# range are valid even when the track list doesn't name them.
+MIN_TRACK_ID = -1
+MAX_TRACK_ID = 131
+
+NAME_PREFIX = "song_"
+FUZZY_CUTOFF = 0.75
+
+
+def load_categories(path=MOD_SOURCE):
+    """{'world': {119: 'song_gsunny2', ...}, 'dungeon': {...}, ...} from MusicChanger.GetSongCategory"""
+    categories, pending = {}, {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            source = f.read()
+    except OSError as e:
+        logging.warning(f"Could not read song categories from {path}: {e}")
+        return {}
+
+    body = source[source.find("GetSongCategory(int songId)"):]
+    for line in body.splitlines():
+        case = re.match(r"\s*case (-?\d+):\s*//\s*(\w+)", line)
+        ret = re.match(r'\s*return "(\w+)";', line)
+        if case:
+            pending[int(case.group(1))] = case.group(2)
+        elif ret and pending:
+            categories[ret.group(1).lower()] = pending
+            pending = {}
+        if "default:" in line:
+            break
+    return categories
+
+
+def _key(name):
+    """Lookup key: lowercase, without the song_ prefix."""
+    name = name.strip().lower()
+    return name[len(NAME_PREFIX):] if name.startswith(NAME_PREFIX) else name
+
+
+class MusicIndex:
+    def __init__(self, tracks=(), categories=None):
+        """tracks: [(track_id, name)]; categories: {category: {track_id: name}}"""
+        self.by_id = {}
+        self._category = {}  # track_id -> category
+        self.categories = {}  # category -> sorted [track_id]
+        for category, members in (categories or {}).items():
+            for track_id, name in members.items():
+                self.by_id.setdefault(track_id, name)
+                self._category[track_id] = category
+            self.categories[category] = sorted(members)
+        for track_id, name in tracks:
+            self.by_id[track_id] = name  # the track list wins over mod comments
+
+        self.by_name = {name: track_id for track_id, name in self.by_id.items()}
+        self._by_key = {_key(name): track_id for name, track_id in self.by_name.items()}
+        self._keys = sorted(self._by_key)
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def name(self, track_id):
+        return self.by_id.get(track_id)
+
+    def id_for(self, name):
+        """Track ID for an exact track name as MapData reports it, or None."""
+        if name is None:
+            return None
+        track_id = self.by_name.get(name)
+        return track_id if track_id is not None else self._by_key.get(_key(name))
+
+    def category_of(self, track_id):
+        return self._category.get(track_id)
+
+    def in_category(self, category):
+        return self.categories.get(category.lower(), [])
+
+    def search(self, prefix, limit=5):
+        """Track IDs whose names start with `prefix` (song_ optional), in name order."""
+        key = _key(prefix)
+        i = bisect.bisect_left(self._keys, key)
+        matches = []
+        while i < len(self._keys) and self._keys[i].startswith(key) and len(matches) < limit:
+            matches.append(self._by_key[self._keys[i]])
+            i += 1
+        return matches
+
+    def resolve(self, arg):
+        """Track ID for a chat argument (number, name, unique prefix or close match), or None."""
+        arg = str(arg).strip()
+        try:
+            track_id = int(arg)
+        except ValueError:
+            pass
+        else:
+            return track_id if track_id in self.by_id or MIN_TRACK_ID <= track_id <= MAX_TRACK_ID else None
+
+        key = _key(arg)
+        if not key:
+            return None
+        if key in self._by_key:
+            return self._by_key[key]
+        prefixed = self.search(key, limit=2)
+        if len(prefixed) == 1:
+            return prefixed[0]
+        if prefixed:
+            return None  # ambiguous
+        close = difflib.get_close_matches(key, self._keys, n=1, cutoff=FUZZY_CUTOFF)
+        return self._by_key[close[0]] if close else None
+
+    def display(self, track_id):
+        name = self.by_id.get(track_id)
+        return f"{name} (Track {track_id})" if name else f"Track {track_id}"
+
+
+def load(tracks_path=TRACKS_FILE, mod_source=MOD_SOURCE):
+    """Build the index; either source may be missing."""
+    tracks = []
+    if os.path.exists(tracks_path):
+        try:
+            with open(tracks_path, encoding="utf-8") as f:
+                tracks = [(int(t["TrackID"]), t["TrackName"]) for t in json.load(f)]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logging.error(f"Failed to load music tracks from {tracks_path}: {e}")
+    index = MusicIndex(tracks, load_categories(mod_source))
+    logging.info(f"Music index: {len(index)} named tracks in {len(index.categories)} categories")
+    return index
@@ -0,0 +1,133 @@
+# profiler.py
+"""Time-boxed sampling profiler for the running bot.
+
+A daemon thread samples every thread's stack (sys._current_frames) at a
+fixed interval and counts identical stacks. Each stack is rooted at the
+thread name - MainThread is the asyncio loop, asyncio_N are to_thread
+workers - and, for the loop thread, the asyncio task that was running.
+The result is written as collapsed stacks, one "frame;frame;frame count"
+line per stack, which flamegraph.pl and speedscope load directly:
+
+    profiles/daggerwalk-20250101-120000.folded
+
+Start one from chat with !profile [seconds] (admin only) or by sending the
+process PROFILE_SIGNAL (SIGUSR1; SIGBREAK / Ctrl+Break on Windows).
+"""
+import asyncio
+import collections
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from datetime import datetime
+
+import loop_watchdog
+
+PROFILE_DIR = "profiles"
+SAMPLE_INTERVAL = 0.005  # 200 Hz
+MAX_SECONDS = 300
+PROFILE_SIGNAL = getattr(signal, "SIGUSR1", None) or getattr(signal, "SIGBREAK", None)
+
+_active = None
+_active_lock = threading.RLock()  # the signal handler can interrupt a holder on the same thread
+
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    def __init__(self, seconds, loop=None, interval=SAMPLE_INTERVAL, out_dir=PROFILE_DIR):
+        self.seconds = min(max(seconds, 1), MAX_SECONDS)
+        self.loop = loop
+        self.interval = interval
+        self.out_dir = out_dir
+        self.path = None
+        self.samples = 0
+        self.stacks = collections.Counter()
+        self.done = threading.Event()
+        self._loop_thread_id = None
+
+    def start(self):
+        """Call from the loop thread (chat handler or signal handler)."""
+        if self.loop is not None:
+            self._loop_thread_id = threading.get_ident()
+        threading.Thread(target=self._run, name="profiler", daemon=True).start()
+        logging.info(f"Profiling all threads for {self.seconds}s")
+        return self
+
+    def _run(self):
+        try:
+            me = threading.get_ident()
+            end = time.monotonic() + self.seconds
+            while time.monotonic() < end:
+                names = {t.ident: t.name for t in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident != me:
+                        self.stacks[self._collapse(ident, frame, names)] += 1
+                self.samples += 1
+                time.sleep(self.interval)
+            self._write()
+        except Exception as e:
+            logging.error(f"Profiler failed: {e}")
+        finally:
+            self.done.set()
+
+    def _collapse(self, ident, frame, names):
+        frames = []
+        while frame is not None:
+            frames.append(_frame_label(frame.f_code))
+            frame = frame.f_back
+        root = [names.get(ident, f"thread-{ident}")]
+        if ident == self._loop_thread_id:
+            try:
+                task = asyncio.current_task(self.loop)
+            except RuntimeError:
+                task = None
+            root.append(f"task:{loop_watchdog.task_label(task)}" if task else "loop:idle-or-callback")
+        return ";".join(root + frames[::-1])
+
+    def _write(self):
+        os.makedirs(self.out_dir, exist_ok=True)
+        self.path = os.path.join(self.out_dir, f"daggerwalk-{datetime.now():%Y%m%d-%H%M%S}.folded")
+        with open(self.path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        logging.info(f"Profile written to {self.path} ({self.samples} samples)")
+        for frame, count in self.hot_frames():
+            logging.info(f"  {count / self.samples:6.1%}  {frame}")
+
+    def hot_frames(self, n=10):
+        """Leaf frames by sample count: where threads actually were, not just passing through."""
+        leaves = collections.Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return leaves.most_common(n)
+
+
+def start_capture(seconds, loop=None):
+    """Start a capture unless one is already running; returns the profiler or None."""
+    global _active
+    with _active_lock:
+        if _active is not None and not _active.done.is_set():
+            return None
+        _active = SamplingProfiler(seconds, loop=loop).start()
+        return _active
+
+
+def install_signal_handler(loop, seconds=30):
+    """Profile for `seconds` whenever the process gets PROFILE_SIGNAL. Call from the main thread."""
+    if PROFILE_SIGNAL is None:
+        return
+
+    def handler(signum, frame):
+        if start_capture(seconds, loop=loop) is None:
+            logging.info("Profile already in progress; ignoring signal")
+
+    try:
+        signal.signal(PROFILE_SIGNAL, handler)
+        logging.info(f"Send {signal.Signals(PROFILE_SIGNAL).name} to pid {os.getpid()} to profile for {seconds}s")
+    except (ValueError, OSError) as e:
+        logging.warning(f"Could not install profile signal handler: {e}")
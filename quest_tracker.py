@@ -0,0 +1,106 @@
+# quest_tracker.py
+"""How close the Walker is to the current quest, between Django refreshes.
+
+Django decides a quest is complete, but only when the bot posts to it,
+once every REFRESH_INTERVAL. QuestTracker keeps the current quest's
+target and checks every MapData sample against it. It reports
+"approaching" once the Walker is within APPROACH_PIXELS map pixels and
+"arrived" once they are at the POI. Each happens at most once per quest:
+
+    tracker = QuestTracker(locate=places.find_poi)
+    tracker.set_target(quest_target(response["current_quest"]))
+    tracker.update(sample)   # None, "approaching" or "arrived"
+
+The target's map pixel comes from the quest's POI if Django sends it.
+Otherwise `locate(name, region)` looks it up (the spatial index knows
+every POI a refresh has reported). Until either knows, only arrival is
+detected, by the location name the game reports. The bot announces both
+events straight away and refreshes out of cycle on arrival, so Django's
+completion follows within seconds instead of minutes.
+"""
+import collections
+import logging
+import math
+import metrics
+
+APPROACH_PIXELS = 3  # map pixels from the POI that count as "approaching"
+
+EVENTS = metrics.counter("daggerwalk_quest_events_total", "Quest proximity events detected locally", ["event"])
+DISTANCE = metrics.gauge("daggerwalk_quest_distance_pixels", "Map pixels from the Walker to the current quest's POI")
+
+QuestTarget = collections.namedtuple("QuestTarget", "key name region pixel")
+
+
+def _pixel(poi):
+    for kx, ky in (("map_pixel_x", "map_pixel_y"), ("mapPixelX", "mapPixelY")):
+        if poi.get(kx) is not None and poi.get(ky) is not None:
+            return int(poi[kx]), int(poi[ky])
+    return None
+
+
+def quest_target(current_quest):
+    """QuestTarget for a Django current_quest, or None without one."""
+    if not current_quest:
+        return None
+    poi = current_quest.get("poi") or {}
+    region = poi.get("region") or {}
+    name = (current_quest.get("poi_name") or poi.get("name") or "").strip()
+    region_name = (current_quest.get("region_name")
+                   or (region.get("name") if isinstance(region, dict) else None) or "").strip()
+    key = current_quest.get("id") or (name, region_name, current_quest.get("description"))
+    return QuestTarget(key=key, name=name, region=region_name, pixel=_pixel(poi))
+
+
+class QuestTracker:
+    def __init__(self, locate=None, approach=APPROACH_PIXELS):
+        self.locate = locate  # (name, region) -> (x, y) or None
+        self.approach = approach
+        self.target = None
+        self.distance = None
+        self._announced = set()
+
+    def set_target(self, target):
+        """Track `target`; a different quest starts over, the same one keeps what was announced."""
+        if target is not None and self.target is not None and target.key == self.target.key:
+            if target.pixel or not self.target.pixel:
+                self.target = target
+            return
+        self.target = target
+        self.distance = None
+        self._announced = set()
+
+    def update(self, sample):
+        """Check one MapData sample; returns the event it triggers, if any."""
+        target = self.target
+        if target is None:
+            return None
+        if target.pixel is None and self.locate and target.name:
+            pixel = self.locate(target.name, target.region or None)
+            if pixel:
+                target = self.target = target._replace(pixel=pixel)
+
+        region = (sample.get("region") or "").strip()
+        location = (sample.get("location") or "").strip()
+        at_location = (bool(target.name) and location.lower() == target.name.lower()
+                       and (not target.region or region.lower() == target.region.lower()))
+        if target.pixel is not None:
+            try:
+                x, y = int(sample["mapPixelX"]), int(sample["mapPixelY"])
+            except (KeyError, ValueError):
+                return None
+            self.distance = math.hypot(x - target.pixel[0], y - target.pixel[1])
+            DISTANCE.set(self.distance)
+            arrived = at_location or (self.distance == 0 and not target.name)
+            approaching = self.distance <= self.approach
+        else:
+            arrived = approaching = at_location
+
+        event = "arrived" if arrived else "approaching" if approaching else None
+        if event is None or event in self._announced or "arrived" in self._announced:
+            return None
+        self._announced.add(event)
+        if event == "arrived":
+            self._announced.add("approaching")
+        EVENTS.labels(event=event).inc()
+        logging.info(f"Quest {event}: {target.name} in {target.region} (distance {self.distance})")
+        return event
@@ -0,0 +1,242 @@
+# resilience.py
+"""Circuit breakers, deadlines and bounded concurrency for outbound calls.
+
+Each external service the bot talks to (Django, Twitch Helix, Bluesky,
+YouTube) gets one Dependency. Calls go through Dependency.call, which:
+
+- fails fast with DependencyUnavailable while the breaker is open,
+- runs sync functions on the dependency's own small thread pool, so a hung
+  service can only tie up that many threads instead of the shared
+  to_thread executor,
+- gives up after the dependency timeout or the enclosing deadline(),
+  whichever comes first.
+"""
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import metrics
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_deadline = contextvars.ContextVar("deadline", default=None)
+
+LATENCY = metrics.histogram("daggerwalk_dependency_latency_seconds", "Outbound call latency", ["dependency"])
+ERRORS = metrics.counter("daggerwalk_dependency_errors_total", "Failed outbound calls", ["dependency"])
+REJECTED = metrics.counter("daggerwalk_dependency_rejected_total", "Calls refused by an open breaker or full pool", ["dependency"])
+BREAKER_STATE = metrics.gauge("daggerwalk_dependency_breaker_state", "0=closed 1=half_open 2=open", ["dependency"])
+INFLIGHT = metrics.gauge("daggerwalk_dependency_inflight", "Outbound calls in flight", ["dependency"])
+
+
+class DependencyUnavailable(Exception):
+    """Raised without calling out when the breaker is open or the pool is full."""
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """Raised when the time budget ran out before or during a call."""
+
+
+@contextmanager
+def deadline(seconds):
+    """Limit every Dependency.call inside this block to `seconds` in total.
+
+    Nested deadlines can only shrink the budget, never extend it.
+    """
+    at = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(at if current is None else min(at, current))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining():
+    """Seconds left in the current deadline, or None if there isn't one."""
+    at = _deadline.get()
+    return None if at is None else at - time.monotonic()
+
+
+class Dependency:
+    def __init__(self, name, timeout, max_concurrency=4, failure_threshold=5, reset_after=30.0):
+        self.name = name
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._failures = 0  # consecutive
+        self._probe_in_flight = False
+        self._inflight = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix=f"dep-{name}")
+
+        self.calls = 0
+        self.errors = 0
+        self.rejected = 0
+        self.last_latency = None
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_after:
+                return HALF_OPEN
+            return self._state
+
+    def _admit(self):
+        with self._lock:
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.reset_after:
+                    self.rejected += 1
+                    REJECTED.labels(dependency=self.name).inc()
+                    raise DependencyUnavailable(f"{self.name}: circuit open")
+                self._state = HALF_OPEN
+            if self._inflight >= self.max_concurrency:
+                self.rejected += 1
+                REJECTED.labels(dependency=self.name).inc()
+                raise DependencyUnavailable(f"{self.name}: {self._inflight} calls already in flight")
+            if self._state == HALF_OPEN:
+                # Let exactly one trial call through
+                if self._probe_in_flight:
+                    self.rejected += 1
+                    REJECTED.labels(dependency=self.name).inc()
+                    raise DependencyUnavailable(f"{self.name}: circuit half-open, probe in flight")
+                self._probe_in_flight = True
+            self._inflight += 1
+            self.calls += 1
+
+    def _release(self):
+        with self._lock:
+            self._inflight -= 1
+
+    def _record(self, ok, latency):
+        with self._lock:
+            self.last_latency = latency
+            LATENCY.labels(dependency=self.name).observe(latency)
+            self._probe_in_flight = False
+            if ok:
+                if self._state != CLOSED:
+                    logging.info(f"Circuit {self.name}: closed")
+                self._state = CLOSED
+                self._failures = 0
+                return
+            self.errors += 1
+            ERRORS.labels(dependency=self.name).inc()
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    logging.warning(f"Circuit {self.name}: open after {self._failures} failures")
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+    def _abandon(self):
+        """A call its caller cancelled says nothing about the service: free the probe, count nothing."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _budget(self):
+        left = remaining()
+        budget = self.timeout if left is None else min(self.timeout, left)
+        if budget <= 0:
+            raise DeadlineExceeded(f"{self.name}: deadline already passed")
+        return budget
+
+    async def call(self, fn, *args, is_failure=None, **kwargs):
+        """Run fn(*args, **kwargs) under this dependency's breaker and budget.
+
+        fn may be a coroutine function or a plain blocking function.
+        is_failure(result) lets callers count "soft" failures such as a
+        None or 5xx response that fn returns instead of raising.
+        """
+        budget = self._budget()
+        self._admit()
+        start = time.perf_counter()
+        ok = False
+        cancelled = False
+        released = False
+        try:
+            if asyncio.iscoroutinefunction(fn):
+                result = await asyncio.wait_for(fn(*args, **kwargs), budget)
+            else:
+                loop = asyncio.get_running_loop()
+                fut = loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+                # The worker thread keeps its slot until it really finishes,
+                # even if we stop waiting for it below.
+                fut.add_done_callback(lambda _: self._release())
+                released = True
+                result = await asyncio.wait_for(asyncio.shield(fut), budget)
+            ok = not (is_failure and is_failure(result))
+            return result
+        except asyncio.TimeoutError as e:
+            raise DeadlineExceeded(f"{self.name}: no response within {budget:.1f}s") from e
+        except asyncio.CancelledError:
+            # Shutdown, a demotion or an outer wait_for gave up on us
+            cancelled = True
+            raise
+        finally:
+            if not released:
+                self._release()
+            if cancelled:
+                self._abandon()
+            else:
+                self._record(ok, time.perf_counter() - start)
+
+    def call_sync(self, fn, *args, is_failure=None, **kwargs):
+        """Blocking variant for plain scripts; the callee enforces its own timeout."""
+        self._admit()
+        start = time.perf_counter()
+        ok = False
+        try:
+            result = fn(*args, **kwargs)
+            ok = not (is_failure and is_failure(result))
+            return result
+        finally:
+            self._release()
+            self._record(ok, time.perf_counter() - start)
+
+    def snapshot(self):
+        return {
+            "state": self.state,
+            "inflight": self._inflight,
+            "calls": self.calls,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "last_latency": self.last_latency,
+        }
+
+
+DEPENDENCIES = {
+    "django": Dependency("django", timeout=20),
+    "helix": Dependency("helix", timeout=10),
+    "twitch_auth": Dependency("twitch_auth", timeout=10, max_concurrency=1),
+    "bluesky": Dependency("bluesky", timeout=15, max_concurrency=2),
+    "youtube": Dependency("youtube", timeout=60, max_concurrency=1, failure_threshold=3),
+    "youtube_chat": Dependency("youtube_chat", timeout=15, max_concurrency=2),
+}
+
+
+def get(name):
+    return DEPENDENCIES[name]
+
+
+def snapshot():
+    """Breaker state and latency for every dependency, keyed by name."""
+    return {name: dep.snapshot() for name, dep in DEPENDENCIES.items()}
+
+
+def _collect_metrics():
+    codes = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+    for name, dep in DEPENDENCIES.items():
+        BREAKER_STATE.labels(dependency=name).set(codes[dep.state])
+        INFLIGHT.labels(dependency=name).set(dep._inflight)
+
+
+metrics.add_collector(_collect_metrics)
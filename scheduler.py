@@ -0,0 +1,218 @@
+# scheduler.py
+"""One timer for every periodic job in the bot.
+
+Jobs are kept in a heap by due time and a single task sleeps until the
+earliest one, so nothing wakes up just to find there's nothing to do:
+
+    sched = Scheduler()
+    sched.every("autosave", 600, self.autosave, first_in=600)
+    sched.daily("nightly_report", "09:00", self.report)       # US/Eastern
+    sched.window("off_air", "23:50", "00:10", on_enter=..., on_exit=...)
+    sched.start()
+
+every() jobs are fixed-rate: the next run is due `interval` after the
+previous *due* time, not after the previous run finished, so they don't
+drift by their own runtime. A slot that comes around while the previous
+run is still going is skipped and counted as an overrun; slots missed
+while the loop was blocked are skipped too (reported as jitter). daily()
+and window() times are wall-clock in `tz` and recomputed after each run,
+so DST changes are picked up. If the scheduler starts inside a window,
+on_enter runs straight away.
+
+Each run is its own task named after the job, which is also the label
+loop_watchdog reports stalls under.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from datetime import datetime, timedelta
+import metrics
+import pytz
+
+JOB_JITTER = metrics.histogram(
+    "daggerwalk_scheduler_jitter_seconds", "How late each job started versus when it was due", ["job"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+JOB_SECONDS = metrics.histogram("daggerwalk_scheduler_job_seconds", "Job run time", ["job"])
+JOB_OVERRUNS = metrics.counter(
+    "daggerwalk_scheduler_overruns_total", "Runs skipped because the previous run was still going", ["job"]
+)
+JOB_ERRORS = metrics.counter("daggerwalk_scheduler_errors_total", "Job runs that raised", ["job"])
+
+
+def _parse_hhmm(hhmm):
+    hour, minute = hhmm.split(":")
+    return int(hour), int(minute)
+
+
+class Job:
+    def __init__(self, name, fn, interval=None, at=None):
+        self.name = name
+        self.fn = fn
+        self.interval = interval  # fixed-rate seconds, or None
+        self.at = at  # (hour, minute) wall-clock, or None
+        self.task = None
+        self.runs = 0
+        self.overruns = 0
+        self.errors = 0
+        self.last_jitter = None
+        self.max_jitter = 0.0
+        self.last_duration = None
+
+
+class Scheduler:
+    def __init__(self, tz="US/Eastern"):
+        self.tz = pytz.timezone(tz)
+        self.jobs = {}
+        self._heap = []  # (due loop time, seq, job)
+        self._seq = itertools.count()
+        self._windows = {}  # name -> inside?
+        self._wake = None
+        self._task = None
+
+    def _loop_time(self):
+        try:
+            return asyncio.get_running_loop().time()
+        except RuntimeError:
+            return time.monotonic()  # same clock as the default loop
+
+    def _push(self, due, job):
+        heapq.heappush(self._heap, (due, next(self._seq), job))
+        if self._wake is not None:
+            self._wake.set()  # may be earlier than what the runner is sleeping towards
+
+    def _add(self, job):
+        if job.name in self.jobs:
+            raise ValueError(f"Job {job.name} already scheduled")
+        self.jobs[job.name] = job
+        return job
+
+    def _next_wall(self, hour, minute, after=None):
+        """Loop time of the next hour:minute in self.tz strictly after `after` (a tz-aware datetime)."""
+        now = datetime.now(self.tz)
+        after = after or now
+        day = after.date()
+        while True:
+            candidate = self.tz.localize(datetime(day.year, day.month, day.day, hour, minute))
+            if candidate > after:
+                return self._loop_time() + (candidate - now).total_seconds()
+            day += timedelta(days=1)
+
+    def every(self, name, interval, fn, first_in=0.0):
+        """Run fn every `interval` seconds, the first time `first_in` seconds from now."""
+        job = self._add(Job(name, fn, interval=interval))
+        self._push(self._loop_time() + first_in, job)
+        return job
+
+    def set_interval(self, name, interval):
+        """Change an every() job's interval; the run already due keeps its time, the ones after it move."""
+        job = self.jobs.get(name)
+        if job is not None and job.interval is not None:
+            job.interval = interval
+
+    def daily(self, name, at, fn):
+        """Run fn once a day at `at` ("HH:MM", scheduler tz)."""
+        job = self._add(Job(name, fn, at=_parse_hhmm(at)))
+        self._push(self._next_wall(*job.at), job)
+        return job
+
+    def window(self, name, start, end, on_enter=None, on_exit=None):
+        """Track a daily wall-clock window (may wrap midnight); see in_window()."""
+        start_hm, end_hm = _parse_hhmm(start), _parse_hhmm(end)
+
+        async def enter():
+            self._windows[name] = True
+            if on_enter:
+                await on_enter()
+
+        async def leave():
+            self._windows[name] = False
+            if on_exit:
+                await on_exit()
+
+        self._windows[name] = self._inside(start_hm, end_hm)
+        self.daily(f"{name}:enter", start, enter)
+        self.daily(f"{name}:exit", end, leave)
+        if self._windows[name] and on_enter:
+            # Started inside the window: don't wait a day for the next start
+            self._push(self._loop_time(), self._add(Job(f"{name}:enter_now", on_enter)))
+
+    def _inside(self, start_hm, end_hm):
+        now = datetime.now(self.tz)
+        current = (now.hour, now.minute)
+        if start_hm <= end_hm:
+            return start_hm <= current < end_hm
+        return current >= start_hm or current < end_hm
+
+    def in_window(self, name):
+        return self._windows.get(name, False)
+
+    def start(self):
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="scheduler")
+        return self._task
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wake.clear()
+            delay = self._heap[0][0] - loop.time() if self._heap else None
+            if delay is None or delay > 0:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            due, _, job = heapq.heappop(self._heap)
+            self._fire(job, due, loop.time())
+            if job.interval is not None:
+                next_due = due + job.interval
+                now = loop.time()
+                if next_due <= now:
+                    # The loop was blocked past whole slots: skip them rather than run back-to-back
+                    next_due += ((now - next_due) // job.interval + 1) * job.interval
+                self._push(next_due, job)
+            elif job.at is not None:
+                self._push(self._next_wall(*job.at, after=datetime.now(self.tz) + timedelta(seconds=1)), job)
+            else:
+                del self.jobs[job.name]  # one-shot
+
+    def _fire(self, job, due, now):
+        jitter = max(0.0, now - due)
+        job.last_jitter = jitter
+        job.max_jitter = max(job.max_jitter, jitter)
+        JOB_JITTER.labels(job=job.name).observe(jitter)
+        if job.task is not None and not job.task.done():
+            job.overruns += 1
+            JOB_OVERRUNS.labels(job=job.name).inc()
+            logging.warning(f"Scheduled job {job.name} still running; skipping this run")
+            return
+        job.task = asyncio.create_task(self._invoke(job), name=job.name)
+
+    async def _invoke(self, job):
+        start = time.perf_counter()
+        try:
+            await job.fn()
+        except Exception as e:
+            job.errors += 1
+            JOB_ERRORS.labels(job=job.name).inc()
+            logging.error(f"Scheduled job {job.name} error: {e}")
+        finally:
+            job.runs += 1
+            job.last_duration = time.perf_counter() - start
+            JOB_SECONDS.labels(job=job.name).observe(job.last_duration)
+
+    def stats(self):
+        return {
+            name: {
+                "runs": job.runs,
+                "overruns": job.overruns,
+                "errors": job.errors,
+                "last_jitter": job.last_jitter,
+                "max_jitter": job.max_jitter,
+                "last_duration": job.last_duration,
+            }
+            for name, job in self.jobs.items()
+        }
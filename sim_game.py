@@ -0,0 +1,454 @@
+# sim_game.py
+"""Headless stand-in for Daggerfall Unity.
+
+SimGame is a game_input backend: it takes the same keystrokes the bot sends
+to the real window (movement keys, F9/F11, the ` console and the commands
+typed into it), keeps a small virtual world (position, heading, weather,
+song, clock, region/location) and writes MapData.json and the
+MapData.ndjson stream in the same shape and at the same cadence as the
+MapDataLogger mod. `speed` runs the world
+faster than real time. Crashes can be scheduled or triggered by hand.
+
+The geography is made up: regions and locations are derived from the map
+pixel, not from Daggerfall's real map.
+
+Run the bot against it (no Windows, no game):
+
+    DAGGERWALK_SIM=1 DAGGERWALK_SIM_SPEED=10 python daggerwalk_twitch_bot.py
+
+or just the sim, to look at what it writes:
+
+    python sim_game.py --speed 60 --duration 30
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+import music_index
+import telemetry
+
+MAP_PIXEL_SIZE = 32768  # world units per map pixel
+MAP_WIDTH, MAP_HEIGHT = 1000, 500  # map pixels
+WALK_SPEED = 1000  # world units per second, roughly 30s per map pixel
+STEP = 100  # world units per w/a/s/d keystroke
+TURN_CHANCE = 0.02  # per second while walking, the road bends
+TIME_SCALE = 12  # DFU's default: 12 game seconds per real second
+MAPDATA_INTERVAL = 60  # seconds between MapData.json writes (MapDataLogger)
+TELEMETRY_INTERVAL = 5  # seconds between MapData.ndjson samples
+SONG_LENGTH = 180  # seconds before shuffle moves on
+WEATHER_LENGTH = 1200  # seconds between weather rolls
+
+DAY_NAMES = ["Sundas", "Morndas", "Tirdas", "Middas", "Turdas", "Fredas", "Loredas"]
+MONTH_NAMES = ["Morning Star", "Sun's Dawn", "First Seed", "Rain's Hand", "Second Seed", "Midyear",
+               "Sun's Height", "Last Seed", "Hearthfire", "Frostfall", "Sun's Dusk", "Evening Star"]
+# Same table as MapDataLogger.GetSeason - which spells it "Mid Year", so Midyear is "Unknown" live too
+SEASONS = {
+    "Morning Star": "Winter", "Sun's Dawn": "Winter", "First Seed": "Winter",
+    "Rain's Hand": "Spring", "Second Seed": "Spring", "Mid Year": "Spring",
+    "Sun's Height": "Summer", "Last Seed": "Summer", "Hearthfire": "Summer",
+    "Frostfall": "Autumn", "Sun's Dusk": "Autumn", "Evening Star": "Autumn",
+}
+# set_weather IDs (Config.WEATHER_TYPES_MAP) -> MapDataLogger.DetermineWeather result
+WEATHER_BY_ID = {0: "Sunny", 1: "Cloudy", 2: "Cloudy", 3: "Foggy", 4: "Rainy", 5: "Thunderstorm", 6: "Snowy"}
+WEATHER_ODDS = {
+    "Winter": {"Sunny": 3, "Cloudy": 3, "Foggy": 1, "Snowy": 3},
+    "Spring": {"Sunny": 4, "Cloudy": 3, "Foggy": 1, "Rainy": 3, "Thunderstorm": 1},
+    "Summer": {"Sunny": 6, "Cloudy": 2, "Rainy": 1, "Thunderstorm": 1},
+    "Autumn": {"Sunny": 3, "Cloudy": 3, "Foggy": 2, "Rainy": 2},
+    "Unknown": {"Sunny": 1},
+}
+
+REGIONS = ["Daggerfall", "Wayrest", "Sentinel", "Alik'r Desert", "Dragontail Mountains", "Glenpoint",
+           "Betony", "Anticlere", "Tulune", "Shalgora", "Menevia", "Orsinium Area", "Ilessan Hills",
+           "Kambria", "Urvaius", "Mournoth", "Ephesus", "Bhoriane", "Gavaudon", "Lainlyn"]
+LOCATION_PREFIXES = ["Ash", "Oak", "Raven", "Cold", "Old", "Black", "Wind", "Stone", "Elden", "Moss"]
+LOCATION_SUFFIXES = ["field Hall", "brook Farm", "moor Grange", "wood Hamlet", "hold Keep", "gate Inn"]
+LOCATION_TYPES = ["Town", "Town", "Wilderness", "Interior", "Dungeon"]
+
+def load_song_categories(path=music_index.MOD_SOURCE):
+    """{'world': {119: 'song_gsunny2', ...}, 'dungeon': {...}, ...} from MusicChanger.GetSongCategory"""
+    return music_index.load_categories(path) or {"world": {119: "song_gsunny2"}}
+
+
+def _cell_hash(*parts):
+    return zlib.crc32(":".join(map(str, parts)).encode())
+
+
+def place_at(px, py):
+    """(region, location, locationType) for a map pixel."""
+    cell = _cell_hash(px // 40, py // 40)
+    if cell % 9 == 0:
+        return "Ocean", "Wilderness", "Wilderness"
+    region = REGIONS[cell % len(REGIONS)]
+    h = _cell_hash(px, py)
+    if h % 5:  # most pixels are empty countryside
+        return region, "Wilderness", "Wilderness"
+    location = LOCATION_PREFIXES[h % len(LOCATION_PREFIXES)] + LOCATION_SUFFIXES[(h // 7) % len(LOCATION_SUFFIXES)]
+    return region, location, LOCATION_TYPES[(h // 11) % len(LOCATION_TYPES)]
+
+
+class SimGame:
+    """Simulated Daggerfall Unity process + window + MapDataLogger mod."""
+
+    def __init__(self, data_dir="sim", speed=1.0, seed=None, crash_rate=0.0, crash_after=None):
+        self.data_dir = data_dir
+        self.mapdata_path = os.path.join(data_dir, "MapData.json")
+        self.telemetry_path = os.path.join(data_dir, "MapData.ndjson")
+        self.telemetry = telemetry.TelemetryWriter(self.telemetry_path)
+        self.save_path = os.path.join(data_dir, "sim_save.json")
+        self.speed = speed
+        self.crash_rate = crash_rate  # expected crashes per simulated hour
+        self.crash_after = crash_after  # simulated seconds until a forced crash
+        self.rng = random.Random(seed)
+        self.songs = load_song_categories()
+        self.console_log = []  # every console command executed, in order
+        self.crashes = 0
+
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._running = True
+        self._hung = False
+        self._console_open = False
+        self._console_buffer = ""
+        self._sim_time = 0.0  # simulated seconds since start
+        self._next_write = 0.0
+        self._next_sample = 0.0
+        self._next_song = SONG_LENGTH
+        self._next_weather = WEATHER_LENGTH
+        self._pinned_weather = False
+        self._shuffle = list(self.songs)
+        self.world = self._new_world()
+        self._load_save()
+
+    def _new_world(self):
+        return {
+            "worldX": 200 * MAP_PIXEL_SIZE + 16384,
+            "worldZ": (MAP_HEIGHT - 210) * MAP_PIXEL_SIZE + 16384,
+            "heading": 90.0,  # degrees, 0 = north
+            "walking": True,
+            "levitating": False,
+            "altitude": 0.0,
+            "gravity": 20,
+            "ai": True,
+            "game_seconds": ((406 * 12 + 6) * 30 + 13) * 86400 + 9 * 3600,  # 3E 406, 14 Sun's Height, 9am
+            "weather": "Sunny",
+            "song": self.rng.choice(list(self.songs.get("world", {119: "song_gsunny2"}).values())),
+            "health": 180, "maxHealth": 180, "fatigue": 21000, "magicka": 120, "gold": 5003, "level": 22,
+        }
+
+    # --- game_input backend ---
+
+    def connect(self):
+        return self if self._running else None
+
+    def is_running(self):
+        return self._running
+
+    def send_keystrokes(self, keys):
+        with self._lock:
+            if not self._running or self._hung:
+                return
+            for key in re.findall(r"\{[^}]+\}|.", keys, re.S):
+                self._press(key)
+
+    # --- lifecycle ---
+
+    def start(self, tick=0.1):
+        """Run the world clock on a daemon thread."""
+        self._write_mapdata()  # MapDataLogger writes once as soon as the save loads
+        self._thread = threading.Thread(target=self._run, args=(tick,), name="sim-game", daemon=True)
+        self._thread.start()
+        logging.info(f"Simulated game started at {self.speed}x, writing {self.mapdata_path}")
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def crash(self, hang=False):
+        """Kill the game (hang=True: process stays up but stops responding and logging)."""
+        with self._lock:
+            self.crashes += 1
+            if hang:
+                self._hung = True
+            else:
+                self._running = False
+        logging.warning(f"Simulated game {'hung' if hang else 'crashed'} at t={self._sim_time:.0f}s")
+
+    def restart(self):
+        """Relaunch after a crash and load the last save, like start_daggerfall()."""
+        with self._lock:
+            self._running, self._hung = True, False
+            self._console_open, self._console_buffer = False, ""
+            self.world = self._new_world()
+            self._load_save()
+            self._write_mapdata()
+
+    def _run(self, tick):
+        last = time.monotonic()
+        while not self._stop.wait(tick):
+            now = time.monotonic()
+            self.advance((now - last) * self.speed)
+            last = now
+
+    def advance(self, seconds):
+        """Move the world forward by `seconds` of simulated (real-game) time."""
+        with self._lock:
+            if not self._running or self._hung:
+                return
+            self._sim_time += seconds
+            w = self.world
+            w["game_seconds"] += seconds * TIME_SCALE
+
+            if w["walking"]:
+                if self.rng.random() < TURN_CHANCE * seconds:
+                    w["heading"] = (w["heading"] + self.rng.uniform(-45, 45)) % 360
+                self._move(w["heading"], WALK_SPEED * seconds)
+
+            if self._sim_time >= self._next_song:
+                self._next_song = self._sim_time + SONG_LENGTH
+                self._shuffle_song()
+            if self._sim_time >= self._next_weather:
+                self._next_weather = self._sim_time + WEATHER_LENGTH
+                if not self._pinned_weather:
+                    odds = WEATHER_ODDS[self._season()]
+                    w["weather"] = self.rng.choices(list(odds), weights=list(odds.values()))[0]
+                self._pinned_weather = False
+
+            if self._sim_time >= self._next_write:
+                self._next_write = self._sim_time + MAPDATA_INTERVAL
+                self._write_mapdata()
+            if self._sim_time >= self._next_sample:
+                self._next_sample = self._sim_time + TELEMETRY_INTERVAL
+                self.telemetry.write(self.snapshot())
+
+            if self.crash_after is not None and self._sim_time >= self.crash_after:
+                self.crash_after = None
+                self.crash()
+            elif self.crash_rate and self.rng.random() < self.crash_rate * seconds / 3600:
+                self.crash(hang=self.rng.random() < 0.25)
+
+    # --- input ---
+
+    def _press(self, key):
+        w = self.world
+        if self._console_open:
+            if key == "`":
+                self._console_open = False
+            elif key == "{ESC}":
+                self._console_open, self._console_buffer = False, ""
+            elif key == "{ENTER}":
+                self._console(self._console_buffer.strip())
+                self._console_buffer = ""
+            elif not key.startswith("{"):
+                self._console_buffer += key
+            elif key == "{SPACE}":
+                self._console_buffer += " "
+            return
+
+        if key == "`":
+            self._console_open = True
+        elif key == "\\":
+            w["walking"] = not w["walking"]
+        elif key in ("w", "W"):
+            self._move(w["heading"], STEP)
+        elif key in ("s", "S"):
+            w["walking"] = False  # any back press cancels auto-walk (that's how !stop works)
+            self._move(w["heading"] + 180, STEP)
+        elif key in ("a", "A"):
+            self._move(w["heading"] - 90, STEP)
+        elif key in ("d", "D"):
+            self._move(w["heading"] + 90, STEP)
+        elif key == "{INSERT}" and w["levitating"]:
+            w["altitude"] += STEP / 10
+        elif key == "{DELETE}" and w["levitating"]:
+            w["altitude"] = max(0.0, w["altitude"] - STEP / 10)
+        elif key == "{F9}":
+            self._save()
+        elif key == "{F11}":
+            self._load_save()
+        # jump, map, use, camera, weapon keys don't change anything MapData reports
+
+    def run_console(self, line):
+        """A console command delivered without typing (the CommandChannel mod's path)."""
+        with self._lock:
+            if not self._running or self._hung:
+                raise ConnectionError("game not running")
+            self._console(line)
+
+    def _console(self, line):
+        self.console_log.append(line)
+        logging.info(f"Sim console: {line}")
+        cmd, *args = line.split() or [""]
+        w = self.world
+        try:
+            if cmd == "song":
+                self._song_command(args)
+            elif cmd == "set_weather":
+                w["weather"] = WEATHER_BY_ID.get(int(args[0]), w["weather"])
+                self._pinned_weather = True
+            elif cmd == "levitate":
+                w["levitating"] = args[0] == "on"
+                if not w["levitating"]:
+                    w["altitude"] = 0.0
+            elif cmd == "tai":
+                w["ai"] = not w["ai"]
+            elif cmd == "set_grav":
+                w["gravity"] = int(args[0])
+            elif cmd == "tele2pixel":
+                px, py = int(args[0]), int(args[1])
+                w["worldX"] = px * MAP_PIXEL_SIZE + MAP_PIXEL_SIZE // 2
+                w["worldZ"] = (MAP_HEIGHT - py) * MAP_PIXEL_SIZE - MAP_PIXEL_SIZE // 2
+                self._write_mapdata()
+            # playvid, killall, tgm, set_jump, tac...: accepted, nothing to simulate
+        except (IndexError, ValueError) as e:
+            logging.warning(f"Sim console: bad arguments for '{line}': {e}")
+
+    def _song_command(self, args):
+        if not args:
+            return
+        if args[0] == "shuffle":
+            cats = [a for a in args[1:] if a in self.songs] or list(self.songs)
+            self._shuffle = list(self.songs) if "all" in args[1:] else cats
+            self._shuffle_song()
+        elif args[0] in ("random", "default"):
+            self._shuffle = list(self.songs)
+            self._shuffle_song()
+        elif args[0] in self.songs:
+            self._shuffle = [args[0]]
+            self._shuffle_song()
+        else:
+            track = int(args[0])
+            for tracks in self.songs.values():
+                if track in tracks:
+                    self.world["song"] = tracks[track]
+        self._next_song = self._sim_time + SONG_LENGTH
+
+    def _shuffle_song(self):
+        tracks = [name for cat in self._shuffle for name in self.songs.get(cat, {}).values()]
+        if tracks:
+            self.world["song"] = self.rng.choice(tracks)
+
+    def _move(self, heading, distance):
+        w = self.world
+        rad = math.radians(heading)
+        w["worldX"] = min(max(w["worldX"] + math.sin(rad) * distance, 0), MAP_WIDTH * MAP_PIXEL_SIZE - 1)
+        w["worldZ"] = min(max(w["worldZ"] + math.cos(rad) * distance, 0), MAP_HEIGHT * MAP_PIXEL_SIZE - 1)
+
+    # --- saves ---
+
+    def _save(self):
+        try:
+            os.makedirs(self.data_dir, exist_ok=True)
+            with open(self.save_path, "w") as f:
+                json.dump(self.world, f)
+        except OSError as e:
+            logging.error(f"Sim save failed: {e}")
+
+    def _load_save(self):
+        try:
+            with open(self.save_path) as f:
+                self.world.update(json.load(f))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logging.error(f"Sim save unreadable, starting fresh: {e}")
+
+    # --- MapDataLogger ---
+
+    def _calendar(self):
+        secs = int(self.world["game_seconds"])
+        days, rem = divmod(secs, 86400)
+        year, day_of_year = divmod(days, 360)
+        month = MONTH_NAMES[day_of_year // 30]
+        return DAY_NAMES[days % 7], day_of_year % 30 + 1, month, year, rem
+
+    def _season(self):
+        return SEASONS.get(self._calendar()[2], "Unknown")
+
+    def snapshot(self):
+        """MapData.json contents, same keys and order as MapDataLogger.LogPlayerPosition."""
+        w = self.world
+        day_name, day, month, year, rem = self._calendar()
+        hh, mm, ss = rem // 3600, rem // 60 % 60, rem % 60
+        px = int(w["worldX"] // MAP_PIXEL_SIZE)
+        py = MAP_HEIGHT - 1 - int(w["worldZ"] // MAP_PIXEL_SIZE)
+        region, location, location_type = place_at(px, py)
+        weather = w["weather"]
+        if weather == "Sunny" and not 6 <= hh < 18:
+            weather = "Clear"
+        return {
+            "playerName": "Daggerwalker",
+            "playerRace": "Breton",
+            "playerClass": "Spellsword",
+            "worldX": int(w["worldX"]),
+            "worldZ": int(w["worldZ"]),
+            "mapPixelX": px,
+            "mapPixelY": py,
+            "region": region,
+            "location": location,
+            "locationType": location_type,
+            "playerX": round(w["worldX"] % MAP_PIXEL_SIZE / 39.37, 4),
+            "playerY": round(w["altitude"], 4),
+            "playerZ": round(w["worldZ"] % MAP_PIXEL_SIZE / 39.37, 4),
+            "dayOfWeek": day_name,
+            "date": f"{day_name}, {day} {month}, 3E {year}, {hh:02d}:{mm:02d}:{ss:02d}",
+            "realTimeUtc": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S") + " UTC",
+            "season": SEASONS.get(month, "Unknown"),
+            "weather": weather,
+            "health": w["health"],
+            "maxHealth": w["maxHealth"],
+            "fatigue": w["fatigue"],
+            "magicka": w["magicka"],
+            "gold": w["gold"],
+            "level": w["level"],
+            "currentSong": w["song"] if w["song"] not in (None, "song_none") else "None",  # silence reads as "None"
+        }
+
+    def _write_mapdata(self):
+        # Plain overwrite like the mod's File.WriteAllText, so readers can still catch it half-written
+        try:
+            os.makedirs(self.data_dir, exist_ok=True)
+            with open(self.mapdata_path, "w") as f:
+                f.write(json.dumps(self.snapshot(), indent=2))
+        except OSError as e:
+            logging.error(f"Sim MapData write failed: {e}")
+
+
+def from_env():
+    """SimGame configured from DAGGERWALK_SIM_* environment variables."""
+    crash_after = os.environ.get("DAGGERWALK_SIM_CRASH_AFTER")
+    return SimGame(
+        data_dir=os.environ.get("DAGGERWALK_SIM_DIR", "sim"),
+        speed=float(os.environ.get("DAGGERWALK_SIM_SPEED", 1)),
+        crash_rate=float(os.environ.get("DAGGERWALK_SIM_CRASH_RATE", 0)),
+        crash_after=float(crash_after) if crash_after else None,
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Run the simulated game on its own")
+    parser.add_argument("--dir", default="sim")
+    parser.add_argument("--speed", type=float, default=60.0)
+    parser.add_argument("--duration", type=float, default=30.0, help="real seconds to run")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--crash-rate", type=float, default=0.0, help="crashes per simulated hour")
+    args = parser.parse_args()
+
+    game = SimGame(args.dir, speed=args.speed, seed=args.seed, crash_rate=args.crash_rate).start()
+    try:
+        time.sleep(args.duration)
+    finally:
+        game.stop()
+    print(json.dumps(game.snapshot(), indent=2))
+    print(f"running={game.is_running()} crashes={game.crashes}")
@@ -0,0 +1,234 @@
+# spatial_index.py
+"""Region, climate and POI for any map pixel, without asking Django.
+
+!info's climate emoji, POI emoji and "Ocean near X" come from the Django
+response (region_fk, poi, last_known_region), so they're only as fresh as
+the last refresh. This index keeps what those responses said, per map
+pixel, so every telemetry sample can be enriched locally:
+
+    places = SpatialIndex()
+    places.record(212, 290, response["log"])   # after each Django refresh
+    place = places.lookup(213, 290, region="Daggerfall", location="Ashfield Hall")
+    place.climate, place.climate_emoji, place.poi_emoji, place.near_region
+
+The grid is a flat file of MAP_WIDTH x MAP_HEIGHT records (region id, POI
+id; 0 = unknown), memory-mapped, so a lookup is one unpack at a computed
+offset and opening it reads nothing up front. Region and POI details
+live in a small JSON sidecar. Regions are looked up by the name the game
+reports when the pixel itself hasn't been seen; "near" for the ocean is
+the closest land pixel the index knows, found ring by ring outwards.
+
+Django stays the source of truth: each response re-stamps its pixel and
+updates the region's climate/emoji. seed() back-fills from /logs/.
+"""
+import collections
+import json
+import logging
+import mmap
+import os
+import struct
+
+INDEX_FILE = "spatial_index.bin"  # next to parameters.json and the logs, in the working directory
+
+MAP_WIDTH, MAP_HEIGHT = 1000, 500  # Daggerfall's map pixels
+RECORD = struct.Struct("<HH")  # region id, POI id
+POI_RADIUS = 2  # pixels; a location's name resolves to a POI this close
+NEAR_RADIUS = 40  # pixels searched for land around an ocean pixel
+OCEAN = "ocean"
+
+Place = collections.namedtuple("Place", "region climate climate_emoji poi poi_emoji near_region")
+
+
+def _log_pixel(log):
+    """(x, y) map pixel of a Django log record, or None if it doesn't say."""
+    for kx, ky in (("map_pixel_x", "map_pixel_y"), ("mapPixelX", "mapPixelY")):
+        if log.get(kx) is not None and log.get(ky) is not None:
+            return int(log[kx]), int(log[ky])
+    return None
+
+
+class SpatialIndex:
+    def __init__(self, path=INDEX_FILE):
+        self.path = path
+        self.tables_path = os.path.splitext(path)[0] + ".json"
+        self.regions = [None]  # id -> {"name", "climate", "emoji"}; 0 unused
+        self.pois = [None]  # id -> {"name", "emoji", "x", "y", "region"}
+        self._region_ids = {}  # lowercased name -> id
+        self._poi_ids = {}  # (name, x, y) -> id
+        self._pois_by_name = collections.defaultdict(list)  # lowercased name -> [id]
+        self._near_cache = {}  # (x, y) -> region name, cleared when the grid changes
+        self._tables_dirty = False
+        self._load_tables()
+        self._file, self._grid = self._open_grid()
+
+    def __len__(self):
+        return len(self.pois) - 1
+
+    def _open_grid(self):
+        size = MAP_WIDTH * MAP_HEIGHT * RECORD.size
+        mode = "r+b" if os.path.exists(self.path) else "w+b"
+        f = open(self.path, mode)
+        if os.fstat(f.fileno()).st_size != size:
+            if mode == "r+b":
+                logging.warning(f"Spatial index {self.path} has the wrong size; starting it over")
+            f.truncate(0)
+            f.truncate(size)
+        return f, mmap.mmap(f.fileno(), size)
+
+    def _load_tables(self):
+        try:
+            with open(self.tables_path, encoding="utf-8") as f:
+                tables = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logging.error(f"Spatial index tables unreadable ({e}); POI and climate details start empty")
+            return
+        for region in tables.get("regions", []):
+            self._add_region(region)
+        for poi in tables.get("pois", []):
+            self._add_poi(poi)
+
+    def _add_region(self, region):
+        self.regions.append(region)
+        self._region_ids[region["name"].lower()] = len(self.regions) - 1
+        return len(self.regions) - 1
+
+    def _add_poi(self, poi):
+        self.pois.append(poi)
+        poi_id = len(self.pois) - 1
+        self._poi_ids[(poi["name"], poi["x"], poi["y"])] = poi_id
+        self._pois_by_name[poi["name"].lower()].append(poi_id)
+        return poi_id
+
+    def _cell(self, x, y):
+        if not (0 <= x < MAP_WIDTH and 0 <= y < MAP_HEIGHT):
+            return 0, 0
+        return RECORD.unpack_from(self._grid, (y * MAP_WIDTH + x) * RECORD.size)
+
+    def record(self, x, y, log):
+        """Stamp pixel (x, y) with what a Django log says is there; True if anything changed."""
+        log = log or {}
+        name = (log.get("region") or "").strip()
+        if not name or not (0 <= x < MAP_WIDTH and 0 <= y < MAP_HEIGHT):
+            return False
+        region_fk = log.get("region_fk") or {}
+        entry = {"name": name, "climate": (region_fk.get("climate") or "").strip(),
+                 "emoji": region_fk.get("emoji") or ""}
+        region_id = self._region_ids.get(name.lower())
+        if region_id is None:
+            region_id = self._add_region(entry)
+            self._tables_dirty = True
+        elif region_fk and self.regions[region_id] != entry:
+            self.regions[region_id] = entry
+            self._tables_dirty = True
+
+        poi_id = 0
+        poi = log.get("poi") or {}
+        location = (log.get("location") or "").strip()
+        if poi and location:
+            poi_id = self._poi_ids.get((location, x, y))
+            entry = {"name": location, "emoji": poi.get("emoji") or "", "x": x, "y": y, "region": name}
+            if poi_id is None:
+                poi_id = self._add_poi(entry)
+                self._tables_dirty = True
+            elif self.pois[poi_id] != entry:
+                self.pois[poi_id] = entry
+                self._tables_dirty = True
+
+        if self._cell(x, y) == (region_id, poi_id):
+            return self._tables_dirty
+        RECORD.pack_into(self._grid, (y * MAP_WIDTH + x) * RECORD.size, region_id, poi_id)
+        self._near_cache.clear()
+        return True
+
+    def seed(self, logs):
+        """Back-fill from Django /logs/ records that say which pixel they were at; returns how many."""
+        n = 0
+        for log in logs:
+            pixel = _log_pixel(log)
+            if pixel and self.record(*pixel, log):
+                n += 1
+        return n
+
+    def lookup(self, x, y, region=None, location=None):
+        """Place at pixel (x, y); `region`/`location` are what the game reports there now."""
+        region_id, poi_id = self._cell(x, y)
+        if region:
+            # The game's region name is live; the stamp may be from before a border was crossed
+            region_id = self._region_ids.get(region.lower(), 0)
+        entry = self.regions[region_id] if region_id else None
+        name = region or (entry and entry["name"]) or ""
+
+        poi = self.pois[poi_id] if poi_id else None
+        if location and (poi is None or poi["name"] != location):
+            poi = self._nearest_poi(x, y, location)
+
+        near = self._near_land(x, y) if name.lower() == OCEAN else ""
+        return Place(
+            region=name,
+            climate=entry["climate"] if entry else "",
+            climate_emoji=entry["emoji"] if entry else "",
+            poi=poi["name"] if poi else "",
+            poi_emoji=poi["emoji"] if poi else "",
+            near_region=near,
+        )
+
+    def find_poi(self, name, region=None):
+        """(x, y) of the POI called `name` (in `region`, if given), or None if the index hasn't seen it."""
+        for poi_id in self._pois_by_name.get(name.lower(), ()):
+            poi = self.pois[poi_id]
+            if not region or (poi.get("region") or "").lower() == region.lower():
+                return poi["x"], poi["y"]
+        return None
+
+    def _nearest_poi(self, x, y, name):
+        best, best_d = None, None
+        for poi_id in self._pois_by_name.get(name.lower(), ()):
+            poi = self.pois[poi_id]
+            d = max(abs(poi["x"] - x), abs(poi["y"] - y))
+            if d <= POI_RADIUS and (best_d is None or d < best_d):
+                best, best_d = poi, d
+        return best
+
+    def _near_land(self, x, y):
+        """Name of the closest known non-ocean region, searching square rings outwards."""
+        if (x, y) in self._near_cache:
+            return self._near_cache[(x, y)]
+        found = ""
+        ocean_id = self._region_ids.get(OCEAN, -1)
+        for r in range(1, NEAR_RADIUS + 1):
+            for cx, cy in _ring(x, y, r):
+                region_id, _ = self._cell(cx, cy)
+                if region_id and region_id != ocean_id:
+                    found = self.regions[region_id]["name"]
+                    break
+            if found:
+                break
+        self._near_cache[(x, y)] = found
+        return found
+
+    def flush(self):
+        """Write the grid and (if changed) the tables to disk. Blocks; run it off the loop."""
+        self._grid.flush()
+        if self._tables_dirty:
+            tmp = self.tables_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"regions": self.regions[1:], "pois": self.pois[1:]}, f, ensure_ascii=False)
+            os.replace(tmp, self.tables_path)
+            self._tables_dirty = False
+
+    def close(self):
+        self.flush()
+        self._grid.close()
+        self._file.close()
+
+
+def _ring(x, y, r):
+    """Pixels at Chebyshev distance exactly r from (x, y)."""
+    for dx in range(-r, r + 1):
+        yield x + dx, y - r
+        yield x + dx, y + r
+    for dy in range(-r + 1, r):
+        yield x - r, y + dy
+        yield x + r, y + dy
@@ -1,4 +1,5 @@
 import subprocess
+import threading
 import time
 import psutil
 import logging
@@ -227,26 +228,85 @@ def ensure_dfu_ready(timeout=240):
         logging.error("Timed out waiting for DFU readiness")
     return ok
 
-def run_bot_supervised():
+# Bot and game input in separate processes (input_executor.py): a DFU crash
+# restarts the game and executor only, and the bot stays in chat throughout
+SPLIT_PROCESSES = False  # opt in; False runs the bot in one process as before
+EXECUTOR_ADDRESS = "127.0.0.1:8765"
+EXIT_GAME_CRASHED = 100  # input_executor.EXIT_GAME_CRASHED
+
+# Split mode only: a second bot stays in chat as a hot standby and takes over
+# within a second if the primary dies, or about 4s after it hangs (failover.py).
+# Both share the executor.
+HOT_STANDBY = False
+LEASE_FILE = Path(r"C:\Daggerwalk\runtime\bot.lease")
+EXIT_DEMOTED = 101  # failover.EXIT_DEMOTED
+
+def python_launcher():
     base = os.path.dirname(__file__)
     # Prefer pythonw.exe to avoid a console window (fallback to python.exe + NO_WINDOW)
     pyw = os.path.join(base, "daggerwalk_venv", "Scripts", "pythonw.exe")
     pye = os.path.join(base, "daggerwalk_venv", "Scripts", "python.exe")
     exe = pyw if os.path.exists(pyw) else pye
     flags = getattr(subprocess, "CREATE_NO_WINDOW", 0) if exe == pye else 0
+    return base, exe, flags
 
+def run_bot_supervised(executor_address=None, lease=None, metrics_port=None):
+    base, exe, flags = python_launcher()
     bot = os.path.join(base, "daggerwalk_twitch_bot.py")
+    restarts = 0
 
     while True:
-        # Always ensure DFU is staged before (re)starting the bot
-        ensure_dfu_ready(timeout=240)
-
-        logging.info(f"Launching Twitch bot ({'pythonw' if exe==pyw else 'python + NO_WINDOW'})...")
-        p = subprocess.Popen([exe, bot], cwd=base, creationflags=flags)
+        # Single process: the bot drives DFU, so DFU must be staged before (re)starting it
+        if not executor_address:
+            ensure_dfu_ready(timeout=240)
+
+        logging.info(f"Launching Twitch bot ({'pythonw' if exe.endswith('pythonw.exe') else 'python + NO_WINDOW'})...")
+        # Restart count is exported by the bot's metrics endpoint
+        env = dict(os.environ, DAGGERWALK_RESTARTS=str(restarts))
+        if executor_address:
+            env["DAGGERWALK_EXECUTOR"] = executor_address
+        if lease:
+            env["DAGGERWALK_LEASE"] = str(lease)
+        if metrics_port:
+            env["DAGGERWALK_METRICS_PORT"] = str(metrics_port)
+        p = subprocess.Popen([exe, bot], cwd=base, creationflags=flags, env=env)
         rc = p.wait()
+        restarts += 1
+        if rc == EXIT_DEMOTED:
+            # The other instance took over; come straight back as its standby
+            logging.warning("Bot lost the primary lease. Relaunching as standby...")
+            continue
         logging.warning(f"Bot exited with code {rc}. Relaunching in 5s...")
         time.sleep(5)
 
+def run_executor_supervised(address):
+    base, exe, flags = python_launcher()
+    executor = os.path.join(base, "input_executor.py")
+
+    while True:
+        ensure_dfu_ready(timeout=240)
+
+        logging.info(f"Launching input executor on {address}...")
+        env = dict(os.environ, DAGGERWALK_EXECUTOR=address)
+        p = subprocess.Popen([exe, executor], cwd=base, creationflags=flags, env=env)
+        rc = p.wait()
+        if rc == EXIT_GAME_CRASHED:
+            logging.warning("Input executor reports Daggerfall Unity crashed. Restarting DFU...")
+        else:
+            logging.warning(f"Input executor exited with code {rc}. Relaunching in 5s...")
+            time.sleep(5)
+
+def run_split_supervised(address=EXECUTOR_ADDRESS, hot_standby=HOT_STANDBY):
+    # The bot queues game input until the executor is up, so it needn't wait for DFU
+    threading.Thread(target=run_executor_supervised, args=(address,), name="executor", daemon=True).start()
+    if not hot_standby:
+        run_bot_supervised(executor_address=address)
+        return
+    LEASE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    # Whichever starts first holds the lease; the other waits in chat
+    threading.Thread(target=run_bot_supervised, args=(address, LEASE_FILE, 9109), name="bot_b", daemon=True).start()
+    run_bot_supervised(executor_address=address, lease=LEASE_FILE)
+
 # Main execution loop
 if __name__ == "__main__":
     logging.info("=== Starting DaggerWalk Automation ===")
@@ -259,4 +319,7 @@ if __name__ == "__main__":
     
     start_obs()
     # First-time DFU setup and every restart are gated inside the supervisor loop
-    run_bot_supervised()
+    if SPLIT_PROCESSES:
+        run_split_supervised()
+    else:
+        run_bot_supervised()
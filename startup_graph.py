@@ -0,0 +1,101 @@
+# startup_graph.py
+"""Bot startup as a small dependency graph.
+
+Each step runs as soon as every step it depends on has finished, so
+independent steps (Bluesky login, Helix tags, first Django refresh, ...)
+overlap instead of queueing behind each other:
+
+    graph = StartupGraph()
+    graph.add("first_refresh", self.first_refresh)
+    graph.add("loop_lag_monitor", self.loop_lag_monitor, background=True)
+    graph.add("scheduled_messages", self.schedule_messages, after=["first_refresh"])
+    graph.start()
+    await graph.wait("first_refresh", timeout=5)
+
+A step may be a plain function too (e.g. registering scheduler jobs).
+`background=True` steps are long-running loops: they count as done as soon
+as their task is started. A failed step is logged and its dependents are
+skipped. Step completion times go to startup_timeline.
+"""
+import asyncio
+import inspect
+import logging
+import time
+
+import startup_timeline
+
+
+class StartupGraph:
+    def __init__(self):
+        self._steps = {}  # name -> (fn, after, background)
+        self._done = {}  # name -> asyncio.Event
+        self.failed = set()
+        self.tasks = {}  # name -> task (step runner, or the loop itself for background steps)
+        self.durations = {}  # name -> seconds the step itself took
+
+    def add(self, name, fn, after=(), background=False):
+        self._steps[name] = (fn, tuple(after), background)
+        self._done[name] = asyncio.Event()
+
+    def _check(self):
+        for name, (_, after, _) in self._steps.items():
+            missing = [dep for dep in after if dep not in self._steps]
+            if missing:
+                raise ValueError(f"Startup step {name} depends on unknown {missing}")
+        # Depth-first cycle check
+        state = {}
+
+        def visit(name, path):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Startup cycle: {' -> '.join(path + [name])}")
+            state[name] = "visiting"
+            for dep in self._steps[name][1]:
+                visit(dep, path + [name])
+            state[name] = "done"
+
+        for name in self._steps:
+            visit(name, [])
+
+    def start(self):
+        self._check()
+        for name in self._steps:
+            self.tasks[name] = asyncio.create_task(self._run(name), name=f"startup:{name}")
+
+    async def _run(self, name):
+        fn, after, background = self._steps[name]
+        try:
+            for dep in after:
+                await self._done[dep].wait()
+            failed_deps = [dep for dep in after if dep in self.failed]
+            if failed_deps:
+                logging.warning(f"Startup step {name} skipped: {', '.join(failed_deps)} failed")
+                self.failed.add(name)
+                return
+
+            if background:
+                self.tasks[name] = asyncio.create_task(fn(), name=name)
+            else:
+                start = time.perf_counter()
+                result = fn()
+                if inspect.isawaitable(result):
+                    await result
+                self.durations[name] = time.perf_counter() - start
+            startup_timeline.mark(name)
+        except Exception as e:
+            logging.error(f"Startup step {name} failed: {e}")
+            self.failed.add(name)
+        finally:
+            self._done[name].set()
+
+    def is_done(self, name):
+        return self._done[name].is_set() and name not in self.failed
+
+    async def wait(self, name, timeout=None):
+        """True once `name` has finished successfully; False on failure or timeout."""
+        try:
+            await asyncio.wait_for(self._done[name].wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return name not in self.failed
@@ -0,0 +1,107 @@
+# startup_timeline.py
+"""Where the bot's startup time goes, and whether it's getting worse.
+
+Import this first in the bot so its clock starts before anything heavy.
+mark("imports"), mark("config"), ... record seconds since the process
+started (interpreter startup included). The supervisor restarts the bot
+after every DFU crash, so all of this is downtime.
+
+When the bot is ready to act on chat, check() compares time-to-first-
+command against a fixed budget and the median of recent starts (kept in
+HISTORY_FILE) and logs a warning on regression.
+"""
+import json
+import logging
+import os
+import statistics
+import time
+import metrics
+
+PHASE_SECONDS = metrics.gauge("daggerwalk_startup_phase_seconds", "Seconds from process start to each startup phase",
+                              ["phase"])
+
+HISTORY_FILE = "startup_history.json"
+HISTORY_RUNS = 20
+REGRESSION_FACTOR = 1.5  # warn when slower than 1.5x the recent median
+
+_t0 = time.perf_counter()
+_offset = None  # process age at _t0, resolved on first use
+_marks = {}  # phase -> seconds since process start
+
+
+def _process_age():
+    """Seconds the process had been alive when this module was imported."""
+    try:
+        import psutil  # only needed once, keep it off the import path
+        return max(0.0, time.time() - (time.perf_counter() - _t0) - psutil.Process().create_time())
+    except Exception:
+        return 0.0
+
+
+def since_start():
+    global _offset
+    now = time.perf_counter()
+    if _offset is None:
+        _offset = _process_age()
+    return _offset + now - _t0
+
+
+def mark(phase):
+    """Record the first time `phase` is reached; later calls are ignored."""
+    if phase in _marks:
+        return
+    _marks[phase] = since_start()
+    PHASE_SECONDS.labels(phase=phase).set(_marks[phase])
+    logging.info(f"Startup: {phase} at {_marks[phase]:.2f}s")
+
+
+def timeline():
+    return dict(_marks)
+
+
+def report():
+    """Multi-line summary, one phase per line with the delta from the previous one."""
+    lines, prev = [], 0.0
+    for phase, t in sorted(_marks.items(), key=lambda kv: kv[1]):
+        lines.append(f"  {phase:<20}{t:7.2f}s  (+{t - prev:.2f}s)")
+        prev = t
+    return "Startup timeline:\n" + "\n".join(lines)
+
+
+def _load_history(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def check(phase, budget, history_file=HISTORY_FILE):
+    """Compare `phase` with the budget and recent history, then append this run. Returns problems found."""
+    if phase not in _marks:
+        return []
+    value = _marks[phase]
+    history = _load_history(history_file)
+    previous = [run[phase] for run in history if phase in run]
+
+    problems = []
+    if budget and value > budget:
+        problems.append(f"{phase} took {value:.2f}s, over the {budget:.0f}s budget")
+    if len(previous) >= 3:
+        median = statistics.median(previous)
+        if value > median * REGRESSION_FACTOR:
+            problems.append(f"{phase} took {value:.2f}s vs recent median {median:.2f}s")
+    for problem in problems:
+        logging.warning(f"Startup regression: {problem}\n{report()}")
+    if not problems:
+        logging.info(report())
+
+    history.append(dict(_marks, at=time.time()))
+    try:
+        tmp = f"{history_file}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(history[-HISTORY_RUNS:], f)
+        os.replace(tmp, history_file)
+    except OSError as e:
+        logging.error(f"Could not save startup history: {e}")
+    return problems
@@ -0,0 +1,134 @@
+# telemetry.py
+"""MapData as an append-only stream: every sample, not just the last one.
+
+MapData.json is overwritten once a minute, so a reader only ever sees the
+latest sample. MapDataLogger also appends each sample as one JSON line
+to MapData.ndjson, every few seconds:
+
+    {"seq": 812, "worldX": 6570000, ..., "currentSong": "song_gsunny2"}
+    {"seq": 813, "worldX": 6575000, ...}
+
+TailReader remembers its byte offset and, on each read(), parses only
+the complete lines added since. A line still being written stays unread
+until its newline arrives. When the file is smaller than the offset it
+was truncated, and reading starts again from the top. When the path
+points at a different file it was rotated: the writer renamed the old
+one to `<path>.1`. The rest of that file is read first, then the new one
+from the start. The file is opened per read, not held open, so the
+writer can rotate it on Windows.
+
+    reader = TailReader(backend.telemetry_path)
+    for sample in reader.read():
+        ...
+
+TelemetryWriter is the writing side in Python (sim_game, benchmarks),
+rotating the same way the mod does.
+"""
+import json
+import logging
+import os
+import metrics
+
+MAX_BYTES = 5 * 1024 * 1024  # rotate past this; the mod uses the same limit
+MAX_READ = 1024 * 1024  # per read(); a reader far behind catches up over a few calls
+
+SAMPLES = metrics.counter("daggerwalk_telemetry_samples_total", "Telemetry samples read from the stream")
+BAD_LINES = metrics.counter("daggerwalk_telemetry_bad_lines_total", "Telemetry lines that weren't valid JSON")
+RESETS = metrics.counter("daggerwalk_telemetry_resets_total", "Telemetry file rotations and truncations seen",
+                         ["kind"])
+
+
+def rotated_path(path):
+    return path + ".1"
+
+
+def _identity(st):
+    return st.st_dev, st.st_ino
+
+
+class TailReader:
+    def __init__(self, path, from_start=False):
+        self.path = path
+        self.offset = None if not from_start else 0  # None: start at the current end
+        self.file_id = None
+        self.samples = 0
+        self.bad_lines = 0
+
+    def read(self):
+        """Samples appended since the last call, oldest first."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return []
+        samples = []
+        if self.file_id is not None and _identity(st) != self.file_id:
+            # Rotated: finish the old file (now <path>.1) before starting the new one
+            samples += self._drain_rotated()
+            RESETS.labels(kind="rotated").inc()
+            logging.info(f"Telemetry {self.path} rotated; reading the new file from the start")
+            self.offset = 0
+        elif self.offset is not None and st.st_size < self.offset:
+            RESETS.labels(kind="truncated").inc()
+            logging.warning(f"Telemetry {self.path} truncated ({st.st_size} < {self.offset}); reading from the start")
+            self.offset = 0
+        if self.offset is None:
+            self.offset = st.st_size
+        self.file_id = _identity(st)
+        if st.st_size > self.offset:
+            samples += self._read_from(self.path, st.st_size)
+        return samples
+
+    def _drain_rotated(self):
+        old = rotated_path(self.path)
+        try:
+            st = os.stat(old)
+        except FileNotFoundError:
+            return []
+        if _identity(st) != self.file_id or st.st_size <= (self.offset or 0):
+            return []  # rotated more than once since we looked; what's gone is gone
+        return self._read_from(old, st.st_size)
+
+    def _read_from(self, path, size):
+        try:
+            with open(path, "rb") as f:
+                f.seek(self.offset)
+                chunk = f.read(min(size - self.offset, MAX_READ))
+        except OSError as e:
+            logging.warning(f"Telemetry read failed: {e}")
+            return []
+        end = chunk.rfind(b"\n")
+        if end < 0:
+            return []  # only a partial line so far
+        self.offset += end + 1
+        samples = []
+        for line in chunk[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                samples.append(json.loads(line))
+            except ValueError:
+                self.bad_lines += 1
+                BAD_LINES.inc()
+        self.samples += len(samples)
+        SAMPLES.inc(len(samples))
+        return samples
+
+
+class TelemetryWriter:
+    """Appends one JSON line per sample; renames the file to <path>.1 past max_bytes."""
+
+    def __init__(self, path, max_bytes=MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.seq = 0
+
+    def write(self, sample):
+        self.seq += 1
+        line = json.dumps({"seq": self.seq, **sample}, separators=(",", ":")) + "\n"
+        try:
+            if os.path.exists(self.path) and os.path.getsize(self.path) + len(line) > self.max_bytes:
+                os.replace(self.path, rotated_path(self.path))
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+        except OSError as e:
+            logging.error(f"Telemetry write failed: {e}")
@@ -0,0 +1,68 @@
+# twitch_auth.py
+"""Keeping the bot's Twitch user token valid without a restart.
+
+Twitch user tokens expire after a few hours, and Twitch asks apps to
+validate theirs at least hourly. With REFRESH_TOKEN and CLIENT_SECRET in
+parameters.json the bot checks the token every TOKEN_CHECK_INTERVAL and
+swaps in a fresh one when it has less than REFRESH_MARGIN left (or has
+already been rejected):
+
+    expires_in = await validate(token)        # seconds left; 0 if rejected, None if it never expires
+    tokens = await refresh(client_id, secret, refresh_token)
+    tokens.access_token, tokens.refresh_token, tokens.expires_in
+
+The new pair is written back to parameters.json, so a restart (or the
+standby, which reloads the file) picks it up too.
+"""
+import collections
+import aiohttp
+import metrics
+
+VALIDATE_URL = "https://id.twitch.tv/oauth2/validate"
+TOKEN_URL = "https://id.twitch.tv/oauth2/token"
+REFRESH_MARGIN = 30 * 60  # seconds; refresh when less than this is left
+
+TOKEN_EXPIRES = metrics.gauge("daggerwalk_twitch_token_expires_seconds", "Seconds left on the Twitch token at the last check")
+REFRESHES = metrics.counter("daggerwalk_twitch_token_refreshes_total", "Twitch token refresh attempts", ["result"])
+
+Tokens = collections.namedtuple("Tokens", "access_token refresh_token expires_in")
+
+
+class RefreshRejected(Exception):
+    """Twitch turned the refresh token down; someone has to authorize the bot again."""
+
+
+async def validate(token):
+    """Seconds left on `token`: 0 if Twitch rejects it, None if it doesn't expire."""
+    async with aiohttp.ClientSession() as session:
+        async with session.get(VALIDATE_URL, headers={"Authorization": f"OAuth {token}"}) as resp:
+            if resp.status == 401:
+                TOKEN_EXPIRES.set(0)
+                return 0
+            if resp.status != 200:
+                raise Exception(f"Token validation failed: {resp.status} - {await resp.text()}")
+            expires_in = (await resp.json()).get("expires_in") or None
+    TOKEN_EXPIRES.set(expires_in or 0)
+    return expires_in
+
+
+async def refresh(client_id, client_secret, refresh_token):
+    """Trade the refresh token for a new access/refresh token pair."""
+    data = {
+        "grant_type": "refresh_token",
+        "refresh_token": refresh_token,
+        "client_id": client_id,
+        "client_secret": client_secret,
+    }
+    async with aiohttp.ClientSession() as session:
+        async with session.post(TOKEN_URL, data=data) as resp:
+            if resp.status in (400, 401):
+                REFRESHES.labels(result="rejected").inc()
+                raise RefreshRejected(f"{resp.status} - {await resp.text()}")
+            if resp.status != 200:
+                REFRESHES.labels(result="error").inc()
+                raise Exception(f"Token refresh failed: {resp.status} - {await resp.text()}")
+            body = await resp.json()
+    REFRESHES.labels(result="ok").inc()
+    TOKEN_EXPIRES.set(body.get("expires_in") or 0)
+    return Tokens(body["access_token"], body.get("refresh_token") or refresh_token, body.get("expires_in"))
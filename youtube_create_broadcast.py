@@ -1,9 +1,14 @@
 # youtube_create_broadcast.py
-import pickle, os
+import pickle, os, json
 from datetime import datetime, timedelta, timezone
+import httplib2
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build
+import resilience
 
 SCOPES = ["https://www.googleapis.com/auth/youtube.force-ssl"]
+HTTP_TIMEOUT = 30  # seconds per API request
+STATE_FILE = "youtube_broadcast_state.json"  # cached stream ID + today's broadcast
 
 CATEGORY_ID = "20"  # 20 = Gaming
 GAME_TITLE = "The Elder Scrolls II: Daggerfall"
@@ -13,61 +18,139 @@ TAGS = [
     "oldschool", "automated", "interactive", "python", "javascript"
 ]
 
+# Data API quota cost per call (https://developers.google.com/youtube/v3/determine_quota_cost)
+QUOTA_COSTS = {"list": 1, "insert": 50, "bind": 50, "update": 50}
+
+quota_used = 0
+
 def get_service():
     with open("token.pickle", "rb") as f:
         creds = pickle.load(f)
-    return build("youtube", "v3", credentials=creds)
+    http = AuthorizedHttp(creds, http=httplib2.Http(timeout=HTTP_TIMEOUT))
+    return build("youtube", "v3", http=http)
+
+def execute(request, method):
+    """Run an API request through the YouTube circuit breaker and count its quota"""
+    def send():
+        # Counted once the breaker lets the call through; a call Google sees costs quota even if it fails
+        global quota_used
+        quota_used += QUOTA_COSTS[method]
+        return request.execute()
+
+    return resilience.get("youtube").call_sync(send)
+
+def load_state():
+    try:
+        with open(STATE_FILE, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_state(state):
+    tmp = f"{STATE_FILE}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, STATE_FILE)
+
+def find_todays_broadcast(yt, full_title):
+    """Return the broadcast with today's title, if one was already created.
+
+    Checked live first: with enableAutoStart it stops being "upcoming" as
+    soon as the stream starts, and a re-run mid-stream must reuse it too.
+    """
+    for status in ("active", "upcoming"):
+        resp = execute(yt.liveBroadcasts().list(
+            part="id,snippet,contentDetails",
+            broadcastStatus=status,
+            maxResults=50,
+        ), "list")
+        for item in resp.get("items", []):
+            if item["snippet"]["title"] == full_title:
+                return item
+    return None
+
+def get_stream_id(yt, state):
+    """Default stream key ID; it never changes, so look it up once and cache it"""
+    if state.get("stream_id"):
+        return state["stream_id"]
+    stream = execute(yt.liveStreams().list(part="id", mine=True), "list")["items"][0]
+    state["stream_id"] = stream["id"]
+    save_state(state)
+    return stream["id"]
 
 def create_daily_broadcast(
     title="Everyday walkin'",
     description="An automated journey through the Iliac Bay. Type in the Twitch chat to control the game."
 ):
+    global quota_used
+    quota_used = 0
+
     yt = get_service()
+    state = load_state()
     now = datetime.now(timezone.utc)
     start = now + timedelta(minutes=1)
     end = start + timedelta(hours=6)
+    full_title = f"{title} - {now.strftime('%Y/%m/%d')}"
 
-    # Create the broadcast
-    broadcast = yt.liveBroadcasts().insert(
-        part="snippet,contentDetails,status",
-        body={
-            "snippet": {
-                "title": f"{title} - {now.strftime('%Y/%m/%d')}",
-                "description": description,
-                "categoryId": CATEGORY_ID,
-                "gameTitle": GAME_TITLE,
-                "scheduledStartTime": start.isoformat(),
-                "scheduledEndTime": end.isoformat(),
-            },
-            "status": {
-                "privacyStatus": "public",
-                "selfDeclaredMadeForKids": False
+    # Reuse today's broadcast if a previous run already created it
+    broadcast = find_todays_broadcast(yt, full_title)
+    created = broadcast is None
+
+    if created:
+        broadcast = execute(yt.liveBroadcasts().insert(
+            part="snippet,contentDetails,status",
+            body={
+                "snippet": {
+                    "title": full_title,
+                    "description": description,
+                    "categoryId": CATEGORY_ID,
+                    "gameTitle": GAME_TITLE,
+                    "scheduledStartTime": start.isoformat(),
+                    "scheduledEndTime": end.isoformat(),
+                },
+                "status": {
+                    "privacyStatus": "public",
+                    "selfDeclaredMadeForKids": False
+                },
+                "contentDetails": {"enableAutoStart": True, "enableAutoStop": True},
             },
-            "contentDetails": {"enableAutoStart": True, "enableAutoStop": True},
-        },
-    ).execute()
-
-    # Bind it to your default stream key
-    stream = yt.liveStreams().list(part="id", mine=True).execute()["items"][0]
-    yt.liveBroadcasts().bind(
-        part="id,contentDetails", id=broadcast["id"], streamId=stream["id"]
-    ).execute()
-
-    # Apply tags and confirm category on the video itself
-    yt.videos().update(
-        part="snippet",
-        body={
-            "id": broadcast["id"],
-            "snippet": {
-                "title": broadcast["snippet"]["title"],
-                "description": broadcast["snippet"]["description"],
-                "categoryId": CATEGORY_ID,
-                "tags": TAGS,
+        ), "insert")
+
+    # Bind it to your default stream key (skip if a previous run already did)
+    stream_id = get_stream_id(yt, state)
+    if broadcast.get("contentDetails", {}).get("boundStreamId") != stream_id:
+        try:
+            execute(yt.liveBroadcasts().bind(
+                part="id,contentDetails", id=broadcast["id"], streamId=stream_id
+            ), "bind")
+        except Exception:
+            # Cached stream may have been deleted; look it up again once
+            state.pop("stream_id", None)
+            stream_id = get_stream_id(yt, state)
+            execute(yt.liveBroadcasts().bind(
+                part="id,contentDetails", id=broadcast["id"], streamId=stream_id
+            ), "bind")
+
+    # Tags and category can only be set on the video resource, not in the
+    # liveBroadcasts insert, so this stays a separate call - but only once.
+    if created or state.get("tagged_broadcast_id") != broadcast["id"]:
+        execute(yt.videos().update(
+            part="snippet",
+            body={
+                "id": broadcast["id"],
+                "snippet": {
+                    "title": broadcast["snippet"]["title"],
+                    "description": broadcast["snippet"]["description"],
+                    "categoryId": CATEGORY_ID,
+                    "tags": TAGS,
+                },
             },
-        },
-    ).execute()
+        ), "update")
+        state["tagged_broadcast_id"] = broadcast["id"]
+        save_state(state)
 
-    print(f"✅ Created, bound, and tagged broadcast: {broadcast['snippet']['title']}")
+    verb = "Created" if created else "Reused"
+    print(f"✅ {verb} broadcast: {broadcast['snippet']['title']} ({quota_used} quota units)")
     return broadcast["id"]
 
 if __name__ == "__main__":